@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""A benchmark of the aggregates of the places of each city, which
+compares the columns of the file storage with a scan of the places.
+Usage: python3 benchmarks/aggregate.py [number of places] [cities]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+
+AGGREGATES = (
+    'count', 'avg(price_by_night)', 'min(price_by_night)',
+    'max(price_by_night)', 'sum(max_guest)'
+)
+"""The aggregates that are computed for each city.
+"""
+REPEATS = 10
+"""The number of times the aggregates are computed.
+"""
+
+
+def write_store(file_path, n, cities):
+    """Writes a storage file with a given number of places.
+
+    Args:
+        file_path (str): The path to the storage file.
+        n (int): The number of places.
+        cities (int): The number of cities that the places are in.
+    """
+    datetime_now = datetime.now().isoformat()
+    with open(file_path, mode='w') as file:
+        file.write('{')
+        for i in range(n):
+            record = {
+                'id': str(i),
+                'created_at': datetime_now,
+                'updated_at': datetime_now,
+                'city_id': 'city-{}'.format(random.randrange(cities)),
+                'price_by_night': random.randrange(20, 500),
+                'max_guest': random.randrange(1, 9),
+                '__class__': 'Place'
+            }
+            file.write('{}"Place.{}": {}'.format(
+                ', ' if i > 0 else '', i, json.dumps(record)
+            ))
+        file.write('}')
+
+
+def scan_aggregate(store):
+    """Computes the aggregates by reading the attributes of every place.
+
+    Args:
+        store (FileStorage): The storage of the places.
+
+    Returns:
+        list: The aggregates of each city, sorted by the city.
+    """
+    groups = {}
+    for obj in store.all().values():
+        groups.setdefault(obj.city_id, []).append(obj)
+    results = []
+    for city_id in sorted(groups):
+        prices = [obj.price_by_night for obj in groups[city_id]]
+        results.append({
+            'city_id': city_id,
+            'count': len(prices),
+            'avg(price_by_night)': sum(prices) / len(prices),
+            'min(price_by_night)': min(prices),
+            'max(price_by_night)': max(prices),
+            'sum(max_guest)': sum(obj.max_guest for obj in groups[city_id]),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    cities = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    with tempfile.TemporaryDirectory() as dir_path:
+        file_path = os.path.join(dir_path, 'file.json')
+        write_store(file_path, n, cities)
+        store = FileStorage(file_path)
+        start = time.perf_counter()
+        store.reload()
+        print('{} places loaded in {:.3f}s'.format(
+            n, time.perf_counter() - start
+        ))
+        start = time.perf_counter()
+        store.aggregate('Place', AGGREGATES, 'city_id')
+        print('{:<24}{:.3f}s'.format(
+            'column creation', time.perf_counter() - start
+        ))
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            columnar = store.aggregate('Place', AGGREGATES, 'city_id')
+        print('{:<24}{:.6f}s'.format(
+            'columnar aggregate', (time.perf_counter() - start) / REPEATS
+        ))
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            scanned = scan_aggregate(store)
+        print('{:<24}{:.6f}s'.format(
+            'scan', (time.perf_counter() - start) / REPEATS
+        ))
+        assert columnar == scanned
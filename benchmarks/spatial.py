@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""A benchmark of the searches for the places near a location, which
+compares the spatial index of the file storage with a scan of the places.
+Usage: python3 benchmarks/spatial.py [number of places] [searches]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.engine.spatial_index import haversine  # noqa: E402
+
+
+CITIES = (
+    (40.71, -74.01), (51.51, -0.13), (35.68, 139.69), (-33.87, 151.21),
+    (6.52, 3.38), (-23.55, -46.63), (19.08, 72.88), (55.76, 37.62),
+)
+"""The locations around which most of the synthetic places are put.
+"""
+RADIUS = 10
+"""The distance (in kilometers) of the searches.
+"""
+K = 10
+"""The number of nearest places that the searches find.
+"""
+
+
+def random_location():
+    """Picks the location of a synthetic place, which is near a city nine
+    times out of ten and anywhere otherwise.
+
+    Returns:
+        tuple: The latitude and the longitude.
+    """
+    if random.random() < 0.9:
+        lat, lon = random.choice(CITIES)
+        return lat + random.gauss(0, 0.5), lon + random.gauss(0, 0.5)
+    return random.uniform(-85, 85), random.uniform(-180, 180)
+
+
+def write_store(file_path, n):
+    """Writes a storage file with a given number of places.
+
+    Args:
+        file_path (str): The path to the storage file.
+        n (int): The number of places.
+    """
+    datetime_now = datetime.now().isoformat()
+    with open(file_path, mode='w') as file:
+        file.write('{')
+        for i in range(n):
+            lat, lon = random_location()
+            record = {
+                'id': str(i),
+                'created_at': datetime_now,
+                'updated_at': datetime_now,
+                'latitude': lat,
+                'longitude': lon,
+                '__class__': 'Place'
+            }
+            file.write('{}"Place.{}": {}'.format(
+                ', ' if i > 0 else '', i, json.dumps(record)
+            ))
+        file.write('}')
+
+
+def scan_near(store, lat, lon):
+    """Finds the nearest places by computing the distance to every place.
+
+    Args:
+        store (FileStorage): The storage of the places.
+        lat (float): The latitude of the location.
+        lon (float): The longitude of the location.
+
+    Returns:
+        list: The distances and the ids of the nearest places.
+    """
+    found = []
+    for record in store.records('Place'):
+        distance = haversine(
+            lat, lon, record['latitude'], record['longitude']
+        )
+        if distance <= RADIUS:
+            found.append((distance, record['id']))
+    return sorted(found)[:K]
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    searches = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    with tempfile.TemporaryDirectory() as dir_path:
+        file_path = os.path.join(dir_path, 'file.json')
+        write_store(file_path, n)
+        store = FileStorage(file_path)
+        store.lazy_mode = True
+        start = time.perf_counter()
+        store.reload()
+        print('{} places loaded in {:.3f}s'.format(
+            n, time.perf_counter() - start
+        ))
+        locations = [random_location() for _ in range(searches)]
+        start = time.perf_counter()
+        store.near('Place', 0, 0, 0)
+        print('{:<24}{:.3f}s'.format(
+            'index creation', time.perf_counter() - start
+        ))
+        start = time.perf_counter()
+        for lat, lon in locations:
+            indexed = [
+                (distance, obj.id)
+                for distance, obj in store.near('Place', lat, lon, RADIUS, K)
+            ]
+        print('{:<24}{:.6f}s'.format(
+            'indexed search', (time.perf_counter() - start) / searches
+        ))
+        scan_searches = max(1, searches // 20)
+        start = time.perf_counter()
+        for lat, lon in locations[-scan_searches:]:
+            scanned = scan_near(store, lat, lon)
+        print('{:<24}{:.6f}s'.format(
+            'scan', (time.perf_counter() - start) / scan_searches
+        ))
+        assert [i for _, i in indexed] == [i for _, i in scanned]
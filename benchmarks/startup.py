@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""A benchmark of the startup time of the console, which compares the
+commands that don't use the storage with the ones that load it.
+Usage: python3 benchmarks/startup.py [number of objects] [repeats]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+"""The path to the repository.
+"""
+COMMANDS = ('help quit', 'count User', 'show User 0')
+"""The commands to time.
+"""
+
+
+def write_store(file_path, n):
+    """Writes a storage file with a given number of objects.
+
+    Args:
+        file_path (str): The path to the storage file.
+        n (int): The number of objects.
+    """
+    datetime_now = datetime.now().isoformat()
+    classes = ('User', 'Place', 'City', 'Review')
+    with open(file_path, mode='w') as file:
+        file.write('{')
+        for i in range(n):
+            cls_name = classes[i % len(classes)]
+            record = {
+                'id': str(i),
+                'created_at': datetime_now,
+                'updated_at': datetime_now,
+                'name': 'Object {}'.format(i),
+                '__class__': cls_name
+            }
+            file.write('{}"{}.{}": {}'.format(
+                ', ' if i > 0 else '', cls_name, i, json.dumps(record)
+            ))
+        file.write('}')
+
+
+def time_command(command, file_path, repeats):
+    """Times running a single command in a new console process.
+
+    Args:
+        command (str): The command to run.
+        file_path (str): The path to the storage file.
+        repeats (int): The number of runs.
+
+    Returns:
+        float: The shortest time (in seconds) of the runs.
+    """
+    env = dict(os.environ, HBNB_FILE_PATH=file_path)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(REPO_PATH, 'console.py')],
+            input=command + '\n',
+            env=env,
+            cwd=REPO_PATH,
+            stdout=subprocess.DEVNULL,
+            check=True,
+            text=True
+        )
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    with tempfile.TemporaryDirectory() as dir_path:
+        file_path = os.path.join(dir_path, 'file.json')
+        write_store(file_path, n)
+        print('{} objects, {} bytes'.format(n, os.stat(file_path).st_size))
+        for command in COMMANDS:
+            print('{:<16}{:.3f}s'.format(
+                command, time_command(command, file_path, repeats)
+            ))
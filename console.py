@@ -2,11 +2,150 @@
 """A module for managing the AirBnB clone's command interpreter.
 """
 import cmd
+import io
+import json
+import os
 import re
 import shlex
 import sys
+import time
+from functools import lru_cache
+from itertools import islice
 
 from models import storage
+from models.importer import coerce_attribute
+from models.query import (QUERY_METHODS, parse_query,
+                          split_args as split_predicates)
+from models.registry import RELATIONSHIPS
+
+OUTPUT_CHUNK_SIZE = 1000
+"""The number of items that are written to the output at once.
+"""
+PARSE_CACHE_SIZE = 4096
+"""The number of parsed lines of command that are kept.
+"""
+QUERY_PATTERN = re.compile(r'\s*[a-zA-Z]+\s*\.\s*(?:{})\s*\(.*'.format(
+    '|'.join(QUERY_METHODS)
+))
+"""The pattern of the queries that are called as methods of a class.
+"""
+CALL_PATTERN = re.compile(
+    r'(?P<class>[a-zA-Z]+)\s*\.\s*(?P<command>[a-zA-Z]+)\s*'
+    r'\((?P<args_txt>.*)\)'
+)
+"""The pattern of the commands that are called as methods of a class.
+"""
+ARG_TOKEN_PATTERN = re.compile(r'[,{}"]|[^,{}"]+')
+"""The pattern of the tokens of the arguments of a method call, which
+are the separators and the runs of other characters.
+"""
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_command(line):
+    """Transforms a command that is called as a method of a class into a
+    line of command.
+
+    Args:
+        line (str): The line of command.
+
+    Returns:
+        tuple: The next line of command to execute, and the arguments of
+        the command if it was called as a method of a class, otherwise
+        None.
+    """
+    if QUERY_PATTERN.fullmatch(line) is not None:
+        return 'query {}'.format(line.strip()), None
+    call_match = CALL_PATTERN.fullmatch(line)
+    if call_match is None:
+        return line, None
+    class_name = call_match.group('class')
+    try:
+        args = split_func_args(call_match.group('args_txt'))
+    except SyntaxError:
+        return line, None
+    cmd_line_parts = [call_match.group('command'), class_name]
+    for arg in args:
+        cmd_line_parts.append('"{}"'.format(arg))
+    return ' '.join(cmd_line_parts), (class_name,) + tuple(args)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def split_line(line):
+    """Splits the arguments of a command with shell-like quoting.
+
+    Args:
+        line (str): The arguments of the command.
+
+    Raises:
+        ValueError: If a quotation isn't closed.
+
+    Returns:
+        tuple: The arguments.
+    """
+    return tuple(shlex.split(line))
+
+
+def split_func_args(args_txt):
+    """Splits a function argument section into its arguments in a single
+    pass over its separators.
+
+    Args:
+        args_txt (str): The function argument section.
+
+    Raises:
+        SyntaxError: If a quotation or a dictionary isn't closed.
+
+    Returns:
+        list: The list of arguments.
+    """
+    txt = args_txt.strip()
+    quote = None
+    brace = None
+    brace_d = 0
+    a = 0
+    pushed_a = False
+    parts = []
+    n = len(txt)
+    for token in ARG_TOKEN_PATTERN.finditer(txt):
+        char, i = token.group(), token.start()
+        if char == ',':
+            if (quote is None) and (brace is None):
+                if not pushed_a:
+                    parts.append(txt[a:i])
+                else:
+                    pushed_a = False
+                a = i + 1
+        elif (char == '{') and (quote is None):
+            if brace is None:
+                brace = '{'
+                a = i
+            brace_d += 1
+        elif (char == '}') and (quote is None):
+            if brace_d > 0:
+                brace_d -= 1
+            if brace_d == 0:
+                parts.append(txt[a:i+1])
+                pushed_a = True
+                brace = None
+                brace_d = 0
+                a = i + 1
+        elif (char == '"') and (brace is None):
+            if (quote is None):
+                quote = '"'
+                a = i + 1
+            else:
+                parts.append(txt[a:i])
+                pushed_a = True
+                quote = None
+                a = i + 1
+        elif token.end() == n:
+            if not pushed_a:
+                parts.append(txt[a:n])
+                pushed_a = True
+    if (quote is not None) or (brace is not None):
+        raise SyntaxError()
+    return [part.strip() for part in parts]
 
 
 class HBNBCommand(cmd.Cmd):
@@ -29,32 +168,12 @@ class HBNBCommand(cmd.Cmd):
         Returns:
             str: The next line of command to execute.
         """
-        patterns = (
-            r'(?P<class>[a-zA-Z]+)',
-            r'(?P<command>[a-zA-Z]+)',
-            r'(?P<args_txt>.*)',
-        )
-        cls_fxn_fmt = r'{}\s*\.\s*{}\s*\({}\)'.format(
-            patterns[0], patterns[1], patterns[2]
-        )
-        cls_fxn_match = re.fullmatch(cls_fxn_fmt, line)
-        if cls_fxn_match is not None:
-            class_name = cls_fxn_match.group('class')
-            command_name = cls_fxn_match.group('command')
-            args_txt = cls_fxn_match.group('args_txt').strip()
-            args = None
-            cmd_line_parts = []
-            try:
-                args = self.split_func_args(args_txt)
-                cmd_line_parts.append(command_name)
-                cmd_line_parts.append(class_name)
-                for arg in args:
-                    cmd_line_parts.append('"{}"'.format(arg))
-                return ' '.join(cmd_line_parts)
-            except Exception:
-                return line
+        next_line, args = parse_command(line)
+        if args is None:
+            self.__parsed = None
         else:
-            return line
+            self.__parsed = (next_line.partition(' ')[2], args)
+        return next_line
 
     def postcmd(self, stop, line):
         """Runs some actions after a line of command is executed.
@@ -70,63 +189,139 @@ class HBNBCommand(cmd.Cmd):
             print('(hbnb) ', end='')
         return stop
 
-    def split_func_args(self, args_txt):
-        """Splits a function argument section into its arguments.
+    def split_args(self, line):
+        """Splits the arguments of a command, which are taken as they
+        were parsed if the command was called as a method of a class.
 
         Args:
-            args_txt (str): The function argument section.
+            line (str): The arguments of the command.
+
+        Raises:
+            ValueError: If a quotation isn't closed.
 
         Returns:
-            list: The list of arguments.
+            list: The arguments.
         """
-        txt = args_txt.strip()
-        quote = None
-        brace = None
-        brace_d = 0
-        a = 0
-        char_p = None
-        pushed_a = False
-        parts = []
-        n = len(txt)
-        for i in range(n):
-            if txt[i] == ',':
-                if (quote is None) and (brace is None):
-                    if not pushed_a:
-                        parts.append(txt[a:i])
-                    else:
-                        pushed_a = False
-                    a = i + 1
-            elif (txt[i] == '{') and (quote is None):
-                if brace is None:
-                    brace = '{'
-                    a = i
-                brace_d += 1
-            elif (txt[i] == '}') and (quote is None):
-                if brace_d > 0:
-                    brace_d -= 1
-                if brace_d == 0:
-                    parts.append(txt[a:i+1])
-                    pushed_a = True
-                    brace = None
-                    brace_d = 0
-                    a = i + 1
-            elif (txt[i] == '"') and (brace is None):
-                if (quote is None):
-                    quote = '"'
-                    a = i + 1
-                else:
-                    parts.append(txt[a:i])
-                    pushed_a = True
-                    quote = None
-                    a = i + 1
-            elif i == n - 1:
-                if not pushed_a:
-                    parts.append(txt[a: i if txt[i] == ',' else n])
-                    pushed_a = True
-        if (quote is not None) or (brace is not None):
-            raise SyntaxError()
-        parts = list(map(lambda x: x.strip(), parts))
-        return parts
+        parsed = getattr(self, '_HBNBCommand__parsed', None)
+        if (parsed is not None) and (parsed[0] == line):
+            return list(parsed[1])
+        return list(split_line(line))
+
+    def split_options(self, args, flags=(), value_options=()):
+        """Separates the options of a command from its other arguments.
+        An option with a value is written as --<name>=<value> or
+        --<name> <value>.
+
+        Args:
+            args (list): The arguments of the command.
+            flags (Iterable): The names of the options without a value.
+            value_options (Iterable): The names of the options with a
+            value.
+
+        Raises:
+            ValueError: If an option is unknown or its value is missing.
+
+        Returns:
+            tuple: The other arguments, and a dictionary of the options
+            that were given, whose values are True for the flags.
+        """
+        other_args = []
+        options = {}
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            i += 1
+            if not arg.startswith('--'):
+                other_args.append(arg)
+                continue
+            name, equals, value = arg[2:].partition('=')
+            if (name in flags) and (equals == ''):
+                options[name] = True
+            elif name not in value_options:
+                raise ValueError(arg)
+            elif equals != '':
+                options[name] = value
+            elif i < len(args):
+                options[name] = args[i]
+                i += 1
+            else:
+                raise ValueError(arg)
+        return other_args, options
+
+    def print_list(self, items):
+        """Prints a list of items the way print does, but writes them in
+        chunks as they are generated instead of building the list.
+
+        Args:
+            items (Iterable): The items.
+        """
+        chunk = ['[']
+        separator = ''
+        for item in items:
+            chunk.append(separator)
+            chunk.append(repr(item))
+            separator = ', '
+            if len(chunk) >= 2 * OUTPUT_CHUNK_SIZE:
+                sys.stdout.write(''.join(chunk))
+                chunk = []
+        chunk.append(']\n')
+        sys.stdout.write(''.join(chunk))
+
+    def print_json_lines(self, items):
+        """Prints some items as JSON Lines, which are written in chunks
+        as they are generated.
+
+        Args:
+            items (Iterable): The items, which must be serializable.
+        """
+        encode = json.JSONEncoder().encode
+        chunk = []
+        for item in items:
+            chunk.append(encode(item))
+            chunk.append('\n')
+            if len(chunk) >= 2 * OUTPUT_CHUNK_SIZE:
+                sys.stdout.write(''.join(chunk))
+                chunk = []
+        sys.stdout.write(''.join(chunk))
+
+    def print_related(self, line, name):
+        """Prints the instances related to an instance of a class with a
+        given id.
+
+        Args:
+            line (str): The arguments of the command.
+            name (str): The name of the relationship.
+        """
+        args = []
+        try:
+            args = self.split_args(line)
+        except Exception:
+            print('*** Unknown syntax: {}'.format(line))
+            return
+        class_name = args[0] if len(args) >= 1 else None
+        obj_id = args[1] if len(args) >= 2 else None
+        if class_name is None:
+            print("** class name missing **")
+            return
+        if class_name not in storage.model_classes.keys():
+            print("** class doesn't exist **")
+            return
+        relationships = [
+            r for r in RELATIONSHIPS if (r[0] == class_name) and (r[1] == name)
+        ]
+        if len(relationships) == 0:
+            print('*** Unknown syntax: {} {}'.format(name, line))
+            return
+        if obj_id is None:
+            print("** instance id missing **")
+            return
+        if storage.get(class_name, obj_id) is None:
+            print("** no instance found **")
+            return
+        _, _, child_name, attr = relationships[0]
+        self.print_list(
+            str(obj) for obj in storage.related(child_name, attr, obj_id)
+        )
 
     def emptyline(self):
         """Executes some actions when the command line is empty.
@@ -142,35 +337,121 @@ class HBNBCommand(cmd.Cmd):
         """
         exit(0)
 
+    def do_aggregate(self, line):
+        """Prints aggregates of the attributes of the instances of a
+        class, optionally grouped by the value of an attribute.
+        Usage: aggregate <class name> <aggregate> [<aggregate>]...
+                   [--by <attr>] [--jsonl]
+               <aggregate> is count, sum(<attr>), avg(<attr>),
+                   min(<attr>), or max(<attr>), which only count the
+                   attributes that are numbers
+               --by computes the aggregates for each value of an attribute
+               --jsonl prints the results as JSON Lines
+        """
+        args = []
+        try:
+            args, options = self.split_options(
+                self.split_args(line), ('jsonl',), ('by',)
+            )
+        except Exception:
+            print('*** Unknown syntax: {}'.format(line))
+            return
+        class_name = args[0] if len(args) >= 1 else None
+        if class_name is None:
+            print("** class name missing **")
+            return
+        if class_name not in storage.model_classes.keys():
+            print("** class doesn't exist **")
+            return
+        if len(args) < 2:
+            print("** aggregate missing **")
+            return
+        try:
+            results = storage.aggregate(
+                class_name, args[1:], options.get('by', None)
+            )
+        except ValueError as error:
+            print('** {} **'.format(error))
+            return
+        if options.get('jsonl', False):
+            self.print_json_lines(results)
+        else:
+            self.print_list(results)
+
     def do_all(self, line):
         """Prints all instances of a class or all classes.
-        Usage: all [<class name>]
+        Usage: all [<class name>] [--jsonl] [--offset <n>] [--limit <n>]
+               --jsonl prints the serialized instances as JSON Lines
+               --offset skips the first n instances
+               --limit prints at most n instances
         """
         args = []
         try:
-            args = shlex.split(line)
+            args, options = self.split_options(
+                self.split_args(line), ('jsonl',), ('offset', 'limit')
+            )
+            start = int(options.get('offset', 0))
+            stop = options.get('limit', None)
+            if stop is not None:
+                stop = start + int(stop)
+            if (start < 0) or ((stop is not None) and (stop < start)):
+                raise ValueError(line)
         except Exception:
             print('*** Unknown syntax: {}'.format(line))
             return
         class_name = args[0] if len(args) >= 1 else ''
         if (class_name in storage.model_classes.keys()) or (class_name == ''):
-            all_class_objs = []
-            for obj in storage.all().values():
-                if class_name == '':
-                    all_class_objs.append(str(obj))
-                elif type(obj) is storage.model_classes[class_name]:
-                    all_class_objs.append(str(obj))
-            print(all_class_objs)
+            if options.get('jsonl', False):
+                self.print_json_lines(
+                    islice(storage.records(class_name or None), start, stop)
+                )
+            else:
+                self.print_list(
+                    islice(storage.strings(class_name or None), start, stop)
+                )
         else:
             print("** class doesn't exist **")
 
+    def do_batch(self, line):
+        """Runs the commands in a file as a single batch, which is saved
+        once at the end. A quit or EOF command ends the batch early.
+        Usage: batch <file path>
+        """
+        args = []
+        try:
+            args = self.split_args(line)
+        except Exception:
+            print('*** Unknown syntax: {}'.format(line))
+            return
+        file_path = args[0] if len(args) >= 1 else None
+        if file_path is None:
+            print("** file path missing **")
+            return
+        if not os.path.isfile(file_path):
+            print("** file doesn't exist **")
+            return
+        with open(file_path, mode='r') as file:
+            with storage.batch():
+                for cmd_line in file:
+                    cmd_line = cmd_line.strip()
+                    if cmd_line in ('quit', 'EOF'):
+                        break
+                    if (cmd_line != '') and not cmd_line.startswith('#'):
+                        self.onecmd(self.precmd(cmd_line))
+
+    def do_cities(self, line):
+        """Prints all the cities in a state with a given id.
+        Usage: cities State <id>
+        """
+        self.print_related(line, 'cities')
+
     def do_count(self, line):
         """Prints the number of instances of a class.
         Usage: count <class name>
         """
         args = []
         try:
-            args = shlex.split(line)
+            args = self.split_args(line)
         except Exception:
             print('*** Unknown syntax: {}'.format(line))
             return
@@ -179,11 +460,7 @@ class HBNBCommand(cmd.Cmd):
             print("** class name missing **")
             return
         if class_name in storage.model_classes.keys():
-            n = 0
-            for obj in storage.all().values():
-                if type(obj) is storage.model_classes[class_name]:
-                    n += 1
-            print(n)
+            print(storage.count(class_name))
         else:
             print("** class doesn't exist **")
 
@@ -193,7 +470,7 @@ class HBNBCommand(cmd.Cmd):
         """
         args = []
         try:
-            args = shlex.split(line)
+            args = self.split_args(line)
         except Exception:
             print('*** Unknown syntax: {}'.format(line))
             return
@@ -204,8 +481,12 @@ class HBNBCommand(cmd.Cmd):
         if class_name not in storage.model_classes.keys():
             print("** class doesn't exist **")
             return
-        new_obj = storage.model_classes[class_name]()
-        new_obj.save()
+        try:
+            new_obj = storage.model_classes[class_name]()
+            new_obj.save()
+        except io.UnsupportedOperation:
+            print('** storage is read-only **')
+            return
         print(new_obj.id)
 
     def do_destroy(self, line):
@@ -214,13 +495,12 @@ class HBNBCommand(cmd.Cmd):
         """
         args = []
         try:
-            args = shlex.split(line)
+            args = self.split_args(line)
         except Exception:
             print('*** Unknown syntax: {}'.format(line))
             return
         class_name = args[0] if len(args) >= 1 else None
         obj_id = args[1] if len(args) >= 2 else None
-        obj_store_id = None
         if class_name is None:
             print("** class name missing **")
             return
@@ -230,16 +510,148 @@ class HBNBCommand(cmd.Cmd):
         if obj_id is None:
             print("** instance id missing **")
             return
-        for id, obj in storage.all().items():
-            if type(obj) is storage.model_classes[class_name]:
-                if obj.id == obj_id:
-                    obj_store_id = id
-                    break
-        if obj_store_id is None:
+        obj = storage.get(class_name, obj_id)
+        if obj is None:
             print("** no instance found **")
         else:
-            storage.all().pop(obj_store_id)
-            storage.save()
+            try:
+                storage.delete(obj)
+                storage.save()
+            except io.UnsupportedOperation:
+                print('** storage is read-only **')
+
+    def do_export(self, line):
+        """Writes the instances of a class to a CSV, JSON Lines, or
+        columnar file.
+        Usage: export <class name> <file path> [--format <format>]
+                   [--columns <attr>[,...]] [--where <predicate>[,...]]
+               --format is csv, jsonl, or columnar, otherwise it is given
+                   by the extension of the file (.columnar for columnar)
+               --columns writes only the given attributes
+               --where writes only the instances that match the
+                   predicates, which are written as in the query command
+        """
+        args = []
+        try:
+            args, options = self.split_options(
+                self.split_args(line), (), ('format', 'columns', 'where')
+            )
+            attrs = options.get('columns', None)
+            if attrs is not None:
+                attrs = [attr.strip() for attr in attrs.split(',')]
+                if not all(attr.isidentifier() for attr in attrs):
+                    raise ValueError(line)
+            predicates = split_predicates(options.get('where', ''))
+        except Exception:
+            print('*** Unknown syntax: {}'.format(line))
+            return
+        class_name = args[0] if len(args) >= 1 else None
+        file_path = args[1] if len(args) >= 2 else None
+        if class_name is None:
+            print("** class name missing **")
+            return
+        if class_name not in storage.model_classes.keys():
+            print("** class doesn't exist **")
+            return
+        if file_path is None:
+            print("** file path missing **")
+            return
+        start = time.perf_counter()
+        try:
+            n = storage.export_file(
+                class_name, file_path, options.get('format', None), attrs,
+                predicates
+            )
+        except (OSError, ValueError) as error:
+            print('** {} **'.format(error))
+            return
+        seconds = time.perf_counter() - start
+        print('{} objects exported in {:.2f}s ({:.0f} rows/s)'.format(
+            n, seconds, n / seconds if seconds > 0 else 0
+        ))
+
+    def do_import(self, line):
+        """Creates instances of a class from the rows of a CSV or JSON
+        Lines file, which are saved once at the end. Nothing is created if
+        a row is invalid.
+        Usage: import <class name> <file path>
+        """
+        args = []
+        try:
+            args = self.split_args(line)
+        except Exception:
+            print('*** Unknown syntax: {}'.format(line))
+            return
+        class_name = args[0] if len(args) >= 1 else None
+        file_path = args[1] if len(args) >= 2 else None
+        if class_name is None:
+            print("** class name missing **")
+            return
+        if class_name not in storage.model_classes.keys():
+            print("** class doesn't exist **")
+            return
+        if file_path is None:
+            print("** file path missing **")
+            return
+        if not os.path.isfile(file_path):
+            print("** file doesn't exist **")
+            return
+        start = time.perf_counter()
+        try:
+            n = storage.import_file(class_name, file_path)
+        except ValueError as error:
+            print('** {} **'.format(error))
+            return
+        seconds = time.perf_counter() - start
+        print('{} objects imported in {:.2f}s ({:.0f} rows/s)'.format(
+            n, seconds, n / seconds if seconds > 0 else 0
+        ))
+
+    def do_places(self, line):
+        """Prints all the places in a city or owned by a user with a
+        given id.
+        Usage: places City <id>
+               places User <id>
+        """
+        self.print_related(line, 'places')
+
+    def do_query(self, line):
+        """Prints the instances of a class that match some predicates.
+        Usage: query <class name>.<method>(<args>)[.<method>(<args>)]...
+               where(<attr><op><value>[, ...]), <op> is one of ==, !=, <,
+                   <=, >, and >=
+               near(<latitude>, <longitude>, <km>)
+               within(<south>, <west>, <north>, <east>)
+               select(<attr>[, ...])
+               order_by([-]<attr>)
+               offset(<n>)
+               limit(<n>)
+               count(), which has to be the last method
+               --jsonl, after the methods, prints the serialized instances
+                   or the selected attributes as JSON Lines
+        """
+        jsonl = False
+        if re.search(r'\s--jsonl\s*$', line) is not None:
+            jsonl = True
+            line = line.rstrip()[:-len('--jsonl')].rstrip()
+        class_name = line.partition('.')[0].strip()
+        if class_name == '':
+            print("** class name missing **")
+            return
+        if class_name not in storage.model_classes.keys():
+            print("** class doesn't exist **")
+            return
+        try:
+            query, counted = parse_query(line)
+        except ValueError:
+            print('*** Unknown syntax: {}'.format(line))
+            return
+        if counted:
+            print(query.count())
+        elif jsonl:
+            self.print_json_lines(query.rows(serialized=True))
+        else:
+            self.print_list(query.rows())
 
     def do_quit(self, line):
         """Exits the console.
@@ -247,13 +659,47 @@ class HBNBCommand(cmd.Cmd):
         """
         exit(0)
 
+    def do_reviews(self, line):
+        """Prints all the reviews of a place or written by a user with a
+        given id.
+        Usage: reviews Place <id>
+               reviews User <id>
+        """
+        self.print_related(line, 'reviews')
+
+    def do_search(self, line):
+        """Prints the instances of a class whose text matches a text,
+        starting with the best match.
+        Usage: search <class name> <text>
+        """
+        args = []
+        try:
+            args = self.split_args(line)
+        except Exception:
+            print('*** Unknown syntax: {}'.format(line))
+            return
+        class_name = args[0] if len(args) >= 1 else None
+        text = ' '.join(args[1:])
+        if class_name is None:
+            print("** class name missing **")
+            return
+        if class_name not in storage.model_classes.keys():
+            print("** class doesn't exist **")
+            return
+        if text.strip() == '':
+            print("** search text missing **")
+            return
+        self.print_list(
+            str(obj) for _, obj in storage.search(class_name, text)
+        )
+
     def do_show(self, line):
         """Prints an instance of a class with a given id.
         Usage: show <class name> <id>
         """
         args = []
         try:
-            args = shlex.split(line)
+            args = self.split_args(line)
         except Exception:
             print('*** Unknown syntax: {}'.format(line))
             return
@@ -268,12 +714,11 @@ class HBNBCommand(cmd.Cmd):
         if obj_id is None:
             print("** instance id missing **")
             return
-        for obj in storage.all().values():
-            if type(obj) is storage.model_classes[class_name]:
-                if obj.id == obj_id:
-                    print(obj)
-                    return
-        print("** no instance found **")
+        obj = storage.get(class_name, obj_id)
+        if obj is None:
+            print("** no instance found **")
+        else:
+            print(obj)
 
     def do_update(self, line):
         """Updates an instance of a class with a given id.
@@ -282,7 +727,7 @@ class HBNBCommand(cmd.Cmd):
         """
         args = []
         try:
-            args = shlex.split(line)
+            args = self.split_args(line)
         except Exception:
             print('*** Unknown syntax: {}'.format(line))
             return
@@ -291,7 +736,6 @@ class HBNBCommand(cmd.Cmd):
         obj_id = args[1] if len(args) >= 2 else None
         attr_name = args[2] if len(args) >= 3 else None
         attr_value = args[3] if len(args) >= 4 else None
-        obj = None
         if class_name is None:
             print("** class name missing **")
             return
@@ -301,35 +745,49 @@ class HBNBCommand(cmd.Cmd):
         if obj_id is None:
             print("** instance id missing **")
             return
-        for store_obj in storage.all().values():
-            if type(store_obj) is storage.model_classes[class_name]:
-                if store_obj.id == obj_id:
-                    obj = store_obj
-                    break
+        obj = storage.get(class_name, obj_id)
         if obj is None:
             print("** no instance found **")
             return
         try:
             dict_src = eval(attr_name)
-            if type(dict_src) is dict:
-                for key, value in dict_src.items():
-                    if key not in ignored_attrs:
-                        attr_type = type(getattr(obj.__class__, key, ''))
-                        setattr(obj, key, attr_type(value))
-                obj.save()
-            else:
-                raise TypeError()
         except Exception:
-            if attr_name is None:
+            dict_src = None
+        try:
+            # the values are checked before the object is changed
+            if type(dict_src) is dict:
+                changes = {
+                    key: coerce_attribute(obj.__class__, key, value)
+                    for key, value in dict_src.items()
+                    if key not in ignored_attrs
+                }
+            elif attr_name is None:
                 print("** attribute name missing **")
                 return
-            if attr_value is None:
+            elif attr_value is None:
                 print("** value missing **")
                 return
-            if attr_name not in ignored_attrs:
-                attr_type = type(getattr(obj.__class__, attr_name, ''))
-                setattr(obj, attr_name, attr_type(attr_value))
-                obj.save()
+            elif attr_name in ignored_attrs:
+                return
+            else:
+                changes = {attr_name: coerce_attribute(
+                    obj.__class__, attr_name, attr_value
+                )}
+        except ValueError as error:
+            print('** {} **'.format(error))
+            return
+        previous_attrs = dict(obj._attributes())
+        try:
+            for key, value in changes.items():
+                setattr(obj, key, value)
+            obj.save()
+        except io.UnsupportedOperation:
+            # the storage may hold on to the object, so it's restored
+            for name in list(obj._attributes().keys()):
+                delattr(obj, name)
+            for name, value in previous_attrs.items():
+                setattr(obj, name, value)
+            print('** storage is read-only **')
 
 
 if __name__ == '__main__':
@@ -1,10 +1,65 @@
 #!/usr/bin/python3
 """Modules for working with data sets.
 """
-from models.engine.file_storage import FileStorage
+import atexit
+import os
+import sys
 
+from models.engine.deferred_storage import DeferredStorage
 
-storage = FileStorage()
-"""A unique FileStorage instance for all models.
+
+def print_load_progress(n, bytes_read, file_size):
+    """Prints the progress of loading the stored objects to stderr.
+
+    Args:
+        n (int): The number of objects loaded.
+        bytes_read (int): The number of bytes read.
+        file_size (int): The size of the storage file.
+    """
+    percent = 100 * bytes_read // file_size if file_size > 0 else 100
+    end = '\n' if bytes_read >= file_size else ''
+    print(
+        '\r** loaded {} objects ({}%) **'.format(n, percent),
+        end=end,
+        file=sys.stderr
+    )
+
+
+def create_storage():
+    """Creates the storage engine picked by the HBNB_TYPE_STORAGE
+    environment variable and loads the stored objects.
+
+    Returns:
+        FileStorage|ShardedStorage|DBStorage|MmapStorage: The storage.
+    """
+    storage_type = os.getenv('HBNB_TYPE_STORAGE', 'file')
+    reload_options = {}
+    if os.getenv('HBNB_LOAD_PROGRESS', '0') == '1':
+        reload_options['progress'] = print_load_progress
+    if storage_type == 'db':
+        from models.engine.db_storage import DBStorage
+        engine = DBStorage()
+    elif storage_type == 'mmap':
+        from models.engine.mmap_storage import MmapStorage
+        engine = MmapStorage()
+    elif storage_type == 'sharded':
+        from models.engine.sharded_storage import ShardedStorage
+        engine = ShardedStorage()
+        if os.getenv('HBNB_LOAD_CLASSES', None) is not None:
+            reload_options['classes'] = [
+                cls_name
+                for cls_name in os.getenv('HBNB_LOAD_CLASSES').split(',')
+                if cls_name != ''
+            ]
+    else:
+        from models.engine.file_storage import FileStorage
+        engine = FileStorage()
+    engine.reload(**reload_options)
+    return engine
+
+
+storage = DeferredStorage(create_storage)
+"""A unique storage instance for all models, which is created and loaded
+when it is first used, and closed when the interpreter exits.
 """
-storage.reload()
+atexit.register(storage.close)
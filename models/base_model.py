@@ -5,11 +5,120 @@ from datetime import datetime
 from uuid import uuid4
 
 
-class BaseModel:
-    """Represents the base class for all data sets.
+class _State:
+    """Represents what has happened to a model instance since its
+    attributes were last set or removed.
     """
+    __slots__ = ('persisted', 'string', 'record')
+
+    def __init__(self):
+        """Initializes a new _State.
+        """
+        self.persisted = False
+        self.string = None
+        self.record = None
+
+
+__read_only_attributes = dict()
+"""The names of the read-only properties of the model classes.
+"""
+
+
+def read_only_attributes(cls):
+    """Retrieves the names of the properties of a model class that can't
+    be set, such as its relationships, which are left out when an
+    instance is created from stored attributes.
+
+    Args:
+        cls (type): The model class.
+
+    Returns:
+        frozenset: The names of the properties without a setter.
+    """
+    names = __read_only_attributes.get(cls, None)
+    if names is None:
+        names = frozenset(
+            name for base in cls.__mro__ for name, value in vars(base).items()
+            if isinstance(value, property) and (value.fset is None)
+        )
+        __read_only_attributes[cls] = names
+    return names
+
+
+class ModelType(type):
+    """Represents the type of the model classes, which counts the compact
+    variant of a model class as a subclass of the model class.
+    """
+
+    def __instancecheck__(cls, instance):
+        """Checks if an object is an instance of a model class.
+
+        Args:
+            instance (any): The object.
+
+        Returns:
+            bool: True if the object is an instance of the class or of a
+            compact variant of the class or of one of its subclasses.
+        """
+        return cls.__subclasscheck__(type(instance))
+
+    def __subclasscheck__(cls, subclass):
+        """Checks if a class is a subclass of a model class.
+
+        Args:
+            subclass (type): The class.
+
+        Returns:
+            bool: True if the class is a subclass of the model class or
+            the compact variant of one.
+        """
+        if type.__subclasscheck__(cls, subclass):
+            return True
+        model_class = getattr(subclass, '_model_class', None)
+        return (model_class is not None) and \
+            type.__subclasscheck__(cls, model_class)
+
+
+class DefaultList:
+    """Represents the default value of a list attribute of a model class,
+    which is a new empty list that an instance keeps once it's read, so
+    that mutating it changes the attribute of that instance only.
+    """
+
+    def __set_name__(self, owner, name):
+        """Records the name of the attribute.
+
+        Args:
+            owner (type): The model class.
+            name (str): The name of the attribute.
+        """
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        """Retrieves the default value, which is stored on the instance
+        without marking it as changed.
+
+        Args:
+            instance (BaseModel): The instance, or None for the class.
+            owner (type): The model class.
+
+        Returns:
+            list: An empty list.
+        """
+        value = []
+        if instance is not None:
+            instance.__dict__[self.name] = value
+        return value
+
+
+class Model(metaclass=ModelType):
+    """Represents the behaviour that all data sets share, which doesn't
+    store any attribute besides the state of the instance.
+    """
+    __slots__ = ('__weakref__', '__state')
+
     def __init__(self, *args, **kwargs):
-        """Initializes a new instance of the BaseModel.
+        """Initializes a new instance of the Model.
 
         Args:
             *args (tuple): Ignored.
@@ -17,8 +126,9 @@ class BaseModel:
         """
         from models import storage
         if len(kwargs) > 0:
+            read_only = read_only_attributes(self.__class__)
             for key, value in kwargs.items():
-                if key != '__class__':
+                if (key != '__class__') and (key not in read_only):
                     if key in ('created_at', 'updated_at'):
                         setattr(self, key, datetime.fromisoformat(value))
                     else:
@@ -31,36 +141,135 @@ class BaseModel:
             storage.new(self)
 
     def __str__(self):
-        """Creates a string representation of a BaseModel instance.
+        """Creates a string representation of a model instance,
+        which is kept until an attribute is set or removed.
 
         Returns:
-            str: A string representation of a BaseModel instance.
+            str: A string representation of a model instance.
         """
-        res = '[{}] ({}) {}'.format(
-            self.__class__.__name__,
-            self.id,
-            self.__dict__
-        )
-        return res
+        state = self.__current_state()
+        if state.string is None:
+            state.string = '[{}] ({}) {}'.format(
+                self.__class__.__name__,
+                self.id,
+                self._attributes()
+            )
+        return state.string
 
     def save(self):
-        """Saves the changes made to this BaseModel instance.
+        """Saves the changes made to this model instance.
         """
         from models import storage
         self.updated_at = datetime.now()
+        storage.mark_changed(self)
         storage.save()
 
     def to_dict(self):
-        """Returns a dictionary consisting of this BaseModel instance's
+        """Returns a dictionary consisting of this model instance's
         attibute keys and values.
 
-        Returns: A dictionary of the attribute key-value pairs.
+        Returns: A dictionary of the attribute key-value pairs, which is
+        a copy of the one that is kept until an attribute is set or
+        removed.
+        """
+        state = self.__current_state()
+        if state.record is None:
+            res = {}
+            for key, value in self._attributes().items():
+                if isinstance(value, datetime):
+                    res[key] = value.isoformat()
+                else:
+                    res[key] = value
+            res['__class__'] = self.__class__.__name__
+            state.record = res
+        return dict(state.record)
+
+    def __setattr__(self, name, value):
+        """Sets an attribute of this instance, which marks it as changed
+        and discards its cached representations.
+
+        Args:
+            name (str): The name of the attribute.
+            value (any): The value of the attribute.
+        """
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, '_Model__state', None)
+
+    def __delattr__(self, name):
+        """Removes an attribute of this instance, which marks it as
+        changed and discards its cached representations.
+
+        Args:
+            name (str): The name of the attribute.
+        """
+        object.__delattr__(self, name)
+        object.__setattr__(self, '_Model__state', None)
+
+    def _is_changed(self):
+        """Checks if this instance has changed since it was last
+        persisted. Attributes have to be assigned, rather than mutated in
+        place, for a change to be noticed, which also holds for the cached
+        representations of this instance.
+
+        Returns:
+            bool: True if this instance has changed, otherwise False.
+        """
+        state = getattr(self, '_Model__state', None)
+        return (state is None) or not state.persisted
+
+    def _mark_persisted(self):
+        """Marks this instance as unchanged after it has been persisted.
+        """
+        self.__current_state().persisted = True
+
+    def __current_state(self):
+        """Retrieves the state of this instance since its attributes
+        were last set or removed, which is created when it is needed.
+
+        Returns:
+            _State: The state.
+        """
+        state = getattr(self, '_Model__state', None)
+        if state is None:
+            state = _State()
+            object.__setattr__(self, '_Model__state', state)
+        return state
+
+    def _attributes(self):
+        """Retrieves the attributes that have been set on this instance,
+        which are the public slots that hold a value and the entries of
+        the dictionary of the instance if it has one.
+
+        Returns:
+            dict: The attribute names and their values.
+        """
+        attrs = {}
+        for cls in reversed(self.__class__.__mro__):
+            slots = cls.__dict__.get('__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name.startswith('_'):
+                    continue
+                try:
+                    attrs[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    pass
+        try:
+            attrs.update(object.__getattribute__(self, '__dict__'))
+        except AttributeError:
+            pass
+        return attrs
+
+
+class BaseModel(Model):
+    """Represents the base class for all data sets, which keeps the
+    attributes of an instance in a dictionary.
+    """
+    __slots__ = ('__dict__',)
+
+    def _attributes(self):
+        """Retrieves the attributes that have been set on this instance.
+
+        Returns:
+            dict: The attribute names and their values.
         """
-        res = {}
-        for key, value in self.__dict__.items():
-            if isinstance(value, datetime):
-                res[key] = value.isoformat()
-            else:
-                res[key] = value
-        res['__class__'] = self.__class__.__name__
-        return res
+        return self.__dict__
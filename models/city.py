@@ -9,3 +9,10 @@ class City(BaseModel):
     """
     state_id = ''
     name = ''
+
+    @property
+    def places(self):
+        """The places in this city.
+        """
+        from models import storage
+        return storage.related('Place', 'city_id', self.id)
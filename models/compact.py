@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+"""A module containing the compact representation of the models.
+"""
+from datetime import datetime
+
+from models.base_model import BaseModel, DefaultList, Model
+
+
+BASE_FIELDS = ('id', 'created_at', 'updated_at')
+"""The attributes that every model instance has.
+"""
+CLASS_ATTRS = ('__dict__', '__weakref__', '__slots__', '__module__',
+               '__qualname__', '__doc__')
+"""The attributes of a class that aren't copied to its compact variant.
+"""
+__compact_classes = dict()
+__schema_defaults = dict()
+
+
+class CompactModel:
+    """Represents the mixin that stores the declared attributes of a
+    model in slots and the other attributes in an overflow dictionary
+    that is only created when it is needed. The instances have no
+    dictionary of their own.
+    """
+    __slots__ = ()
+    compact_fields = ()
+    """The names of the slot-backed attributes.
+    """
+    schema_defaults = dict()
+    """The default values of the declared attributes.
+    """
+
+    def __getattr__(self, name):
+        """Retrieves an attribute that isn't in a slot.
+
+        Args:
+            name (str): The name of the attribute.
+
+        Returns:
+            any: The value of the attribute or its declared default.
+        """
+        extra = self.__overflow()
+        if (extra is not None) and (name in extra):
+            return extra[name]
+        defaults = self.__class__.schema_defaults
+        if name in defaults:
+            default = defaults[name]
+            if type(default) is list:
+                # each instance keeps a list of its own, as with DefaultList
+                default = list(default)
+                if name in self.__class__.compact_fields:
+                    object.__setattr__(self, name, default)
+            return default
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            self.__class__.__name__, name
+        ))
+
+    def __setattr__(self, name, value):
+        """Sets an attribute of this instance.
+
+        Args:
+            name (str): The name of the attribute.
+            value (any): The value of the attribute.
+        """
+        if (name in self.__class__.compact_fields) or name.startswith('_'):
+            super().__setattr__(name, value)
+        else:
+            extra = self.__overflow()
+            if extra is None:
+                extra = {}
+            extra[name] = value
+            super().__setattr__('_CompactModel__extra', extra)
+
+    def __delattr__(self, name):
+        """Removes an attribute of this instance.
+
+        Args:
+            name (str): The name of the attribute.
+        """
+        extra = self.__overflow()
+        if (extra is not None) and (name in extra):
+            del extra[name]
+            super().__setattr__('_CompactModel__extra', extra)
+        else:
+            super().__delattr__(name)
+
+    def _attributes(self):
+        """Retrieves the attributes that have been set on this instance.
+
+        Returns:
+            dict: The attribute names and their values.
+        """
+        attrs = {}
+        for name in self.__class__.compact_fields:
+            try:
+                attrs[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        extra = self.__overflow()
+        if extra is not None:
+            attrs.update(extra)
+        return attrs
+
+    def __overflow(self):
+        """Retrieves the dictionary of the attributes that aren't in a
+        slot.
+
+        Returns:
+            dict: The dictionary if it has been created, otherwise None.
+        """
+        try:
+            return object.__getattribute__(self, '_CompactModel__extra')
+        except AttributeError:
+            return None
+
+
+def schema_defaults(cls):
+    """Retrieves the attributes declared by a model class and its bases.
+    The compact variant of a class declares the same attributes as the
+    class, whose defaults are hidden by its slots.
+
+    Args:
+        cls (type): The model class.
+
+    Returns:
+        dict: The names of the declared attributes and their defaults,
+        which must not be changed.
+    """
+    defaults = __schema_defaults.get(cls, None)
+    if defaults is None:
+        defaults = {}
+        for base in reversed(getattr(cls, '_model_class', cls).__mro__):
+            for name, value in vars(base).items():
+                if name.startswith('_') or callable(value):
+                    continue
+                if isinstance(value, (property, classmethod, staticmethod)):
+                    continue
+                if isinstance(value, DefaultList):
+                    value = value.__get__(None, base)
+                defaults[name] = value
+        __schema_defaults[cls] = defaults
+    return defaults
+
+
+def compact_class(cls):
+    """Creates the compact variant of a model class. The variant has the
+    same name as the model class and counts as a subclass of it, but it
+    only derives from Model, so that its instances have no dictionary.
+
+    Args:
+        cls (type): The model class.
+
+    Returns:
+        type: The compact model class.
+    """
+    if issubclass(cls, CompactModel):
+        return cls
+    if cls not in __compact_classes:
+        defaults = schema_defaults(cls)
+        fields = BASE_FIELDS + tuple(
+            name for name in defaults.keys() if name not in BASE_FIELDS
+        )
+        namespace = {}
+        for base in reversed(cls.__mro__):
+            if base in BaseModel.__mro__:
+                continue
+            for name, value in vars(base).items():
+                if (name not in defaults) and (name not in CLASS_ATTRS):
+                    namespace[name] = value
+        namespace.update({
+            '__slots__': fields + ('_CompactModel__extra',),
+            '__module__': cls.__module__,
+            '__qualname__': cls.__qualname__,
+            '__doc__': cls.__doc__,
+            'compact_fields': fields,
+            'schema_defaults': defaults,
+            '_model_class': cls,
+        })
+        __compact_classes[cls] = type(cls)(
+            cls.__name__, (CompactModel, Model), namespace
+        )
+    return __compact_classes[cls]
@@ -0,0 +1,657 @@
+#!/usr/bin/python3
+"""A module containing the columns of the values of an attribute.
+"""
+import json
+import os
+import re
+import sys
+from array import array
+from operator import itemgetter
+
+from models.compact import schema_defaults
+
+
+COLUMNAR_MAGIC = b'HBNBCOL1'
+"""The bytes at the start and the end of the columnar files.
+"""
+COLUMNAR_VERSION = 1
+"""The version of the format of the columnar files.
+"""
+AGGREGATE_FUNCTIONS = ('count', 'sum', 'avg', 'min', 'max')
+"""The functions that aggregate the values of an attribute.
+"""
+AGGREGATE_PATTERN = re.compile(r'\s*([a-z]+)\s*(?:\(\s*(\w*)\s*\))?\s*')
+"""The pattern of an aggregate, such as count or avg(price_by_night).
+"""
+
+
+class Column:
+    """Represents the values of an attribute of some objects. The values
+    are kept in a typed array while they are all integers (int) or all
+    numbers (float), and as the codes of the distinct values (value)
+    otherwise, which is how the strings such as ids are kept.
+    """
+
+    def __init__(self):
+        """Initializes a new empty Column.
+        """
+        self.type = 'int'
+        """The type of the column, which is int, float, or value.
+        """
+        self.values = array('q')
+        """The numbers of a numeric column, or the codes of the values
+        in the dictionary of a value column.
+        """
+        self.dictionary = None
+        """The distinct values of a value column in the order of their
+        codes, or None for a numeric column.
+        """
+        self.__codes = None
+
+    def __len__(self):
+        """Counts the values in this column.
+
+        Returns:
+            int: The number of values.
+        """
+        return len(self.values)
+
+    def __getitem__(self, i):
+        """Retrieves a value of this column.
+
+        Args:
+            i (int): The position of the value.
+
+        Returns:
+            any: The value.
+        """
+        if self.dictionary is None:
+            return self.values[i]
+        return self.dictionary[self.values[i]]
+
+    def __iter__(self):
+        """Iterates over the values of this column.
+
+        Yields:
+            any: A value.
+        """
+        if self.dictionary is None:
+            yield from self.values
+        else:
+            dictionary = self.dictionary
+            for code in self.values:
+                yield dictionary[code]
+
+    def append(self, value):
+        """Adds a value to the end of this column, changing the type of
+        the column if the value doesn't fit in it.
+
+        Args:
+            value (any): The value, which must be serializable.
+        """
+        value_type = type(value)
+        if self.type == 'int':
+            if value_type is int:
+                try:
+                    self.values.append(value)
+                    return
+                except OverflowError:
+                    pass
+            elif value_type is float:
+                self.values = array('d', self.values)
+                self.type = 'float'
+        if (self.type == 'float') and (value_type in (int, float)):
+            try:
+                self.values.append(value)
+                return
+            except OverflowError:
+                pass
+        if self.dictionary is None:
+            self.__encode_values()
+        self.values.append(self.__code(value))
+
+    def extend(self, values):
+        """Adds some values to the end of this column. The values are
+        copied to the array at once if they are all numbers and the column
+        is empty.
+
+        Args:
+            values (Iterable): The values, which must be serializable.
+        """
+        values = list(values)
+        if len(self.values) == 0:
+            types = set(map(type, values))
+            for typecode, column_type, value_types in (
+                    ('q', 'int', {int}), ('d', 'float', {int, float})):
+                if types <= value_types:
+                    try:
+                        self.values = array(typecode, values)
+                        self.type = column_type
+                        self.dictionary = None
+                        return
+                    except OverflowError:
+                        pass
+            if types == {str}:
+                codes = {}
+                self.values = array('q', [
+                    codes.setdefault(value, len(codes)) for value in values
+                ])
+                self.type = 'value'
+                self.dictionary = list(codes)
+                self.__codes = None
+                return
+        for value in values:
+            self.append(value)
+
+    def set(self, i, value):
+        """Replaces a value of this column, changing the type of the
+        column if the value doesn't fit in it.
+
+        Args:
+            i (int): The position of the value.
+            value (any): The new value, which must be serializable.
+        """
+        value_type = type(value)
+        if ((value_type is int) and (self.dictionary is None)) or \
+                ((value_type is float) and (self.type == 'float')):
+            try:
+                self.values[i] = value
+                return
+            except OverflowError:
+                pass
+        self.append(value)
+        self.values[i] = self.values.pop()
+
+    def remove(self, i):
+        """Removes a value of this column by moving the last value in its
+        place.
+
+        Args:
+            i (int): The position of the value.
+        """
+        last = self.values.pop()
+        if i < len(self.values):
+            self.values[i] = last
+
+    def encode(self):
+        """Retrieves the codes of the values of this column in a
+        dictionary of the distinct values, which is created for a numeric
+        column.
+
+        Returns:
+            tuple: The codes of the values, and the values in the order of
+            their codes. The values that aren't in the column anymore may
+            remain in the dictionary of a value column.
+        """
+        if self.dictionary is not None:
+            return self.values, self.dictionary
+        codes = {}
+        dictionary = []
+        values = array('q')
+        for value in self.values:
+            code = codes.get(value, None)
+            if code is None:
+                code = codes[value] = len(dictionary)
+                dictionary.append(value)
+            values.append(code)
+        return values, dictionary
+
+    def dump(self, file):
+        """Writes the values of this column to a binary file.
+
+        Args:
+            file (BinaryIO): The file.
+
+        Returns:
+            dict: The description of the column, which is needed to read
+            it back.
+        """
+        self.values.tofile(file)
+        description = {
+            'type': self.type,
+            'typecode': self.values.typecode,
+            'size': len(self.values) * self.values.itemsize,
+        }
+        if self.dictionary is not None:
+            dictionary = json.dumps(self.dictionary).encode('utf-8')
+            file.write(dictionary)
+            description['dictionary_size'] = len(dictionary)
+        return description
+
+    @classmethod
+    def load(cls, file, description, swap=False):
+        """Reads a column that was written by dump.
+
+        Args:
+            file (BinaryIO): The file.
+            description (dict): The description of the column.
+            swap (bool): Whether the numbers were written with the other
+            byte order.
+
+        Raises:
+            ValueError: If the file ends before the column does.
+
+        Returns:
+            Column: The column.
+        """
+        column = cls()
+        column.type = description['type']
+        column.values = array(description['typecode'])
+        data = file.read(description['size'])
+        if len(data) != description['size']:
+            raise ValueError('Truncated column')
+        column.values.frombytes(data)
+        if swap:
+            column.values.byteswap()
+        if 'dictionary_size' in description:
+            column.dictionary = json.loads(
+                file.read(description['dictionary_size']).decode('utf-8')
+            )
+        return column
+
+    def __encode_values(self):
+        """Changes this column into a value column.
+        """
+        numbers = self.values
+        self.type = 'value'
+        self.values = array('q')
+        self.dictionary = []
+        self.__codes = {}
+        for number in numbers:
+            self.values.append(self.__code(number))
+
+    def __code(self, value):
+        """Retrieves the code of a value in the dictionary of this
+        column, adding the value if it isn't there.
+
+        Args:
+            value (any): The value.
+
+        Returns:
+            int: The code.
+        """
+        if self.__codes is None:
+            self.__codes = {
+                self.__key(v): code for code, v in enumerate(self.dictionary)
+            }
+        key = self.__key(value)
+        code = self.__codes.get(key, None)
+        if code is None:
+            code = self.__codes[key] = len(self.dictionary)
+            self.dictionary.append(value)
+        return code
+
+    @staticmethod
+    def __key(value):
+        """Creates the key of a value in the index of the codes of a
+        dictionary, which tells apart the values that are equal but of
+        different types, such as 1 and True.
+
+        Args:
+            value (any): The value.
+
+        Returns:
+            tuple: The key.
+        """
+        if isinstance(value, (list, dict)):
+            return type(value), json.dumps(value, sort_keys=True)
+        return type(value), value
+
+
+def parse_aggregate(aggregate):
+    """Parses an aggregate of the values of an attribute.
+
+    Args:
+        aggregate (str|tuple): The text of the aggregate, such as
+        'avg(price_by_night)' or 'count', or a tuple of the function and
+        the name of the attribute, which is None for count.
+
+    Raises:
+        ValueError: If the function is unknown or the attribute is
+        missing.
+
+    Returns:
+        tuple: The function and the name of the attribute.
+    """
+    if isinstance(aggregate, str):
+        match = AGGREGATE_PATTERN.fullmatch(aggregate)
+        if match is None:
+            raise ValueError('Invalid aggregate: {}'.format(aggregate))
+        function, attr = match.group(1), match.group(2) or None
+    else:
+        function, attr = aggregate
+    if (function not in AGGREGATE_FUNCTIONS) or \
+            ((attr is None) != (function == 'count')):
+        raise ValueError('Invalid aggregate: {}'.format(aggregate))
+    return function, attr
+
+
+def aggregate_name(function, attr):
+    """Creates the name of the result of an aggregate.
+
+    Args:
+        function (str): The function.
+        attr (str): The name of the attribute, which is None for count.
+
+    Returns:
+        str: The name, such as count or avg(price_by_night).
+    """
+    return function if attr is None else '{}({})'.format(function, attr)
+
+
+def aggregate_records(records, cls, aggregates, group_by=None):
+    """Aggregates some serialized records by putting their attributes in
+    columns, for the storage engines that don't keep the columns.
+
+    Args:
+        records (Iterable): The serialized records.
+        cls (type): The class of the objects.
+        aggregates (Iterable): The aggregates, in the forms accepted by
+        parse_aggregate.
+        group_by (str): The name of the attribute whose values group the
+        records. All the records are in one group if it is None.
+
+    Raises:
+        ValueError: If an aggregate is invalid.
+
+    Returns:
+        list: The results of the groups, in the form returned by
+        ColumnTable.aggregate.
+    """
+    aggregates = [parse_aggregate(aggregate) for aggregate in aggregates]
+    attrs = table_attributes(aggregates, group_by)
+    declared = schema_defaults(cls)
+    defaults = {attr: declared.get(attr, None) for attr in attrs}
+    table = ColumnTable()
+    for attr in attrs:
+        table.add_column(attr, ())
+    for i, record in enumerate(records):
+        table.update(i, lambda attr: record.get(attr, defaults[attr]))
+    return table.aggregate(aggregates, group_by)
+
+
+def table_attributes(aggregates, group_by=None):
+    """Determines the attributes that the columns are needed for to
+    compute some aggregates.
+
+    Args:
+        aggregates (list): The parsed aggregates.
+        group_by (str): The name of the attribute that groups the
+        objects, or None.
+
+    Returns:
+        list: The names of the attributes.
+    """
+    attrs = {} if group_by is None else {group_by: None}
+    for _, attr in aggregates:
+        if attr is not None:
+            attrs[attr] = None
+    return list(attrs)
+
+
+class ColumnTable:
+    """Represents some attributes of the objects of a class as columns,
+    whose rows are the objects. A row is removed by moving the last row
+    in its place, so the rows aren't in any particular order.
+    """
+
+    def __init__(self, keys=()):
+        """Initializes a new ColumnTable.
+
+        Args:
+            keys (Iterable): The keys of the objects in the rows.
+        """
+        self.columns = dict()
+        """The columns by the names of their attributes.
+        """
+        self.__keys = list(keys)
+        self.__rows = {key: row for row, key in enumerate(self.__keys)}
+        self.__groupings = dict()
+
+    def __len__(self):
+        """Counts the rows in this table.
+
+        Returns:
+            int: The number of rows.
+        """
+        return len(self.__keys)
+
+    def keys(self):
+        """Retrieves the keys of the objects in the order of the rows.
+
+        Returns:
+            list: The keys.
+        """
+        return list(self.__keys)
+
+    def add_column(self, attr, values):
+        """Adds the column of an attribute.
+
+        Args:
+            attr (str): The name of the attribute.
+            values (Iterable): The values of the attribute in the order of
+            the rows.
+        """
+        column = Column()
+        column.extend(values)
+        self.columns[attr] = column
+        self.__groupings.pop(attr, None)
+
+    def update(self, key, get):
+        """Adds the row of an object or replaces its values.
+
+        Args:
+            key (Hashable): The key of the object.
+            get (Callable): The function that retrieves the value of an
+            attribute of the object from its name.
+        """
+        self.__groupings.clear()
+        row = self.__rows.get(key, None)
+        if row is None:
+            self.__rows[key] = len(self.__keys)
+            self.__keys.append(key)
+            for attr, column in self.columns.items():
+                column.append(get(attr))
+        else:
+            for attr, column in self.columns.items():
+                column.set(row, get(attr))
+
+    def remove(self, key):
+        """Removes the row of an object if it is in this table.
+
+        Args:
+            key (Hashable): The key of the object.
+        """
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        self.__groupings.clear()
+        last_key = self.__keys.pop()
+        for column in self.columns.values():
+            column.remove(row)
+        if last_key != key:
+            self.__keys[row] = last_key
+            self.__rows[last_key] = row
+
+    def __grouping(self, attr):
+        """Groups the rows of this table by the values of an attribute.
+        The groups are kept until a row changes.
+
+        Args:
+            attr (str): The name of the attribute, which must have a
+            column.
+
+        Returns:
+            tuple: The values of the groups, and the rows of each group.
+            Some of the groups may be empty.
+        """
+        grouping = self.__groupings.get(attr, None)
+        if grouping is None:
+            codes, groups = self.columns[attr].encode()
+            group_rows = [[] for _ in range(len(groups))]
+            appends = [rows.append for rows in group_rows]
+            for row, code in enumerate(codes):
+                appends[code](row)
+            grouping = self.__groupings[attr] = (groups, group_rows)
+        return grouping
+
+    def aggregate(self, aggregates, group_by=None):
+        """Computes some aggregates of the rows of this table in groups.
+        The rows of each group are kept until a row changes, and the
+        numbers of each group are gathered from the arrays of the columns
+        and aggregated at once, while the other values are left out.
+
+        Args:
+            aggregates (list): The parsed aggregates, whose attributes
+            must have columns.
+            group_by (str): The name of the attribute whose column groups
+            the rows. All the rows are in one group if it is None.
+
+        Returns:
+            list: A dictionary for each group, which holds the value of
+            the grouping attribute and the results of the aggregates by
+            their names. The groups are sorted by their values if they
+            can be compared. If the rows aren't grouped, there is a single
+            dictionary, even if the table is empty. The average,
+            the minimum, and the maximum are None for a group without
+            numbers.
+        """
+        if group_by is None:
+            groups, group_rows = [None], [None]
+            counts = [len(self)]
+        else:
+            groups, group_rows = self.__grouping(group_by)
+            counts = [len(rows) for rows in group_rows]
+        numbers = {}
+        for function, attr in aggregates:
+            if (attr is not None) and (attr not in numbers):
+                column = self.columns[attr]
+                numbers[attr] = [
+                    column_numbers(column, rows) for rows in group_rows
+                ]
+        results = []
+        for code, group in enumerate(groups):
+            if (counts[code] == 0) and (group_by is not None):
+                continue
+            result = {} if group_by is None else {group_by: group}
+            for function, attr in aggregates:
+                if function == 'count':
+                    value = counts[code]
+                else:
+                    group_nums = numbers[attr][code]
+                    if function == 'sum':
+                        value = sum(group_nums)
+                    elif len(group_nums) == 0:
+                        value = None
+                    elif function == 'avg':
+                        value = sum(group_nums) / len(group_nums)
+                    else:
+                        value = min(group_nums) if function == 'min' \
+                            else max(group_nums)
+                result[aggregate_name(function, attr)] = value
+            results.append(result)
+        if group_by is not None:
+            try:
+                results.sort(key=lambda result: result[group_by])
+            except TypeError:
+                pass
+        return results
+
+
+def column_numbers(column, rows=None):
+    """Gathers the numbers of some rows of a column. The values that
+    aren't numbers are left out.
+
+    Args:
+        column (Column): The column.
+        rows (list): The rows, or None for all the rows.
+
+    Returns:
+        Sequence: The numbers.
+    """
+    if rows is None:
+        values = column.values
+    elif len(rows) > 1:
+        values = itemgetter(*rows)(column.values)
+    else:
+        values = [column.values[row] for row in rows]
+    if column.dictionary is None:
+        return values
+    numbers = []
+    for code in values:
+        value = column.dictionary[code]
+        if type(value) in (int, float):
+            numbers.append(value)
+    return numbers
+
+
+def dump_columns(file_path, cls_name, columns):
+    """Writes some columns to a columnar file, which replaces the file
+    atomically. The values of the columns are followed by a JSON footer
+    that describes them, so that the columns are written as they are.
+
+    Args:
+        file_path (str): The path to the file.
+        cls_name (str): The name of the class of the objects.
+        columns (dict): The columns by the names of their attributes.
+    """
+    tmp_path = '{}.{}.tmp'.format(file_path, os.getpid())
+    try:
+        with open(tmp_path, mode='wb') as file:
+            file.write(COLUMNAR_MAGIC)
+            descriptions = []
+            for name, column in columns.items():
+                description = column.dump(file)
+                description['name'] = name
+                descriptions.append(description)
+            footer = json.dumps({
+                'version': COLUMNAR_VERSION,
+                'class': cls_name,
+                'rows': max(map(len, columns.values()), default=0),
+                'byteorder': sys.byteorder,
+                'columns': descriptions,
+            }).encode('utf-8')
+            file.write(footer)
+            file.write(len(footer).to_bytes(8, 'little'))
+            file.write(COLUMNAR_MAGIC)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.isfile(tmp_path):
+            os.unlink(tmp_path)
+
+
+def load_columns(file_path):
+    """Reads the columns of a columnar file.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Raises:
+        OSError: If the file can't be read.
+        ValueError: If the file isn't a columnar file in the current
+        format.
+
+    Returns:
+        tuple: The name of the class of the objects, and the columns by
+        the names of their attributes.
+    """
+    magic_size = len(COLUMNAR_MAGIC)
+    with open(file_path, mode='rb') as file:
+        if file.read(magic_size) != COLUMNAR_MAGIC:
+            raise ValueError('Unsupported columnar file')
+        file.seek(-magic_size - 8, os.SEEK_END)
+        footer_size = int.from_bytes(file.read(8), 'little')
+        if file.read(magic_size) != COLUMNAR_MAGIC:
+            raise ValueError('Unsupported columnar file')
+        file.seek(-magic_size - 8 - footer_size, os.SEEK_END)
+        footer = json.loads(file.read(footer_size).decode('utf-8'))
+        if footer.get('version', None) != COLUMNAR_VERSION:
+            raise ValueError('Unsupported columnar file')
+        swap = footer['byteorder'] != sys.byteorder
+        file.seek(magic_size)
+        columns = {}
+        for description in footer['columns']:
+            columns[description['name']] = Column.load(
+                file, description, swap
+            )
+        return footer['class'], columns
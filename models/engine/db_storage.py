@@ -0,0 +1,913 @@
+#!/usr/bin/python3
+"""A module containing the SQLite storage engine.
+"""
+import os
+import sqlite3
+import weakref
+from collections.abc import Mapping
+from contextlib import contextmanager
+from json import JSONDecoder, JSONEncoder
+
+from models.compact import schema_defaults
+from models.engine.columns import aggregate_records
+from models.engine.lazy_objects import record_str
+from models.engine.sorted_index import is_sortable
+from models.engine.spatial_index import bounding_box, is_location, nearest
+from models.engine.text_index import join_text, search_records, tokenize
+from models.exporter import export_objects
+from models.importer import import_objects
+from models.registry import (
+    LOCATION_ATTRS, SORTED_ATTRS, TEXT_ATTRS, ModelRegistry
+)
+
+
+FOREIGN_KEYS = ('city_id', 'user_id', 'place_id', 'state_id')
+"""The attributes of the models that refer to other objects, which are
+kept in indexed columns.
+"""
+BASE_COLUMNS = ('id', 'created_at', 'updated_at')
+"""The columns that every table has.
+"""
+
+
+class DBObjects(Mapping):
+    """Represents a read-only view of the objects in a DBStorage, which
+    are only loaded from the database when they are accessed.
+    """
+
+    def __init__(self, storage):
+        """Initializes a new DBObjects view.
+
+        Args:
+            storage (DBStorage): The storage of the objects.
+        """
+        self.__storage = storage
+
+    def __getitem__(self, key):
+        """Retrieves the object with the given key.
+
+        Args:
+            key (str): The key of the object.
+
+        Returns:
+            BaseModel: The object.
+        """
+        cls_name, _, obj_id = key.partition('.')
+        obj = self.__storage.get(cls_name, obj_id)
+        if obj is None:
+            raise KeyError(key)
+        return obj
+
+    def __iter__(self):
+        """Iterates over the keys of the objects.
+
+        Yields:
+            str: The key of an object.
+        """
+        yield from self.__storage.keys()
+
+    def __len__(self):
+        """Counts the objects.
+
+        Returns:
+            int: The number of objects.
+        """
+        return self.__storage.count()
+
+
+class DBStorage:
+    """Represents the storage for all data sets in an SQLite database.
+    Each model class has its own table, and only the objects that are
+    in use are kept in memory.
+    """
+
+    def __init__(self, db_path=None):
+        """Initializes a DBStorage instance.
+
+        Args:
+            db_path (str): The path to the database file. It is read from
+            the HBNB_DB_PATH environment variable if it is None.
+        """
+        if db_path is None:
+            db_path = os.getenv('HBNB_DB_PATH', 'hbnb.db')
+        self.db_path = db_path
+        self.model_classes = ModelRegistry()
+        self.__encoder = JSONEncoder()
+        self.__decoder = JSONDecoder()
+        self.__connection = sqlite3.connect(db_path, isolation_level=None)
+        self.__objects = weakref.WeakValueDictionary()
+        self.__columns = dict()
+        self.__pending = dict()
+        self.__batch_depth = 0
+        self.__batch_saved = False
+        self.__batch_keys = set()
+        self.__text_tables = set()
+        self.__create_tables()
+
+    def all(self):
+        """Returns all the stored objects.
+
+        Returns:
+            DBObjects: A view of the stored objects.
+        """
+        return DBObjects(self)
+
+    def keys(self):
+        """Generates the keys of the stored objects.
+
+        Yields:
+            str: The key of an object.
+        """
+        with self.__reading():
+            for cls_name in self.model_classes.keys():
+                cursor = self.__connection.execute(
+                    'SELECT id FROM "{}" ORDER BY rowid'.format(cls_name)
+                )
+                for row in cursor:
+                    yield '{}.{}'.format(cls_name, row[0])
+
+    def new(self, obj):
+        """Stores a new object, which is written to its row when the
+        storage is saved.
+
+        Args:
+            obj (BaseModel): The object to store.
+        """
+        obj_key = '{}.{}'.format(obj.__class__.__name__, obj.id)
+        self.__objects[obj_key] = obj
+        self.__change(obj_key, obj)
+
+    def import_file(self, cls, file_path, progress=None):
+        """Creates objects of a given class from the rows of a CSV or JSON
+        Lines file and stores them. The objects are saved once at the end,
+        and none of them are stored if a row is invalid.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            file_path (str): The path to the file.
+            progress (Callable): An optional function that is called with
+            the number of rows imported after each batch of rows.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If the class doesn't exist, the file isn't in a
+            known format, or a row is invalid.
+
+        Returns:
+            int: The number of objects created.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return import_objects(
+            self, self.model_classes[cls_name], file_path, progress
+        )
+
+    def export_file(self, cls, file_path, row_format=None, attrs=None,
+                    predicates=()):
+        """Writes the stored objects of a given class to a CSV, JSON
+        Lines, or columnar file, streaming their records from the storage.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            file_path (str): The path to the file.
+            row_format (str): The format of the file, which is determined
+            by the extension of the file if it is None.
+            attrs (list): The names of the attributes to export. All of the
+            attributes are exported if it is None.
+            predicates (Iterable): The predicates that the objects have to
+            satisfy, in the form accepted by Query.where.
+
+        Raises:
+            OSError: If the file can't be written.
+            ValueError: If the class doesn't exist, the format is unknown,
+            or a predicate is invalid.
+
+        Returns:
+            int: The number of objects exported.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return export_objects(
+            self, self.model_classes[cls_name], file_path, row_format, attrs,
+            predicates
+        )
+
+    def get(self, cls, id):
+        """Retrieves a stored object of a given class with a given id.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object if it exists, otherwise None.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            return None
+        obj_key = '{}.{}'.format(cls_name, id)
+        obj = self.__objects.get(obj_key, None)
+        if obj is not None:
+            return obj
+        with self.__reading():
+            cursor = self.__connection.execute(
+                'SELECT * FROM "{}" WHERE id = ?'.format(cls_name), (id,)
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return self.__materialize(
+            self.__to_record(cls_name, cursor.description, row)
+        )
+
+    def count(self, cls=None):
+        """Counts the stored objects of a given class.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are counted if it is None.
+
+        Returns:
+            int: The number of objects.
+        """
+        n = 0
+        with self.__reading():
+            for cls_name in self.__class_names(cls):
+                n += self.__connection.execute(
+                    'SELECT COUNT(*) FROM "{}"'.format(cls_name)
+                ).fetchone()[0]
+        return n
+
+    def strings(self, cls=None):
+        """Generates the string representations of the stored objects
+        of a given class without creating the objects.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are included if it is None.
+
+        Yields:
+            str: The string representation of an object.
+        """
+        self.__sync()
+        with self.__reading():
+            for cls_name in self.__class_names(cls):
+                cursor = self.__connection.execute(
+                    'SELECT * FROM "{}" ORDER BY rowid'.format(cls_name)
+                )
+                for row in cursor:
+                    yield record_str(
+                        self.__to_record(cls_name, cursor.description, row)
+                    )
+
+    def records(self, cls=None):
+        """Generates the serialized records of the stored objects of a
+        given class without creating the objects.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are included if it is None.
+
+        Yields:
+            dict: The serialized record of an object.
+        """
+        self.__sync()
+        with self.__reading():
+            for cls_name in self.__class_names(cls):
+                cursor = self.__connection.execute(
+                    'SELECT * FROM "{}" ORDER BY rowid'.format(cls_name)
+                )
+                for row in cursor:
+                    yield self.__to_record(cls_name, cursor.description, row)
+
+    def related(self, cls, attr, id):
+        """Retrieves the stored objects of a given class whose attribute
+        refers to the object with a given id. The foreign keys are looked
+        up in their indexes.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            attr (str): The attribute that holds the id.
+            id (str): The id of the referred object.
+
+        Returns:
+            list: The objects.
+        """
+        objs = []
+        self.__sync()
+        with self.__reading():
+            for cls_name in self.__class_names(cls):
+                if attr in self.__columns[cls_name]:
+                    cursor = self.__connection.execute(
+                        'SELECT * FROM "{}" WHERE {} = ? '
+                        'ORDER BY rowid'.format(cls_name, attr),
+                        (id,)
+                    )
+                else:
+                    cursor = self.__connection.execute(
+                        'SELECT * FROM "{}" ORDER BY rowid'.format(cls_name)
+                    )
+                for row in cursor.fetchall():
+                    record = self.__to_record(
+                        cls_name, cursor.description, row
+                    )
+                    if record.get(attr, None) == id:
+                        objs.append(self.__materialize(record))
+        return objs
+
+    def ordered(self, cls, attr, low=None, high=None, reverse=False):
+        """Generates the stored objects of a given class in the order of
+        a numeric attribute. The declared attributes are looked up in the
+        indexes of their values.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            attr (str): The name of the attribute.
+            low (int|float): The lowest value, which is included.
+            high (int|float): The highest value, which is included.
+            reverse (bool): Whether to start with the highest value.
+
+        Yields:
+            BaseModel: An object whose attribute is a number in the range.
+        """
+        self.__sync()
+        order = 'DESC' if reverse else 'ASC'
+        with self.__reading():
+            for cls_name in self.__class_names(cls):
+                expression = self.__sort_expression(cls_name, attr)
+                conditions = [
+                    "typeof({}) IN ('integer', 'real')".format(expression)
+                ]
+                params = []
+                if low is not None:
+                    conditions.append('{} >= ?'.format(expression))
+                    params.append(low)
+                if high is not None:
+                    conditions.append('{} <= ?'.format(expression))
+                    params.append(high)
+                cursor = self.__connection.execute(
+                    'SELECT * FROM "{}" WHERE {} ORDER BY {} {}, id {}'.format(
+                        cls_name, ' AND '.join(conditions), expression, order,
+                        order
+                    ),
+                    params
+                )
+                for row in cursor:
+                    yield self.__materialize(
+                        self.__to_record(cls_name, cursor.description, row)
+                    )
+
+    def within(self, cls, south, west, north, east):
+        """Retrieves the stored objects of a given class in a box of
+        latitudes and longitudes, which are looked up in the index of
+        their latitudes.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            south (float): The south edge of the box.
+            west (float): The west edge of the box.
+            north (float): The north edge of the box.
+            east (float): The east edge of the box, which is less than the
+            west edge if the box crosses the 180th meridian.
+
+        Returns:
+            list: The objects.
+        """
+        objs = []
+        self.__sync()
+        with self.__reading():
+            for cls_name in self.__class_names(cls):
+                if cls_name not in LOCATION_ATTRS:
+                    continue
+                lat, lon = (
+                    self.__sort_expression(cls_name, attr)
+                    for attr in LOCATION_ATTRS[cls_name]
+                )
+                lon_condition = '{0} >= ? AND {0} <= ?' if west <= east \
+                    else '({0} >= ? OR {0} <= ?)'
+                cursor = self.__connection.execute(
+                    'SELECT * FROM "{}" WHERE '.format(cls_name) +
+                    "typeof({0}) IN ('integer', 'real') AND ".format(lat) +
+                    "typeof({0}) IN ('integer', 'real') AND ".format(lon) +
+                    '{0} >= ? AND {0} <= ? AND '.format(lat) +
+                    lon_condition.format(lon) + ' ORDER BY rowid',
+                    (south, north, west, east)
+                )
+                for row in cursor.fetchall():
+                    objs.append(self.__materialize(
+                        self.__to_record(cls_name, cursor.description, row)
+                    ))
+        return objs
+
+    def near(self, cls, lat, lon, km, k=None):
+        """Retrieves the stored objects of a given class within a
+        distance of a location, which are looked up in the index of their
+        latitudes.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            lat (float): The latitude of the location in degrees.
+            lon (float): The longitude of the location in degrees.
+            km (float): The maximum distance in kilometers.
+            k (int): The maximum number of objects, which are the nearest
+            ones. All the objects are included if it is None.
+
+        Returns:
+            list: The distances (in kilometers) and the objects, which
+            are sorted by their distances.
+        """
+        points = []
+        for obj in self.within(cls, *bounding_box(lat, lon, km)):
+            lat_attr, lon_attr = LOCATION_ATTRS[obj.__class__.__name__]
+            obj_lat = getattr(obj, lat_attr, None)
+            obj_lon = getattr(obj, lon_attr, None)
+            if is_location(obj_lat, obj_lon):
+                points.append((obj, obj_lat, obj_lon))
+        return nearest(points, lat, lon, km, k)
+
+    def search(self, cls, text, k=None):
+        """Ranks the stored objects of a given class whose text matches
+        a text with BM25, which are looked up in the full-text tables of
+        their classes.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are searched if it is None.
+            text (str): The text to search for.
+            k (int): The maximum number of objects, which are the best
+            matches. All the matches are included if it is None.
+
+        Returns:
+            list: The scores and the objects, which are sorted from the
+            best match.
+        """
+        terms = tokenize(text)
+        if len(terms) == 0:
+            return []
+        match = ' OR '.join('"{}"'.format(term) for term in set(terms))
+        found = []
+        self.__sync()
+        with self.__reading():
+            for cls_name in self.__class_names(cls):
+                if cls_name not in TEXT_ATTRS:
+                    continue
+                if cls_name not in self.__text_tables:
+                    found.extend(
+                        (score, self.get(*key.split('.', 1)))
+                        for score, key in search_records(
+                            self.records(cls_name), text, k
+                        )
+                    )
+                    continue
+                cursor = self.__connection.execute(
+                    'SELECT -bm25("{0}_text"), "{0}".* FROM "{0}_text" '
+                    'JOIN "{0}" ON "{0}".rowid = "{0}_text".rowid '
+                    'WHERE "{0}_text" MATCH ? '
+                    'ORDER BY bm25("{0}_text"), "{0}".id LIMIT ?'.format(
+                        cls_name
+                    ),
+                    (match, -1 if k is None else k)
+                )
+                for row in cursor.fetchall():
+                    found.append((row[0], self.__materialize(self.__to_record(
+                        cls_name, cursor.description[1:], row[1:]
+                    ))))
+        found.sort(key=lambda item: -item[0])
+        return found[:k]
+
+    def aggregate(self, cls, aggregates, group_by=None):
+        """Computes some aggregates of the stored objects of a given class
+        in groups, by putting the attributes of their records in columns.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            aggregates (Iterable): The aggregates, such as 'count' or
+            'avg(price_by_night)', or tuples of a function and the name of
+            an attribute.
+            group_by (str): The name of the attribute whose values group
+            the objects. All the objects are in one group if it is None.
+
+        Raises:
+            ValueError: If the class doesn't exist or an aggregate is
+            invalid.
+
+        Returns:
+            list: A dictionary for each group, which holds the value of
+            the grouping attribute and the results of the aggregates by
+            their names.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return aggregate_records(
+            self.records(cls_name), self.model_classes[cls_name], aggregates,
+            group_by
+        )
+
+    def mark_changed(self, obj):
+        """Marks a changed object so that the next save writes it to its
+        row.
+
+        Args:
+            obj (BaseModel): The changed object.
+        """
+        obj_key = '{}.{}'.format(obj.__class__.__name__, obj.id)
+        if self.__objects.get(obj_key, None) is obj:
+            self.__change(obj_key, obj)
+
+    def delete(self, obj=None):
+        """Removes an object from the stored objects, whose row is
+        deleted when the storage is saved.
+
+        Args:
+            obj (BaseModel): The object to remove.
+        """
+        if obj is None:
+            return
+        obj_key = '{}.{}'.format(obj.__class__.__name__, obj.id)
+        self.__objects.pop(obj_key, None)
+        self.__change(obj_key, None)
+
+    def save(self):
+        """Writes the changes made to the stored objects and commits them
+        in a transaction, so that the database is only locked while it's
+        written. Inside a batch, the changes are only committed when it
+        ends.
+        """
+        if self.__batch_depth > 0:
+            self.__batch_saved = True
+            return
+        self.__sync()
+        if len(self.__pending) == 0:
+            return
+        if not self.__connection.in_transaction:
+            self.__connection.execute('BEGIN')
+        self.__commit()
+
+    def flush(self):
+        """Does nothing since the changes are committed when they are
+        saved.
+        """
+
+    @contextmanager
+    def batch(self):
+        """Groups the changes made within a with statement so that the
+        saves requested in it are done once when it ends. If an exception
+        escapes the with statement, the stored objects are restored to
+        their state before it began and nothing is saved. Nested batches
+        are part of the outermost one.
+
+        Yields:
+            DBStorage: This storage.
+        """
+        if self.__batch_depth > 0:
+            self.__batch_depth += 1
+            try:
+                yield self
+            finally:
+                self.__batch_depth -= 1
+            return
+        self.__sync()
+        objects = dict(self.__objects.items())
+        attrs = {
+            key: dict(obj._attributes()) for key, obj in objects.items()
+        }
+        pending = dict(self.__pending)
+        # the database is only locked while the batch runs
+        if not self.__connection.in_transaction:
+            self.__connection.execute('BEGIN')
+        for obj_key, obj in pending.items():
+            self.__write(obj_key, obj)
+        self.__batch_depth = 1
+        self.__batch_saved = False
+        self.__batch_keys = set()
+        try:
+            yield self
+        except BaseException:
+            self.__batch_depth = 0
+            self.__connection.execute('ROLLBACK')
+            self.__pending = pending
+            self.__batch_keys = set()
+            self.__objects = weakref.WeakValueDictionary(objects)
+            for key, obj in objects.items():
+                if obj._attributes() != attrs[key]:
+                    for name in list(obj._attributes().keys()):
+                        delattr(obj, name)
+                    for name, value in attrs[key].items():
+                        setattr(obj, name, value)
+                obj._mark_persisted()
+            raise
+        self.__batch_depth = 0
+        batch_keys, self.__batch_keys = self.__batch_keys, set()
+        if self.__batch_saved:
+            self.__batch_saved = False
+            self.__sync()
+            for obj_key in batch_keys:
+                obj = self.__objects.get(obj_key, None)
+                if obj is not None:
+                    self.__pending[obj_key] = obj
+            self.__commit()
+            return
+        # the changes stay unsaved, so they are kept in memory
+        for obj_key in batch_keys:
+            self.__pending[obj_key] = self.get(*obj_key.split('.', 1))
+        self.__connection.execute('ROLLBACK')
+
+    def reload(self, *, progress=None):
+        """Discards the changes that haven't been saved and forgets the
+        objects in memory, which are loaded again when they are accessed.
+
+        Args:
+            progress (Callable): An optional function that is called
+            with the number of objects, and the number of bytes read and
+            the size of the database, which are both the size of the
+            database.
+
+        Returns:
+            int: The number of stored objects.
+        """
+        if self.__connection.in_transaction:
+            self.__connection.execute('ROLLBACK')
+        self.__pending = dict()
+        self.__objects = weakref.WeakValueDictionary()
+        n = self.count()
+        if progress is not None:
+            db_size = os.stat(self.db_path).st_size
+            progress(n, db_size, db_size)
+        return n
+
+    def close(self):
+        """Closes the connection to the database without committing the
+        changes that haven't been saved.
+        """
+        self.__connection.close()
+
+    def __create_tables(self):
+        """Creates the tables of the model classes, the indexes of their
+        foreign keys, and the full-text tables of their texts if they don't
+        exist. The objects are searched without a full-text table if
+        SQLite doesn't have the FTS5 extension.
+        """
+        for cls_name, cls in self.model_classes.items():
+            defaults = schema_defaults(cls)
+            foreign_keys = tuple(k for k in FOREIGN_KEYS if k in defaults)
+            self.__columns[cls_name] = foreign_keys
+            self.__connection.execute(
+                'CREATE TABLE IF NOT EXISTS "{}" ('.format(cls_name) +
+                'id TEXT PRIMARY KEY, created_at TEXT, updated_at TEXT, ' +
+                ''.join('{} TEXT, '.format(k) for k in foreign_keys) +
+                'attributes TEXT)'
+            )
+            for key in foreign_keys:
+                self.__connection.execute(
+                    'CREATE INDEX IF NOT EXISTS "ix_{0}_{1}" '
+                    'ON "{0}" ({1})'.format(cls_name, key)
+                )
+            for attr in SORTED_ATTRS.get(cls_name, ()):
+                self.__connection.execute(
+                    'CREATE INDEX IF NOT EXISTS "ix_{0}_{1}" '
+                    'ON "{0}" ({2})'.format(
+                        cls_name, attr, self.__sort_expression(cls_name, attr)
+                    )
+                )
+            if cls_name in TEXT_ATTRS:
+                self.__create_text_table(cls_name)
+
+    def __create_text_table(self, cls_name):
+        """Creates the full-text table of the texts of a model class,
+        whose rows have the rowids of the rows of the objects, and fills
+        it with the objects that are already stored.
+
+        Args:
+            cls_name (str): The name of the class.
+        """
+        table = '{}_text'.format(cls_name)
+        exists = self.__connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (table,)
+        ).fetchone() is not None
+        if not exists:
+            try:
+                self.__connection.execute(
+                    'CREATE VIRTUAL TABLE "{}" USING fts5(text)'.format(table)
+                )
+            except sqlite3.OperationalError:
+                return
+            cursor = self.__connection.execute(
+                'SELECT rowid, * FROM "{}"'.format(cls_name)
+            )
+            self.__connection.executemany(
+                'INSERT INTO "{}" (rowid, text) VALUES (?, ?)'.format(table),
+                [
+                    (row[0], join_text(cls_name, self.__to_record(
+                        cls_name, cursor.description[1:], row[1:]
+                    )))
+                    for row in cursor.fetchall()
+                ]
+            )
+        self.__text_tables.add(cls_name)
+
+    def __sort_expression(self, cls_name, attr):
+        """Creates the SQL expression of the value of an attribute,
+        which takes the default value of the class if it isn't set.
+
+        Args:
+            cls_name (str): The name of the class.
+            attr (str): The name of the attribute.
+
+        Raises:
+            ValueError: If the name of the attribute isn't an identifier.
+
+        Returns:
+            str: The expression.
+        """
+        if not attr.isidentifier():
+            raise ValueError(attr)
+        if attr in BASE_COLUMNS + self.__columns[cls_name]:
+            return attr
+        default = schema_defaults(self.model_classes[cls_name]).get(attr, None)
+        if is_sortable(default):
+            return "COALESCE(json_extract(attributes, '$.{}'), {!r})".format(
+                attr, default
+            )
+        return "json_extract(attributes, '$.{}')".format(attr)
+
+    def __class_names(self, cls):
+        """Retrieves the names of the classes that a class argument
+        refers to.
+
+        Args:
+            cls (type|str): The class or the name of the class, or None
+            for all the classes.
+
+        Returns:
+            list: The names of the classes.
+        """
+        if cls is None:
+            return list(self.model_classes.keys())
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        return [cls_name] if cls_name in self.model_classes else []
+
+    def __change(self, obj_key, obj):
+        """Records a change to an object, which is written when the
+        storage is saved. The change is written at once if a transaction
+        is in progress, such as the one of a batch.
+
+        Args:
+            obj_key (str): The key of the object.
+            obj (BaseModel): The object, or None if it has been removed.
+        """
+        if self.__batch_depth > 0:
+            self.__batch_keys.add(obj_key)
+        else:
+            self.__pending[obj_key] = obj
+        if self.__connection.in_transaction:
+            self.__write(obj_key, obj)
+
+    def __sync(self):
+        """Records the changes to the objects in memory that haven't been
+        marked as changed.
+        """
+        for obj_key, obj in list(self.__objects.items()):
+            if obj._is_changed():
+                self.__change(obj_key, obj)
+
+    def __commit(self):
+        """Writes the changes that haven't been saved and commits the
+        transaction in progress.
+        """
+        try:
+            for obj_key, obj in self.__pending.items():
+                self.__write(obj_key, obj)
+            self.__connection.execute('COMMIT')
+        except BaseException:
+            if self.__connection.in_transaction:
+                self.__connection.execute('ROLLBACK')
+            raise
+        for obj in self.__pending.values():
+            if obj is not None:
+                obj._mark_persisted()
+        self.__pending = dict()
+
+    @contextmanager
+    def __reading(self):
+        """Makes the changes that haven't been saved visible to the
+        queries within a with statement. They are written in a
+        transaction that is rolled back afterwards, so that the database
+        is only locked while it's read.
+        """
+        if (len(self.__pending) == 0) or self.__connection.in_transaction:
+            yield
+            return
+        self.__connection.execute('BEGIN')
+        try:
+            for obj_key, obj in self.__pending.items():
+                self.__write(obj_key, obj)
+            yield
+        finally:
+            # a save within the statement may have committed already
+            if self.__connection.in_transaction:
+                self.__connection.execute('ROLLBACK')
+
+    def __write(self, obj_key, obj):
+        """Writes a change to an object to the database.
+
+        Args:
+            obj_key (str): The key of the object.
+            obj (BaseModel): The object, or None if it has been removed.
+        """
+        if obj is not None:
+            self.__upsert(obj)
+            return
+        cls_name, _, obj_id = obj_key.partition('.')
+        self.__delete_text(cls_name, obj_id)
+        self.__connection.execute(
+            'DELETE FROM "{}" WHERE id = ?'.format(cls_name), (obj_id,)
+        )
+
+    def __upsert(self, obj):
+        """Writes an object to its row.
+
+        Args:
+            obj (BaseModel): The object to write.
+        """
+        cls_name = obj.__class__.__name__
+        foreign_keys = self.__columns[cls_name]
+        record = obj.to_dict()
+        del record['__class__']
+        values = [record.pop(k, None) for k in BASE_COLUMNS + foreign_keys]
+        values.append(self.__encoder.encode(record))
+        columns = BASE_COLUMNS + foreign_keys + ('attributes',)
+        self.__delete_text(cls_name, obj.id)
+        # an update keeps the rowid, so the objects keep their order
+        self.__connection.execute(
+            'INSERT INTO "{}" ({}) '.format(cls_name, ', '.join(columns)) +
+            'VALUES ({}) '.format(', '.join('?' * len(values))) +
+            'ON CONFLICT(id) DO UPDATE SET {}'.format(', '.join(
+                '{0} = excluded.{0}'.format(column)
+                for column in columns[1:]
+            )),
+            values
+        )
+        if cls_name in self.__text_tables:
+            self.__connection.execute(
+                'INSERT INTO "{0}_text" (rowid, text) '
+                'SELECT rowid, ? FROM "{0}" WHERE id = ?'.format(cls_name),
+                (join_text(cls_name, obj._attributes()), obj.id)
+            )
+
+    def __delete_text(self, cls_name, id):
+        """Removes the text of an object from the full-text table of its
+        class.
+
+        Args:
+            cls_name (str): The name of the class of the object.
+            id (str): The id of the object.
+        """
+        if cls_name not in self.__text_tables:
+            return
+        self.__connection.execute(
+            'DELETE FROM "{0}_text" WHERE rowid IN '
+            '(SELECT rowid FROM "{0}" WHERE id = ?)'.format(cls_name),
+            (id,)
+        )
+
+    def __to_record(self, cls_name, description, row):
+        """Creates the serialized record of an object from its row.
+
+        Args:
+            cls_name (str): The name of the class of the object.
+            description (tuple): The description of the columns.
+            row (tuple): The row of the object.
+
+        Returns:
+            dict: The serialized record of the object.
+        """
+        record = {}
+        for column, value in zip(description, row):
+            if column[0] == 'attributes':
+                record.update(self.__decoder.decode(value))
+            elif value is not None:
+                record[column[0]] = value
+        record['__class__'] = cls_name
+        return record
+
+    def __materialize(self, record):
+        """Retrieves the object described by a serialized record from
+        the objects in memory, or creates it.
+
+        Args:
+            record (dict): The serialized record of the object.
+
+        Returns:
+            BaseModel: The object.
+        """
+        obj_key = '{}.{}'.format(record['__class__'], record['id'])
+        obj = self.__objects.get(obj_key, None)
+        if obj is None:
+            obj = self.model_classes[record['__class__']](**record)
+            obj._mark_persisted()
+            self.__objects[obj_key] = obj
+        return obj
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""A module containing the storage that is created when it is first used.
+"""
+import threading
+
+from models.registry import ModelRegistry
+
+
+class DeferredStorage:
+    """Represents a stand-in for a storage engine, which creates the
+    engine and loads the stored objects when any of its attributes other
+    than the registry of the model classes is first used.
+    """
+
+    def __init__(self, factory):
+        """Initializes a DeferredStorage instance.
+
+        Args:
+            factory (Callable): The function that creates and loads the
+            storage engine.
+        """
+        self.model_classes = ModelRegistry()
+        self.__factory = factory
+        self.__storage = None
+        self.__lock = threading.Lock()
+
+    def __getattr__(self, name):
+        """Retrieves an attribute of the storage engine, creating the
+        engine if necessary.
+
+        Args:
+            name (str): The name of the attribute.
+
+        Returns:
+            any: The value of the attribute.
+        """
+        if name.startswith('_DeferredStorage__'):
+            raise AttributeError(name)
+        return getattr(self.engine, name)
+
+    def __setattr__(self, name, value):
+        """Sets an attribute of the storage engine, creating the engine
+        if necessary.
+
+        Args:
+            name (str): The name of the attribute.
+            value (any): The value of the attribute.
+        """
+        if (name == 'model_classes') or name.startswith('_DeferredStorage__'):
+            super().__setattr__(name, value)
+        else:
+            setattr(self.engine, name, value)
+
+    @property
+    def engine(self):
+        """The storage engine, which is created when it is first used.
+        """
+        if self.__storage is None:
+            with self.__lock:
+                if self.__storage is None:
+                    self.__storage = self.__factory()
+        return self.__storage
+
+    def close(self):
+        """Closes the storage engine if it has been created.
+        """
+        if self.__storage is not None:
+            self.__storage.close()
+
+    @property
+    def is_loaded(self):
+        """Whether the storage engine has been created.
+        """
+        return self.__storage is not None
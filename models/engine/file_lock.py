@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+"""A module containing the lock that the processes sharing a storage file
+hold while they write it.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # advisory locks are only available on Unix, so the writes of
+    # different processes aren't serialized on other platforms
+    fcntl = None
+
+
+GENERATION_SIZE = 20
+"""The number of digits of the generation in the lock file.
+"""
+READ_ATTEMPTS = 20
+"""The number of times a read is attempted without the lock before the
+reader waits for the writers.
+"""
+READ_RETRY_DELAY = 0.005
+"""The number of seconds a reader waits before attempting a read again.
+"""
+
+
+class FileLock:
+    """Represents an advisory lock on a file, which is held on a separate
+    lock file that also records the generation of the file. The
+    generation is odd while the file is being written and grows by two
+    with each write, so that readers can read the file without holding
+    the lock and find out if it was written in the meantime. A new lock
+    file starts from a generation taken from the clock, so that it
+    doesn't repeat the generations of a lock file that was removed.
+    """
+
+    def __init__(self, path):
+        """Initializes a new FileLock.
+
+        Args:
+            path (str): The path to the lock file, which is created when
+            the lock is first held.
+        """
+        self.path = path
+        """The path to the lock file.
+        """
+
+    def generation(self):
+        """Reads the generation of the file without holding the lock.
+
+        Returns:
+            int: The generation, which is 0 if the lock file doesn't
+            exist.
+        """
+        try:
+            with open(self.path, mode='rb') as file:
+                return self.__parse(file.read(GENERATION_SIZE))
+        except FileNotFoundError:
+            return 0
+
+    @contextmanager
+    def hold(self, shared=False):
+        """Holds the lock within a with statement. The lock is held by an
+        open file, so it is released if the process dies, and it also
+        excludes the other threads of the process.
+
+        Args:
+            shared (bool): Whether to hold a shared lock, which is only
+            exclusive of the writers, instead of an exclusive one.
+
+        Yields:
+            int: The file descriptor of the lock file.
+        """
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            if fcntl is None:
+                break
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            if self.__is_current(fd):
+                break
+            # the lock file was removed while the lock was awaited
+            os.close(fd)
+        try:
+            yield fd
+        finally:
+            # closing the file releases the lock
+            os.close(fd)
+
+    @contextmanager
+    def update(self):
+        """Holds the exclusive lock within a with statement, during which
+        the file is being written.
+
+        Yields:
+            tuple: The generation of the file before the write, and its
+            generation after the write.
+        """
+        with self.hold() as fd:
+            os.lseek(fd, 0, os.SEEK_SET)
+            generation = self.__parse(os.read(fd, GENERATION_SIZE))
+            if generation == 0:
+                writing = time.time_ns() * 2 + 1
+            else:
+                # an odd generation was left behind by an interrupted write
+                writing = generation + (1 if generation % 2 == 0 else 2)
+            self.__write(fd, writing)
+            try:
+                yield generation, writing + 1
+            finally:
+                self.__write(fd, writing + 1)
+
+    def read(self, read_file):
+        """Reads the file without holding the lock. The read is attempted
+        again if the file was written in the meantime, and the lock is
+        held shared once the attempts run out.
+
+        Args:
+            read_file (Callable): The function that reads the file.
+
+        Returns:
+            tuple: The generation of the file that was read, and the
+            result of the function.
+        """
+        for _ in range(READ_ATTEMPTS):
+            generation = self.generation()
+            if generation % 2 == 0:
+                result = read_file()
+                if self.generation() == generation:
+                    return generation, result
+            time.sleep(READ_RETRY_DELAY)
+        with self.hold(shared=True) as fd:
+            os.lseek(fd, 0, os.SEEK_SET)
+            generation = self.__parse(os.read(fd, GENERATION_SIZE))
+            return generation, read_file()
+
+    def remove(self):
+        """Removes the lock file unless another process holds the lock.
+        """
+        try:
+            fd = os.open(self.path, os.O_RDWR)
+        except FileNotFoundError:
+            return
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+                if not self.__is_current(fd):
+                    return
+            os.unlink(self.path)
+        finally:
+            os.close(fd)
+
+    def __is_current(self, fd):
+        """Checks if an open lock file is still the one at the path of
+        the lock file.
+
+        Args:
+            fd (int): The file descriptor of the open lock file.
+
+        Returns:
+            bool: True if the lock file hasn't been removed or replaced.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        fd_stat = os.fstat(fd)
+        return (stat.st_dev, stat.st_ino) == (fd_stat.st_dev, fd_stat.st_ino)
+
+    @staticmethod
+    def __parse(data):
+        """Parses the generation in the contents of the lock file.
+
+        Args:
+            data (bytes): The contents of the lock file.
+
+        Returns:
+            int: The generation, which is 0 if the contents aren't a
+            number.
+        """
+        try:
+            return int(data.decode('ascii'))
+        except (UnicodeDecodeError, ValueError):
+            return 0
+
+    @staticmethod
+    def __write(fd, generation):
+        """Writes the generation to the lock file.
+
+        Args:
+            fd (int): The file descriptor of the lock file.
+            generation (int): The generation.
+        """
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, str(generation).zfill(GENERATION_SIZE).encode('ascii'))
@@ -1,10 +1,30 @@
 #!/usr/bin/python3
 """A module containing the file storage engine.
 """
+import atexit
 import os
-from importlib import import_module
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
 from json import JSONDecoder, JSONEncoder
 
+from models.compact import schema_defaults
+from models.engine.columns import (
+    ColumnTable, parse_aggregate, table_attributes
+)
+from models.engine.file_lock import FileLock
+from models.engine.lazy_objects import LazyObjects, is_record, record_str
+from models.engine.serializers import serializer_for
+from models.engine.sorted_index import SortedIndex
+from models.engine.spatial_index import GridIndex
+from models.engine.text_index import TextIndex, join_text, text_checksum
+from models.exporter import export_objects
+from models.importer import import_objects
+from models.registry import (
+    FOREIGN_KEYS, LOCATION_ATTRS, SORTED_ATTRS, TEXT_ATTRS, ModelRegistry
+)
+
 
 class FileStorage:
     """Represents the file storage for all data sets.
@@ -12,18 +32,98 @@ class FileStorage:
     __file_path = 'file.json'
     __objects = dict()
 
-    def __init__(self):
+    def __init__(self, file_path=None):
         """Initializes a FileStorage instance.
+
+        Args:
+            file_path (str): The path to the storage file. If it is None,
+            the path is read from the HBNB_FILE_PATH environment variable
+            and the stored objects are shared with the other storages of
+            the default file.
+        """
+        if file_path is None:
+            self.__file_path = os.getenv('HBNB_FILE_PATH', self.__file_path)
+        else:
+            self.__file_path = file_path
+            self.__objects = dict()
+        self.serializer = serializer_for(
+            self.__file_path, os.getenv('HBNB_FILE_FORMAT', None)
+        )
+        """The serializer for the format of the storage file, which
+        is picked from the extension of the file by default.
+        """
+        self.model_classes = ModelRegistry()
+        """The model classes, which are the compact variants of the
+        classes if the HBNB_COMPACT_MODELS environment variable is 1.
+        """
+        self.journal_mode = os.getenv('HBNB_FILE_JOURNAL', '0') == '1'
+        """Records changes in an append-only journal instead of rewriting
+        the whole storage file on every save.
+        """
+        self.journal_limit = int(
+            os.getenv('HBNB_FILE_JOURNAL_LIMIT', str(4 * 1024 * 1024))
+        )
+        """The size (in bytes) of the journal above which it is compacted
+        into the storage file.
+        """
+        self.lazy_mode = os.getenv('HBNB_LAZY_LOAD', '0') == '1'
+        """Keeps reloaded objects in their serialized form until they are
+        accessed for the first time.
+        """
+        self.write_behind = float(os.getenv('HBNB_WRITE_BEHIND', '0'))
+        """The number of seconds within which saves are merged into a
+        single write made by a background thread. Saves are written
+        immediately if it is 0.
+        """
+        self.__changes = dict()
+        self.__records = dict()
+        self.__records_serializer = self.serializer
+        self.__compaction = None
+        self.__class_index = dict()
+        self.__relation_index = dict()
+        self.__relation_keys = dict()
+        self.__sorted_indexes = dict()
+        self.__spatial_indexes = dict()
+        self.__text_index = None
+        self.__column_tables = dict()
+        self.__batch_depth = 0
+        self.__batch_saved = False
+        self.__lock = threading.RLock()
+        self.__write_lock = threading.Lock()
+        self.__flush_requested = threading.Condition(self.__lock)
+        self.__flush_pending = False
+        self.__flusher = None
+        self.__flusher_registered = False
+        self.__file_lock = FileLock(self.lock_path)
+        self.__disk_state = None
+        self.__index_objects()
+
+    @property
+    def file_path(self):
+        """The path to the storage file.
+        """
+        return self.__file_path
+
+    @property
+    def journal_path(self):
+        """The path to the journal of changes made since the last
+        snapshot of the storage file.
+        """
+        return '{}.journal'.format(self.__file_path)
+
+    @property
+    def lock_path(self):
+        """The path to the file that the processes sharing the storage
+        file lock while they write it, which also holds the generation of
+        the storage file.
+        """
+        return '{}.lock'.format(self.__file_path)
+
+    @property
+    def text_index_path(self):
+        """The path to the file of the full-text index of the objects.
         """
-        self.model_classes = {
-            'BaseModel': import_module('models.base_model').BaseModel,
-            'User': import_module('models.user').User,
-            'State': import_module('models.state').State,
-            'City': import_module('models.city').City,
-            'Amenity': import_module('models.amenity').Amenity,
-            'Place': import_module('models.place').Place,
-            'Review': import_module('models.review').Review
-        }
+        return '{}.text'.format(self.__file_path)
 
     def all(self):
         """Returns all the stored objects.
@@ -40,30 +140,1320 @@ class FileStorage:
             obj (BaseModel): The object to store.
         """
         obj_key = '{}.{}'.format(obj.__class__.__name__, obj.id)
-        self.__objects[obj_key] = obj
+        with self.__lock:
+            self.__objects[obj_key] = obj
+            self.__changes[obj_key] = obj
+            self.__records.pop(obj_key, None)
+            cls_objs = self.__class_index.setdefault(
+                obj.__class__.__name__, {}
+            )
+            cls_objs[obj.id] = obj_key
+            self.__index_attributes(obj_key, obj)
+
+    def import_file(self, cls, file_path, progress=None):
+        """Creates objects of a given class from the rows of a CSV or JSON
+        Lines file and stores them. The objects are saved once at the end,
+        and none of them are stored if a row is invalid.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            file_path (str): The path to the file.
+            progress (Callable): An optional function that is called with
+            the number of rows imported after each batch of rows.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If the class doesn't exist, the file isn't in a
+            known format, or a row is invalid.
+
+        Returns:
+            int: The number of objects created.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return import_objects(
+            self, self.model_classes[cls_name], file_path, progress
+        )
+
+    def export_file(self, cls, file_path, row_format=None, attrs=None,
+                    predicates=()):
+        """Writes the stored objects of a given class to a CSV, JSON
+        Lines, or columnar file, streaming their records from the storage.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            file_path (str): The path to the file.
+            row_format (str): The format of the file, which is determined
+            by the extension of the file if it is None.
+            attrs (list): The names of the attributes to export. All of the
+            attributes are exported if it is None.
+            predicates (Iterable): The predicates that the objects have to
+            satisfy, in the form accepted by Query.where.
+
+        Raises:
+            OSError: If the file can't be written.
+            ValueError: If the class doesn't exist, the format is unknown,
+            or a predicate is invalid.
+
+        Returns:
+            int: The number of objects exported.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return export_objects(
+            self, self.model_classes[cls_name], file_path, row_format, attrs,
+            predicates
+        )
+
+    def get(self, cls, id):
+        """Retrieves a stored object of a given class with a given id.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object if it exists, otherwise None.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        obj_key = self.__class_index.get(cls_name, {}).get(id, None)
+        return self.__objects.get(obj_key, None)
+
+    def count(self, cls=None):
+        """Counts the stored objects of a given class.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are counted if it is None.
+
+        Returns:
+            int: The number of objects.
+        """
+        if cls is None:
+            return len(self.__objects)
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        return len(self.__class_index.get(cls_name, {}))
+
+    def strings(self, cls=None):
+        """Generates the string representations of the stored objects
+        of a given class without materializing lazily loaded objects.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are included if it is None.
+
+        Yields:
+            str: The string representation of an object.
+        """
+        if cls is None:
+            obj_keys = self.__objects.keys()
+        else:
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            obj_keys = self.__class_index.get(cls_name, {}).values()
+        for obj_key in obj_keys:
+            value = dict.get(self.__objects, obj_key)
+            yield record_str(value) if is_record(value) else str(value)
+
+    def records(self, cls=None):
+        """Generates the serialized records of the stored objects of a
+        given class without materializing lazily loaded objects.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are included if it is None.
+
+        Yields:
+            dict: The serialized record of an object, which must not be
+            modified.
+        """
+        if cls is None:
+            obj_keys = self.__objects.keys()
+        else:
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            obj_keys = self.__class_index.get(cls_name, {}).values()
+        for obj_key in obj_keys:
+            value = dict.get(self.__objects, obj_key)
+            yield value if is_record(value) else value.to_dict()
+
+    def mark_changed(self, obj):
+        """Marks a stored object as changed so that the next save
+        persists it.
+
+        Args:
+            obj (BaseModel): The changed object.
+        """
+        obj_key = '{}.{}'.format(obj.__class__.__name__, obj.id)
+        with self.__lock:
+            if dict.get(self.__objects, obj_key, None) is obj:
+                self.__changes[obj_key] = obj
+                self.__index_attributes(obj_key, obj)
+
+    def related(self, cls, attr, id):
+        """Retrieves the stored objects of a given class whose attribute
+        refers to the object with a given id. The relationships between
+        the model classes are looked up in an index instead of scanning
+        the objects.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            attr (str): The attribute that holds the id.
+            id (str): The id of the referred object.
+
+        Returns:
+            list: The objects.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if attr in FOREIGN_KEYS.get(cls_name, ()):
+            index = self.__relation_index.get((cls_name, attr), {})
+            return [self.__objects[k] for k in list(index.get(id, {}))]
+        objs = []
+        for obj_key in list(self.__class_index.get(cls_name, {}).values()):
+            value = dict.get(self.__objects, obj_key)
+            if is_record(value):
+                value_id = value.get(attr, None)
+            else:
+                value_id = getattr(value, attr, None)
+            if value_id == id:
+                objs.append(self.__objects[obj_key])
+        return objs
+
+    def ordered(self, cls, attr, low=None, high=None, reverse=False):
+        """Generates the stored objects of a given class in the order of
+        a numeric attribute. The index of a declared attribute is created
+        when it is first used and kept up to date afterwards, so the first
+        objects of a range are found in O(log n) time, while the objects
+        are sorted on every call for the other attributes.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            attr (str): The name of the attribute.
+            low (int|float): The lowest value, which is included.
+            high (int|float): The highest value, which is included.
+            reverse (bool): Whether to start with the highest value.
+
+        Yields:
+            BaseModel: An object whose attribute is a number in the range.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock:
+            index = self.__sorted_indexes.get((cls_name, attr), None)
+            if index is None:
+                index = self.__sorted_index(cls_name, attr)
+                if attr in SORTED_ATTRS.get(cls_name, ()):
+                    self.__sorted_indexes[(cls_name, attr)] = index
+        for obj_key in index.keys(low, high, reverse):
+            obj = self.__objects.get(obj_key, None)
+            if obj is not None:
+                yield obj
+
+    def within(self, cls, south, west, north, east):
+        """Retrieves the stored objects of a given class in a box of
+        latitudes and longitudes. The objects are looked up in a grid
+        index, which is created when it is first used and kept up to date
+        afterwards.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            south (float): The south edge of the box.
+            west (float): The west edge of the box.
+            north (float): The north edge of the box.
+            east (float): The east edge of the box, which is less than the
+            west edge if the box crosses the 180th meridian.
+
+        Returns:
+            list: The objects, or an empty list if the class has no
+            location.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in LOCATION_ATTRS:
+            return []
+        with self.__lock:
+            index = self.__spatial_indexes.get(cls_name, None)
+            if index is None:
+                index = self.__spatial_index(cls_name)
+                self.__spatial_indexes[cls_name] = index
+            obj_keys = [k for k, _, _ in index.within(
+                south, west, north, east
+            )]
+        return [self.__objects[k] for k in obj_keys if k in self.__objects]
+
+    def near(self, cls, lat, lon, km, k=None):
+        """Retrieves the stored objects of a given class within a
+        distance of a location, which are looked up in a grid index.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            lat (float): The latitude of the location in degrees.
+            lon (float): The longitude of the location in degrees.
+            km (float): The maximum distance in kilometers.
+            k (int): The maximum number of objects, which are the nearest
+            ones. All the objects are included if it is None.
+
+        Returns:
+            list: The distances (in kilometers) and the objects, which
+            are sorted by their distances.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in LOCATION_ATTRS:
+            return []
+        with self.__lock:
+            index = self.__spatial_indexes.get(cls_name, None)
+            if index is None:
+                index = self.__spatial_index(cls_name)
+                self.__spatial_indexes[cls_name] = index
+            found = index.near(lat, lon, km, k)
+        return [
+            (distance, self.__objects[obj_key])
+            for distance, obj_key in found
+            if obj_key in self.__objects
+        ]
+
+    def search(self, cls, text, k=None):
+        """Ranks the stored objects whose free text contains any of the
+        words of a text. The full-text index is read from its file when it
+        is first used and kept up to date afterwards, and it's written
+        back to its file whenever the storage is saved.
+
+        Args:
+            cls (type|str): The class or the name of the class. The
+            objects of all the classes are searched if it is None.
+            text (str): The text to search for.
+            k (int): The maximum number of objects, which are the best
+            matches. All the matches are included if it is None.
+
+        Returns:
+            list: The scores and the objects, which are sorted from the
+            best match.
+        """
+        prefix = ''
+        if cls is not None:
+            cls_name = cls if isinstance(cls, str) else cls.__name__
+            if cls_name not in TEXT_ATTRS:
+                return []
+            prefix = cls_name + '.'
+        with self.__lock:
+            if self.__text_index is None:
+                self.__text_index = self.__load_text_index()
+            found = self.__text_index.search(text, k, prefix)
+        return [
+            (score, self.__objects[obj_key])
+            for score, obj_key in found
+            if obj_key in self.__objects
+        ]
+
+    def aggregate(self, cls, aggregates, group_by=None):
+        """Computes some aggregates of the stored objects of a given class
+        in groups. The attributes are read from a columnar copy of the
+        objects, which is created when it is first used and kept up to
+        date afterwards, with a column for each attribute aggregated so
+        far.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            aggregates (Iterable): The aggregates, such as 'count' or
+            'avg(price_by_night)', or tuples of a function and the name of
+            an attribute.
+            group_by (str): The name of the attribute whose values group
+            the objects. All the objects are in one group if it is None.
+
+        Raises:
+            ValueError: If the class doesn't exist or an aggregate is
+            invalid.
+
+        Returns:
+            list: A dictionary for each group, which holds the value of
+            the grouping attribute and the results of the aggregates by
+            their names.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        aggregates = [parse_aggregate(aggregate) for aggregate in aggregates]
+        with self.__lock:
+            table = self.__column_tables.get(cls_name, None)
+            if table is None:
+                table = ColumnTable(
+                    self.__class_index.get(cls_name, {}).values()
+                )
+                self.__column_tables[cls_name] = table
+            cls = self.model_classes[cls_name]
+            values = None
+            for attr in table_attributes(aggregates, group_by):
+                if attr in table.columns:
+                    continue
+                if values is None:
+                    values = [
+                        dict.get(self.__objects, k) for k in table.keys()
+                    ]
+                default = schema_defaults(cls).get(attr, None)
+                # is_record is inlined, since it is called for every object
+                table.add_column(attr, [
+                    value.get(attr, default) if type(value) is dict
+                    else getattr(value, attr, None)
+                    for value in values
+                ])
+            return table.aggregate(aggregates, group_by)
+
+    def has_changes(self):
+        """Checks if any stored object has changed since the storage
+        was last saved.
+
+        Returns:
+            bool: True if there are unsaved changes, otherwise False.
+        """
+        with self.__lock:
+            if (len(self.__changes) > 0) or self.__flush_pending:
+                return True
+            for value in dict.values(self.__objects):
+                if (not is_record(value)) and value._is_changed():
+                    return True
+            return False
+
+    def delete(self, obj=None):
+        """Removes an object from the stored objects.
+
+        Args:
+            obj (BaseModel): The object to remove.
+        """
+        if obj is None:
+            return
+        obj_key = '{}.{}'.format(obj.__class__.__name__, obj.id)
+        with self.__lock:
+            if obj_key in self.__objects:
+                self.__objects.pop(obj_key)
+                self.__changes[obj_key] = None
+                self.__records.pop(obj_key, None)
+                cls_objs = self.__class_index.get(obj.__class__.__name__, {})
+                cls_objs.pop(obj.id, None)
+                self.__index_attributes(obj_key, None)
 
     def save(self):
-        """Serializes the objects to a JSON file.
-        """
-        with open(self.__file_path, mode='w') as file:
-            json_objs = {}
-            for key, value in self.__objects.items():
-                json_objs[key] = value.to_dict()
-            file.write(JSONEncoder().encode(json_objs))
-
-    def reload(self):
-        """Deserializes the JSON file to objects if it exists.
-        """
-        if os.path.isfile(self.__file_path):
-            file_lines = []
-            with open(self.__file_path, mode='r') as file:
-                file_lines = file.readlines()
-            file_txt = ''.join(file_lines) if len(file_lines) > 0 else '{}'
-            json_objs = JSONDecoder().decode(file_txt)
-            base_model_objs = dict()
-            classes = self.model_classes
-            for key, value in json_objs.items():
-                cls_name = value['__class__']
-                if cls_name in classes.keys():
-                    base_model_objs[key] = classes[cls_name](**value)
+        """Serializes the objects to the storage file. Only the objects
+        that have changed since they were last saved are serialized again.
+        Inside a batch, the objects are only serialized when it ends, and
+        in the write-behind mode, they are serialized by a background
+        thread once the write-behind window has passed.
+        """
+        with self.__lock:
+            if self.__batch_depth > 0:
+                self.__batch_saved = True
+                return
+            if self.write_behind > 0:
+                self.__flush_pending = True
+                self.__start_flusher()
+                self.__flush_requested.notify()
+                return
+        with self.__write_lock:
+            self.__write()
+
+    def flush(self):
+        """Writes the saves that are waiting for the write-behind thread
+        and waits for the write to complete.
+        """
+        with self.__write_lock:
+            with self.__lock:
+                pending = self.__flush_pending
+            if pending:
+                self.__write()
+
+    def close(self):
+        """Writes the saves that are waiting for the write-behind thread
+        and the full-text index, and removes the lock file unless another
+        process holds the lock. The storage can still be used afterwards.
+        """
+        with self.__write_lock:
+            with self.__lock:
+                pending = self.__flush_pending
+            if pending:
+                self.__write()
+            self.__join_compaction()
+            with self.__file_lock.hold(shared=True):
+                with self.__lock:
+                    index = self.__text_index
+                    if (index is not None) and (
+                        index.changed or
+                        (index.fingerprint != self.__fingerprint()) or
+                        os.path.isfile(index.journal_path(
+                            self.text_index_path
+                        ))
+                    ):
+                        self.__dump_text_index(index, self.__fingerprint())
+        self.__file_lock.remove()
+
+    @contextmanager
+    def batch(self):
+        """Groups the changes made within a with statement so that the
+        saves requested in it are done once when it ends. If an exception
+        escapes the with statement, the stored objects are restored to
+        their state before it began and nothing is saved. Nested batches
+        are part of the outermost one.
+
+        Yields:
+            FileStorage: This storage.
+        """
+        if self.__batch_depth > 0:
+            self.__batch_depth += 1
+            try:
+                yield self
+            finally:
+                self.__batch_depth -= 1
+            return
+        with self.__lock:
+            snapshot = self.__take_snapshot()
+            self.__batch_depth = 1
+            self.__batch_saved = False
+        try:
+            yield self
+        except BaseException:
+            with self.__lock:
+                self.__batch_depth = 0
+                self.__restore_snapshot(snapshot)
+            raise
+        with self.__lock:
+            self.__batch_depth = 0
+        if self.__batch_saved:
+            self.__batch_saved = False
+            self.save()
+
+    def reload(self, *, progress=None):
+        """Deserializes the storage file to objects if it exists. The
+        entries of the file are read and turned into objects one at a
+        time so that the whole document is never held in memory. The
+        file is read without locking it, and read again if another
+        process writes it in the meantime.
+
+        Args:
+            progress (Callable): An optional function that is called
+            with the number of objects loaded, the number of bytes read,
+            and the size of the file every now and then while loading.
+
+        Returns:
+            int: The number of objects loaded.
+        """
+        self.flush()
+        self.__join_compaction()
+        generation, (base_model_objs, fingerprint) = self.__file_lock.read(
+            lambda: self.__read_objects(progress)
+        )
+        if base_model_objs is None:
+            return 0
+        with self.__lock:
             self.__objects = base_model_objs
+            self.__changes = dict()
+            self.__records = dict()
+            self.__disk_state = (generation, fingerprint, self.serializer)
+            self.__index_objects()
+        if progress is not None:
+            file_size = fingerprint[0][1]
+            progress(len(base_model_objs), file_size, file_size)
+        return len(base_model_objs)
+
+    def __read_objects(self, progress=None):
+        """Reads the objects in the storage file and its journals.
+
+        Args:
+            progress (Callable): An optional function that is called
+            with the number of objects loaded, the number of bytes read,
+            and the size of the file every now and then while loading.
+
+        Returns:
+            tuple: The objects, and the state of the files that were
+            read, which are both None if the storage file doesn't exist.
+        """
+        fingerprint = self.__fingerprint()
+        if fingerprint is None:
+            return None, None
+        file_size = fingerprint[0][1]
+        if self.lazy_mode:
+            base_model_objs = LazyObjects(self.__materialize)
+        else:
+            base_model_objs = dict()
+        classes = self.model_classes
+        bytes_read = 0
+        with open(self.__file_path, mode='rb') as file:
+            for key, value, bytes_read in self.serializer.load(file):
+                if value['__class__'] in classes.keys():
+                    base_model_objs[key] = self.__load_record(value)
+                    n = len(base_model_objs)
+                    if (progress is not None) and (n % 10000 == 0):
+                        progress(n, bytes_read, file_size)
+        for journal_path in self.__journal_paths():
+            self.__replay_journal(journal_path, base_model_objs)
+        return base_model_objs, fingerprint
+
+    def __take_snapshot(self):
+        """Captures the in-memory state of the stored objects. The
+        attribute values themselves aren't copied, so only assignments
+        can be undone.
+
+        Returns:
+            tuple: The state of the storage.
+        """
+        attrs = {}
+        for key, value in dict.items(self.__objects):
+            if not is_record(value):
+                attrs[key] = (dict(value._attributes()), value._is_changed())
+        return (
+            dict.copy(self.__objects),
+            attrs,
+            dict(self.__changes),
+            dict(self.__records),
+            self.__records_serializer
+        )
+
+    def __restore_snapshot(self, snapshot):
+        """Restores the in-memory state of the stored objects.
+
+        Args:
+            snapshot (tuple): The state captured by __take_snapshot.
+        """
+        objects, attrs, changes, records, records_serializer = snapshot
+        dict.clear(self.__objects)
+        dict.update(self.__objects, objects)
+        for key, (obj_attrs, changed) in attrs.items():
+            obj = dict.__getitem__(objects, key)
+            if obj._is_changed() == changed and \
+                    obj._attributes() == obj_attrs:
+                continue
+            for name in list(obj._attributes().keys()):
+                delattr(obj, name)
+            for name, value in obj_attrs.items():
+                setattr(obj, name, value)
+            if not changed:
+                obj._mark_persisted()
+        self.__changes = changes
+        self.__records = records
+        self.__records_serializer = records_serializer
+        self.__index_objects()
+
+    def __index_objects(self):
+        """Rebuilds the index of the stored objects by their class name
+        and id.
+        """
+        self.__class_index = dict()
+        for obj_key, value in dict.items(self.__objects):
+            if is_record(value):
+                cls_name, obj_id = value['__class__'], value['id']
+            else:
+                cls_name, obj_id = value.__class__.__name__, value.id
+            cls_objs = self.__class_index.setdefault(cls_name, {})
+            cls_objs[obj_id] = obj_key
+        self.__relation_index = dict()
+        self.__relation_keys = dict()
+        for obj_key, value in dict.items(self.__objects):
+            self.__index_attributes(obj_key, value)
+        self.__sorted_indexes = dict()
+        self.__spatial_indexes = dict()
+        self.__text_index = None
+        self.__column_tables = dict()
+
+    def __sorted_index(self, cls_name, attr):
+        """Creates an index of the objects of a class sorted by an
+        attribute. The lock must be held.
+
+        Args:
+            cls_name (str): The name of the class.
+            attr (str): The name of the attribute.
+
+        Returns:
+            SortedIndex: The index.
+        """
+        cls = self.model_classes[cls_name]
+        return SortedIndex(
+            (k, self.__attribute(dict.get(self.__objects, k), attr, cls))
+            for k in self.__class_index.get(cls_name, {}).values()
+        )
+
+    def __spatial_index(self, cls_name):
+        """Creates an index of the objects of a class by their location.
+        The lock must be held.
+
+        Args:
+            cls_name (str): The name of the class.
+
+        Returns:
+            GridIndex: The index.
+        """
+        cls = self.model_classes[cls_name]
+        lat_attr, lon_attr = LOCATION_ATTRS[cls_name]
+        defaults = schema_defaults(cls)
+        lat_default = defaults.get(lat_attr, None)
+        lon_default = defaults.get(lon_attr, None)
+        index = GridIndex()
+        for obj_key in self.__class_index.get(cls_name, {}).values():
+            value = dict.get(self.__objects, obj_key)
+            if is_record(value):
+                lat = value.get(lat_attr, lat_default)
+                lon = value.get(lon_attr, lon_default)
+            else:
+                lat = getattr(value, lat_attr, None)
+                lon = getattr(value, lon_attr, None)
+            index.add(obj_key, lat, lon)
+        return index
+
+    def __load_text_index(self):
+        """Reads the full-text index from its file and brings it up to
+        date with the stored objects, which are only read if the storage
+        has changed since the index was saved. The index is saved again
+        if it had to be updated. The lock must be held.
+
+        Returns:
+            TextIndex: The index.
+        """
+        try:
+            index = TextIndex.load(self.text_index_path)
+        except (OSError, ValueError, KeyError, TypeError):
+            index = TextIndex()
+        fingerprint = self.__fingerprint()
+        if (fingerprint is not None) and (index.fingerprint == fingerprint) \
+                and not self.has_changes():
+            return index
+        changed = False
+        obj_keys = set()
+        for cls_name in TEXT_ATTRS:
+            for obj_key in self.__class_index.get(cls_name, {}).values():
+                obj_keys.add(obj_key)
+                text = self.__text(dict.get(self.__objects, obj_key))
+                checksum = text_checksum(text)
+                if index.checksum(obj_key) != checksum:
+                    index.add(obj_key, text, checksum)
+                    changed = True
+        for obj_key in index.keys():
+            if obj_key not in obj_keys:
+                index.remove(obj_key)
+                changed = True
+        if changed or (index.fingerprint != fingerprint) or \
+                self.has_changes():
+            self.__dump_text_index(index, fingerprint)
+        return index
+
+    def __dump_text_index(self, index, fingerprint):
+        """Writes the full-text index to its file along with the state of
+        the storage that it matches, which is left unknown if some objects
+        haven't been saved. The lock must be held.
+
+        Args:
+            index (TextIndex): The index.
+            fingerprint (list): The state of the storage file and the
+            journal.
+        """
+        index.fingerprint = None if self.has_changes() else fingerprint
+        try:
+            index.dump(self.text_index_path)
+        except OSError:
+            pass
+
+    def __append_text_index(self, fingerprint):
+        """Appends the documents of the full-text index that have changed
+        to the journal of its file along with the state of the storage
+        that it matches, which is left unknown if some changes haven't
+        been written. The storage file and the lock must be held.
+
+        Args:
+            fingerprint (list): The state of the storage file and the
+            journal.
+        """
+        index = self.__text_index
+        if not index.changed:
+            return
+        pending = (len(self.__changes) > 0) or self.__flush_pending
+        index.fingerprint = None if pending else fingerprint
+        try:
+            index.dump_changes(self.text_index_path)
+        except OSError:
+            pass
+
+    def __fingerprint(self):
+        """Describes the state of the storage file and the journal.
+
+        Returns:
+            list: The paths, the sizes, the modification times, and the
+            inodes of the files, or None if the storage file doesn't
+            exist.
+        """
+        fingerprint = []
+        for file_path in [self.__file_path] + self.__journal_paths():
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                # removed by a compaction in another process
+                if file_path == self.__file_path:
+                    return None
+                continue
+            fingerprint.append([
+                file_path, stat.st_size, stat.st_mtime_ns, stat.st_ino
+            ])
+        return fingerprint
+
+    @staticmethod
+    def __text(value):
+        """Retrieves the free text of a stored object.
+
+        Args:
+            value (BaseModel|dict): The object or its record.
+
+        Returns:
+            str: The text attributes of the object joined by new lines.
+        """
+        if is_record(value):
+            return join_text(value['__class__'], value)
+        return join_text(value.__class__.__name__, value._attributes())
+
+    def __index_attributes(self, obj_key, value):
+        """Updates the indexes of the relationships and of the sorted
+        attributes of a stored object.
+
+        Args:
+            obj_key (str): The key of the object.
+            value (BaseModel|dict): The object, its record, or None if it
+            has been removed.
+        """
+        cls_name = obj_key.partition('.')[0]
+        for attr in SORTED_ATTRS.get(cls_name, ()):
+            index = self.__sorted_indexes.get((cls_name, attr), None)
+            if index is None:
+                continue
+            if value is None:
+                index.remove(obj_key)
+            else:
+                index.add(obj_key, self.__attribute(
+                    value, attr, self.model_classes[cls_name]
+                ))
+        index = self.__spatial_indexes.get(cls_name, None)
+        if index is not None:
+            if value is None:
+                index.remove(obj_key)
+            else:
+                cls = self.model_classes[cls_name]
+                lat_attr, lon_attr = LOCATION_ATTRS[cls_name]
+                index.add(
+                    obj_key,
+                    self.__attribute(value, lat_attr, cls),
+                    self.__attribute(value, lon_attr, cls)
+                )
+        if (self.__text_index is not None) and (cls_name in TEXT_ATTRS):
+            if value is None:
+                self.__text_index.remove(obj_key)
+            else:
+                self.__text_index.add(obj_key, self.__text(value))
+        table = self.__column_tables.get(cls_name, None)
+        if table is not None:
+            if value is None:
+                table.remove(obj_key)
+            else:
+                cls = self.model_classes[cls_name]
+                table.update(
+                    obj_key, lambda attr: self.__attribute(value, attr, cls)
+                )
+        for attr, parent_id in self.__relation_keys.pop(obj_key, ()):
+            index = self.__relation_index[(cls_name, attr)]
+            index[parent_id].pop(obj_key, None)
+            if len(index[parent_id]) == 0:
+                del index[parent_id]
+        if value is None:
+            return
+        if is_record(value):
+            cls_name, get = value['__class__'], value.get
+        else:
+            cls_name = value.__class__.__name__
+            get = value._attributes().get
+        keys = []
+        for attr in FOREIGN_KEYS.get(cls_name, ()):
+            parent_id = get(attr, None)
+            if isinstance(parent_id, str) and (parent_id != ''):
+                index = self.__relation_index.setdefault((cls_name, attr), {})
+                index.setdefault(parent_id, {})[obj_key] = None
+                keys.append((attr, parent_id))
+        if len(keys) > 0:
+            self.__relation_keys[obj_key] = tuple(keys)
+
+    @staticmethod
+    def __attribute(value, attr, cls):
+        """Retrieves an attribute of a stored object, which takes the
+        default value of its class if it isn't set.
+
+        Args:
+            value (BaseModel|dict): The object or its record.
+            attr (str): The name of the attribute.
+            cls (type): The class of the object.
+
+        Returns:
+            any: The value of the attribute, or None if it has none.
+        """
+        if is_record(value):
+            return value.get(attr, schema_defaults(cls).get(attr, None))
+        return getattr(value, attr, None)
+
+    def __load_record(self, record):
+        """Creates the object described by a serialized record, unless
+        the objects are lazily loaded.
+
+        Args:
+            record (dict): The serialized record of the object.
+
+        Returns:
+            BaseModel|dict: The object or the record in the lazy mode.
+        """
+        return record if self.lazy_mode else self.__materialize(record)
+
+    def __materialize(self, record):
+        """Creates the object described by a serialized record.
+
+        Args:
+            record (dict): The serialized record of the object. Its
+            datetime attributes can be ISO format strings or datetime
+            objects.
+
+        Returns:
+            BaseModel: The object.
+        """
+        cls = self.model_classes[record['__class__']]
+        if not isinstance(record.get('created_at', None), datetime):
+            obj = cls(**record)
+            obj._mark_persisted()
+            return obj
+        # the attributes are already deserialized, so there's nothing
+        # for the constructor to do
+        obj = cls.__new__(cls)
+        for key, value in record.items():
+            if key != '__class__':
+                setattr(obj, key, value)
+        obj._mark_persisted()
+        return obj
+
+    def __serialize_objects(self):
+        """Serializes the stored objects, reusing the serialized form of
+        the objects that haven't changed since they were last serialized.
+
+        Returns:
+            tuple: The serialized objects and the list of objects that
+            had to be serialized again.
+        """
+        if self.__records_serializer is not self.serializer:
+            self.__records = dict()
+            self.__records_serializer = self.serializer
+        records = {}
+        refreshed = []
+        cache = self.__records
+        to_record = self.serializer.to_record
+        for key, value in dict.items(self.__objects):
+            record = cache.get(key, None)
+            if is_record(value):
+                if record is None:
+                    record = to_record(value)
+                    cache[key] = record
+            elif (record is None) or value._is_changed():
+                record = to_record(value)
+                cache[key] = record
+                refreshed.append(value)
+            records[key] = record
+        return records, refreshed
+
+    def __journal_paths(self):
+        """Retrieves the journals to replay over the storage file, the
+        oldest first.
+
+        Returns:
+            list: The paths to the existing journals.
+        """
+        paths = ['{}.old'.format(self.journal_path), self.journal_path]
+        return list(filter(os.path.isfile, paths))
+
+    def __replay_journal(self, journal_path, base_model_objs):
+        """Applies the changes recorded in a journal to a dictionary
+        of objects.
+
+        Args:
+            journal_path (str): The path to the journal.
+            base_model_objs (dict): The objects to apply the changes to.
+        """
+        for key, value in self.__journal_entries(journal_path):
+            if value is None:
+                dict.pop(base_model_objs, key, None)
+            elif value['__class__'] in self.model_classes.keys():
+                base_model_objs[key] = self.__load_record(value)
+
+    @staticmethod
+    def __journal_entries(journal_path, offset=0):
+        """Reads the changes recorded in a journal.
+
+        Args:
+            journal_path (str): The path to the journal.
+            offset (int): The position of the first entry to read.
+
+        Yields:
+            tuple: The key of an object, and its serialized record or None
+            if it was removed.
+        """
+        decoder = JSONDecoder()
+        try:
+            file = open(journal_path, mode='rb')
+        except FileNotFoundError:
+            # removed by a compaction in another process
+            return
+        with file:
+            file.seek(offset)
+            for line in file:
+                try:
+                    entry = decoder.decode(line.decode('utf-8'))
+                except ValueError:
+                    # an incomplete entry from an interrupted write
+                    break
+                yield entry['key'], entry['value']
+
+    def __start_flusher(self):
+        """Starts the write-behind thread if it isn't running.
+        """
+        if self.__flusher is None:
+            self.__flusher = threading.Thread(
+                target=self.__run_flusher,
+                daemon=True
+            )
+            self.__flusher.start()
+            if not self.__flusher_registered:
+                atexit.register(self.flush)
+                self.__flusher_registered = True
+
+    def __run_flusher(self):
+        """Writes the requested saves after waiting for the write-behind
+        window, so that the saves made within the window are merged.
+        """
+        try:
+            while True:
+                with self.__lock:
+                    while not self.__flush_pending:
+                        self.__flush_requested.wait()
+                time.sleep(self.write_behind)
+                self.flush()
+        finally:
+            with self.__lock:
+                self.__flusher = None
+
+    def __write(self):
+        """Writes the pending changes to the journal or the objects to
+        the storage file. The storage file is locked while it's written,
+        and the changes other processes made to it since it was last read
+        are merged first so that they aren't overwritten. The write lock
+        must be held.
+        """
+        self.__join_compaction()
+        with self.__file_lock.update() as (generation, new_generation):
+            with self.__lock:
+                self.__flush_pending = False
+                self.__merge_disk(generation)
+                if self.journal_mode and os.path.isfile(self.__file_path):
+                    lines = self.__journal_lines()
+                else:
+                    lines = None
+                    records = self.__refresh_records()
+                    self.__changes.clear()
+            if lines is None:
+                self.__write_snapshot(records, self.__journal_paths())
+            else:
+                self.__append_journal(lines, new_generation)
+            fingerprint = self.__fingerprint()
+            with self.__lock:
+                self.__disk_state = (
+                    new_generation, fingerprint, self.serializer
+                )
+                if self.__text_index is not None:
+                    self.__append_text_index(fingerprint)
+
+    def __merge_disk(self, generation):
+        """Brings the stored objects up to date with the changes other
+        processes made to the storage file since it was last read or
+        written. The objects that were changed in this process keep their
+        changes. The storage file and the lock must be held.
+
+        Args:
+            generation (int): The generation of the storage file.
+        """
+        fingerprint = self.__fingerprint()
+        if fingerprint is None:
+            return
+        offsets = None
+        serializer = self.serializer
+        if self.__disk_state is not None:
+            disk_generation, disk_fingerprint, serializer = self.__disk_state
+            if (disk_generation == generation) and \
+                    (disk_fingerprint == fingerprint):
+                return
+            offsets = self.__journal_offsets(disk_fingerprint, fingerprint)
+        records = {}
+        complete = offsets is None
+        if complete:
+            # the storage file was replaced, so it's read in full with
+            # the serializer it was last read or written with
+            with open(self.__file_path, mode='rb') as file:
+                for key, value, _ in serializer.load(file):
+                    records[key] = value
+            offsets = [(entry[0], 0) for entry in fingerprint[1:]]
+        for journal_path, offset in offsets:
+            for key, value in self.__journal_entries(journal_path, offset):
+                records[key] = value
+        self.__merge_records(records, complete)
+
+    @staticmethod
+    def __journal_offsets(old_fingerprint, fingerprint):
+        """Finds where the journals have grown since the storage file was
+        last read or written.
+
+        Args:
+            old_fingerprint (list): The state of the files back then.
+            fingerprint (list): The current state of the files.
+
+        Returns:
+            list: The paths to the journals and the positions of their
+            new entries, or None if the storage file was replaced.
+        """
+        if (old_fingerprint is None) or (old_fingerprint[0] != fingerprint[0]):
+            return None
+        # a journal keeps its inode when it's renamed for a compaction
+        sizes = {entry[3]: entry[1] for entry in old_fingerprint[1:]}
+        offsets = []
+        for journal_path, size, _, inode in fingerprint[1:]:
+            offset = sizes.get(inode, 0)
+            if size < offset:
+                return None
+            offsets.append((journal_path, offset))
+        return offsets
+
+    def __merge_records(self, records, complete):
+        """Applies the serialized objects read from the storage file to
+        the stored objects, except for the objects changed in this
+        process. The lock must be held.
+
+        Args:
+            records (dict): The serialized objects, which are None for
+            the removed objects.
+            complete (bool): Whether the records are all the objects in
+            the storage file, so that the objects missing from them have
+            been removed.
+        """
+        if self.__records_serializer is not self.serializer:
+            self.__records = dict()
+            self.__records_serializer = self.serializer
+        cache = self.__records
+        to_record = self.serializer.to_record
+        classes = self.model_classes
+        obj_keys = list(records.keys())
+        if complete:
+            obj_keys.extend(
+                key for key in dict.keys(self.__objects) if key not in records
+            )
+        for obj_key in obj_keys:
+            if obj_key in self.__changes:
+                continue
+            value = dict.get(self.__objects, obj_key, None)
+            if (value is not None) and not is_record(value) and \
+                    value._is_changed():
+                continue
+            record = records.get(obj_key, None)
+            if (record is None) or (record['__class__'] not in classes.keys()):
+                if value is not None:
+                    self.__discard(obj_key)
+                continue
+            disk_record = to_record(record)
+            if value is not None:
+                local_record = cache.get(obj_key, None)
+                if local_record is None:
+                    local_record = to_record(value)
+                if local_record == disk_record:
+                    continue
+            if (value is None) or is_record(value):
+                value = self.__load_record(record)
+                dict.__setitem__(self.__objects, obj_key, value)
+            else:
+                # the object is updated in place as it may be referred to
+                disk_obj = self.__materialize(record)
+                for name in list(value._attributes().keys()):
+                    delattr(value, name)
+                for name, attr in disk_obj._attributes().items():
+                    setattr(value, name, attr)
+                value._mark_persisted()
+            cache[obj_key] = disk_record
+            cls_name, _, obj_id = obj_key.partition('.')
+            self.__class_index.setdefault(cls_name, {})[obj_id] = obj_key
+            self.__index_attributes(obj_key, value)
+
+    def __discard(self, obj_key):
+        """Removes a stored object that was removed from the storage file
+        by another process. The lock must be held.
+
+        Args:
+            obj_key (str): The key of the object.
+        """
+        dict.pop(self.__objects, obj_key)
+        self.__records.pop(obj_key, None)
+        cls_name, _, obj_id = obj_key.partition('.')
+        self.__class_index.get(cls_name, {}).pop(obj_id, None)
+        self.__index_attributes(obj_key, None)
+
+    def __refresh_records(self):
+        """Serializes the stored objects and marks the objects that had
+        to be serialized again as persisted. The lock must be held.
+
+        Returns:
+            dict: The serialized objects.
+        """
+        while True:
+            try:
+                records, refreshed = self.__serialize_objects()
+                break
+            except RuntimeError:
+                # an object gained an attribute in another thread while
+                # it was being serialized
+                continue
+        for obj in refreshed:
+            obj._mark_persisted()
+            self.__index_attributes(
+                '{}.{}'.format(obj.__class__.__name__, obj.id), obj
+            )
+        return records
+
+    def __journal_lines(self):
+        """Encodes the pending changes as journal entries. The lock must
+        be held.
+
+        Returns:
+            list: The lines of the journal entries.
+        """
+        encoder = JSONEncoder()
+        lines = []
+        for key, value in self.__changes.items():
+            entry = {
+                'key': key,
+                'value': value.to_dict() if value is not None else None
+            }
+            lines.append(encoder.encode(entry) + '\n')
+            if value is not None:
+                # the object is serialized again by the next compaction
+                value._mark_persisted()
+                self.__records.pop(key, None)
+        self.__changes.clear()
+        return lines
+
+    def __append_journal(self, lines, generation):
+        """Appends entries to the journal and compacts it if it has
+        grown past the journal limit. The storage file must be locked.
+
+        Args:
+            lines (list): The lines of the journal entries.
+            generation (int): The generation of the storage file after
+            the entries are appended.
+        """
+        with open(self.journal_path, mode='a') as file:
+            file.write(''.join(lines))
+            file.flush()
+            os.fsync(file.fileno())
+            journal_size = file.tell()
+        if journal_size > self.journal_limit:
+            self.__compact(generation)
+
+    def __compact(self, generation):
+        """Folds the journal into the storage file in the background.
+        The storage file must be locked.
+
+        Args:
+            generation (int): The generation of the storage file that
+            the objects are up to date with.
+        """
+        self.__join_compaction()
+        with self.__lock:
+            records = self.__refresh_records()
+        old_journal_path = '{}.old'.format(self.journal_path)
+        if os.path.isfile(old_journal_path):
+            # left behind by an interrupted compaction
+            with open(self.journal_path, mode='r') as src:
+                with open(old_journal_path, mode='a') as dest:
+                    dest.write(src.read())
+            os.unlink(self.journal_path)
+        else:
+            os.replace(self.journal_path, old_journal_path)
+        self.__sync_directory()
+        self.__compaction = threading.Thread(
+            target=self.__run_compaction,
+            args=(records, old_journal_path, generation)
+        )
+        self.__compaction.start()
+
+    def __run_compaction(self, records, old_journal_path, generation):
+        """Writes the objects folded from the old journal to the storage
+        file once the lock on the storage file can be held. The old
+        journal is left for a later compaction if another process wrote
+        the storage file in the meantime, as the objects may be stale.
+
+        Args:
+            records (dict): The serialized objects.
+            old_journal_path (str): The path to the old journal.
+            generation (int): The generation of the storage file that
+            the objects are up to date with.
+        """
+        with self.__file_lock.update() as (current, new_generation):
+            if current != generation:
+                return
+            self.__write_snapshot(records, [old_journal_path])
+            fingerprint = self.__fingerprint()
+            with self.__lock:
+                if (self.__disk_state is not None) and \
+                        (self.__disk_state[0] == generation):
+                    self.__disk_state = (
+                        new_generation, fingerprint, self.serializer
+                    )
+                    if self.__text_index is not None:
+                        # the journal of the index is folded as well
+                        self.__dump_text_index(self.__text_index, fingerprint)
+
+    def __join_compaction(self):
+        """Waits for a running compaction to complete.
+        """
+        if self.__compaction is not None:
+            self.__compaction.join()
+            self.__compaction = None
+
+    def __write_snapshot(self, records, journal_paths):
+        """Writes a dictionary of serialized objects to the storage
+        file and discards the journals it supersedes. The objects are
+        written to a temporary file which then replaces the storage file,
+        so the storage file is never left partially written.
+
+        Args:
+            records (dict): The serialized objects.
+            journal_paths (list): The paths to the superseded journals.
+        """
+        tmp_path = '{}.{}.tmp'.format(self.__file_path, os.getpid())
+        try:
+            with open(tmp_path, mode='wb') as file:
+                if os.path.isfile(self.__file_path):
+                    os.chmod(tmp_path, os.stat(self.__file_path).st_mode)
+                self.serializer.dump(file, records.items())
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.__file_path)
+        except BaseException:
+            # the temporary file may not have been created
+            if os.path.isfile(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.__sync_directory()
+        for journal_path in journal_paths:
+            os.unlink(journal_path)
+
+    def __sync_directory(self):
+        """Flushes the entries of the directory containing the storage
+        file to the disk so that renaming files in it is durable.
+        """
+        dir_path = os.path.dirname(os.path.abspath(self.__file_path))
+        try:
+            fd = os.open(dir_path, os.O_RDONLY)
+        except OSError:
+            # directories can't be opened on some platforms
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""A module for reading the entries of a JSON object incrementally.
+"""
+import codecs
+from json import JSONDecodeError, JSONDecoder
+
+
+WHITESPACE = ' \t\n\r'
+"""The characters that can separate the tokens of a JSON document.
+"""
+NUMBER_CHARS = '0123456789+-.eE'
+"""The characters that can continue a JSON number.
+"""
+LITERALS = ('true', 'false', 'null', 'NaN', 'Infinity', '-Infinity')
+"""The literal values that the decoder accepts.
+"""
+
+
+def is_truncated(error):
+    """Checks if a decoding error can be caused by the document being cut
+    short, in which case reading more of it may resolve the error.
+
+    Args:
+        error (JSONDecodeError): The error.
+
+    Returns:
+        bool: True if the error is at the end of the document.
+    """
+    if error.msg.startswith('Unterminated string'):
+        return True
+    rest = error.doc[error.pos:]
+    if error.msg.startswith('Invalid \\uXXXX escape'):
+        return (len(rest) <= 5) and ('"' not in rest)
+    if all(c in NUMBER_CHARS for c in rest):
+        # a number in an array or an object that continues further on
+        return True
+    return any(literal.startswith(rest) for literal in LITERALS)
+
+
+def iter_json_object(file, chunk_size=1 << 16):
+    """Reads the key-value pairs of the top-level JSON object in a
+    binary file one at a time without decoding the whole document.
+
+    Args:
+        file (BinaryIO): The file to read from.
+        chunk_size (int): The number of bytes to read at a time.
+
+    Yields:
+        tuple: The key, the value, and the number of bytes read so far.
+
+    Raises:
+        JSONDecodeError: If the document isn't a valid JSON object.
+    """
+    decoder = JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    bytes_read = 0
+    eof = False
+    state = 'start'
+
+    while True:
+        while pos < len(buf) and buf[pos] in WHITESPACE:
+            pos += 1
+        try:
+            if pos >= len(buf):
+                raise IndexError()
+            if state == 'start':
+                if buf[pos] != '{':
+                    raise JSONDecodeError('Expecting "{"', buf, pos)
+                pos += 1
+                state = 'first_key'
+            elif state in ('first_key', 'next_key'):
+                if buf[pos] == '}':
+                    return
+                if state == 'next_key':
+                    if buf[pos] != ',':
+                        raise JSONDecodeError('Expecting ","', buf, pos)
+                    pos += 1
+                state = 'key'
+            elif state == 'key':
+                key, end = decoder.raw_decode(buf, pos)
+                if not isinstance(key, str):
+                    raise JSONDecodeError('Expecting a key', buf, pos)
+                colon = end
+                while colon < len(buf) and buf[colon] in WHITESPACE:
+                    colon += 1
+                if colon >= len(buf):
+                    raise IndexError()
+                if buf[colon] != ':':
+                    raise JSONDecodeError('Expecting ":"', buf, colon)
+                pos = colon + 1
+                state = 'value'
+            elif state == 'value':
+                value, end = decoder.raw_decode(buf, pos)
+                if (not eof) and all(c in NUMBER_CHARS for c in buf[end:]):
+                    # numbers and literals can continue in the next chunk
+                    raise IndexError()
+                pos = end
+                state = 'next_key'
+                yield key, value, bytes_read
+        except (IndexError, JSONDecodeError) as ex:
+            if isinstance(ex, JSONDecodeError) and not is_truncated(ex):
+                # more of the document can't fix an error in the middle
+                raise
+            if eof:
+                if (state == 'start') and (len(buf.strip()) == 0):
+                    return
+                if isinstance(ex, JSONDecodeError):
+                    raise
+                raise JSONDecodeError('Unexpected end of data', buf, pos)
+            chunk = file.read(chunk_size)
+            bytes_read += len(chunk)
+            eof = len(chunk) == 0
+            buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+            pos = 0
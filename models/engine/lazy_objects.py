@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""A module containing a dictionary of lazily materialized objects.
+"""
+from collections.abc import ItemsView, ValuesView
+from datetime import datetime
+
+
+def is_record(value):
+    """Checks if a stored value is still in its serialized form.
+
+    Args:
+        value (BaseModel|dict): The stored value.
+
+    Returns:
+        bool: True if the value is a serialized record, otherwise False.
+    """
+    return type(value) is dict
+
+
+def record_str(record):
+    """Creates the string representation of the object that a
+    serialized record describes without creating the object.
+
+    Args:
+        record (dict): The serialized record of the object. Its datetime
+        attributes can be ISO format strings or datetime objects.
+
+    Returns:
+        str: The same string representation as BaseModel.__str__.
+    """
+    attrs = {}
+    for key, value in record.items():
+        if key != '__class__':
+            if (key in ('created_at', 'updated_at')) and \
+                    isinstance(value, str):
+                attrs[key] = datetime.fromisoformat(value)
+            else:
+                attrs[key] = value
+    return '[{}] ({}) {}'.format(record['__class__'], record['id'], attrs)
+
+
+class LazyObjects(dict):
+    """Represents a dictionary of stored objects in which an object can
+    be kept in its serialized form until it is accessed for the first time.
+    """
+    def __init__(self, materialize, *args, **kwargs):
+        """Initializes a new LazyObjects dictionary.
+
+        Args:
+            materialize (Callable): The function that creates an object
+            from its serialized record.
+            *args (tuple): The arguments for the dict constructor.
+            kwargs: The keyword arguments for the dict constructor.
+        """
+        super().__init__(*args, **kwargs)
+        self.__materialize = materialize
+
+    def __getitem__(self, key):
+        """Retrieves the object with the given key, creating it from its
+        serialized record if necessary.
+
+        Args:
+            key (str): The key of the object.
+
+        Returns:
+            BaseModel: The object.
+        """
+        value = super().__getitem__(key)
+        if is_record(value):
+            value = self.__materialize(value)
+            super().__setitem__(key, value)
+        return value
+
+    def get(self, key, default=None):
+        """Retrieves the object with the given key if it exists.
+
+        Args:
+            key (str): The key of the object.
+            default (any): The value to return if the key doesn't exist.
+
+        Returns:
+            BaseModel: The object if it exists, otherwise the default.
+        """
+        return self[key] if key in self else default
+
+    def pop(self, key, *args):
+        """Removes the object with the given key.
+
+        Args:
+            key (str): The key of the object.
+            *args (tuple): The value to return if the key doesn't exist.
+
+        Returns:
+            BaseModel: The removed object.
+        """
+        if key in self:
+            value = self[key]
+            super().__delitem__(key)
+            return value
+        return super().pop(key, *args)
+
+    def values(self):
+        """Retrieves a view of the objects in this dictionary.
+
+        Returns:
+            ValuesView: The view of the objects.
+        """
+        return ValuesView(self)
+
+    def items(self):
+        """Retrieves a view of the key-object pairs in this dictionary.
+
+        Returns:
+            ItemsView: The view of the key-object pairs.
+        """
+        return ItemsView(self)
@@ -0,0 +1,498 @@
+#!/usr/bin/python3
+"""A module containing the read-only memory-mapped storage engine.
+"""
+import io
+import mmap
+import os
+from bisect import bisect_left
+from collections.abc import Mapping
+from contextlib import contextmanager
+from json import JSONDecoder
+
+from models.compact import schema_defaults
+from models.engine.columns import aggregate_records
+from models.engine.lazy_objects import record_str
+from models.engine.serializers import MmapTable
+from models.engine.sorted_index import SortedIndex
+from models.engine.spatial_index import (
+    bounding_box, in_box, is_location, nearest
+)
+from models.engine.text_index import search_records
+from models.exporter import export_objects
+from models.registry import LOCATION_ATTRS, TEXT_ATTRS, ModelRegistry
+
+
+class MmapObjects(Mapping):
+    """Represents a read-only view of the objects in a MmapStorage, which
+    are only decoded when they are accessed.
+    """
+
+    def __init__(self, storage):
+        """Initializes a new MmapObjects view.
+
+        Args:
+            storage (MmapStorage): The storage of the objects.
+        """
+        self.__storage = storage
+
+    def __getitem__(self, key):
+        """Retrieves the object with the given key.
+
+        Args:
+            key (str): The key of the object.
+
+        Returns:
+            BaseModel: The object.
+        """
+        cls_name, _, obj_id = key.partition('.')
+        obj = self.__storage.get(cls_name, obj_id)
+        if obj is None:
+            raise KeyError(key)
+        return obj
+
+    def __iter__(self):
+        """Iterates over the keys of the objects.
+
+        Yields:
+            str: The key of an object.
+        """
+        yield from self.__storage.keys()
+
+    def __len__(self):
+        """Counts the objects.
+
+        Returns:
+            int: The number of objects.
+        """
+        return self.__storage.count()
+
+
+class MmapStorage:
+    """Represents the read-only storage of a file in the memory-mapped
+    format. Opening the file takes the same time regardless of its size,
+    and the processes that open the same file share its pages.
+    """
+
+    def __init__(self, file_path=None):
+        """Initializes a MmapStorage instance.
+
+        Args:
+            file_path (str): The path to the storage file. It is read from
+            the HBNB_MMAP_PATH environment variable if it is None.
+        """
+        if file_path is None:
+            file_path = os.getenv('HBNB_MMAP_PATH', 'file.mmap')
+        self.file_path = file_path
+        self.model_classes = ModelRegistry()
+        self.__decoder = JSONDecoder()
+        self.__buf = None
+        self.__table = []
+        self.__objects = dict()
+
+    def all(self):
+        """Returns all the stored objects.
+
+        Returns:
+            MmapObjects: A view of the stored objects.
+        """
+        return MmapObjects(self)
+
+    def keys(self):
+        """Generates the keys of the stored objects.
+
+        Yields:
+            str: The key of an object.
+        """
+        for i in range(len(self.__table)):
+            yield self.__table[i].decode('utf-8')
+
+    def get(self, cls, id):
+        """Retrieves a stored object of a given class with a given id.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object if it exists, otherwise None.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            return None
+        obj_key = '{}.{}'.format(cls_name, id)
+        obj = self.__objects.get(obj_key, None)
+        if obj is not None:
+            return obj
+        key = obj_key.encode('utf-8')
+        i = bisect_left(self.__table, key)
+        if (i >= len(self.__table)) or (self.__table[i] != key):
+            return None
+        record = self.__decoder.decode(self.__table.entry(i)[1])
+        obj = self.model_classes[cls_name](**record)
+        obj._mark_persisted()
+        self.__objects[obj_key] = obj
+        return obj
+
+    def count(self, cls=None):
+        """Counts the stored objects of a given class.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are counted if it is None.
+
+        Returns:
+            int: The number of objects.
+        """
+        if cls is None:
+            return len(self.__table)
+        start, end = self.__class_range(cls)
+        return end - start
+
+    def strings(self, cls=None):
+        """Generates the string representations of the stored objects
+        of a given class without creating the objects.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are included if it is None.
+
+        Yields:
+            str: The string representation of an object.
+        """
+        if cls is None:
+            start, end = 0, len(self.__table)
+        else:
+            start, end = self.__class_range(cls)
+        for i in range(start, end):
+            yield record_str(self.__decoder.decode(self.__table.entry(i)[1]))
+
+    def records(self, cls=None):
+        """Generates the serialized records of the stored objects of a
+        given class without creating the objects.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are included if it is None.
+
+        Yields:
+            dict: The serialized record of an object.
+        """
+        if cls is None:
+            start, end = 0, len(self.__table)
+        else:
+            start, end = self.__class_range(cls)
+        for i in range(start, end):
+            yield self.__decoder.decode(self.__table.entry(i)[1])
+
+    def related(self, cls, attr, id):
+        """Retrieves the stored objects of a given class whose attribute
+        refers to the object with a given id.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            attr (str): The attribute that holds the id.
+            id (str): The id of the referred object.
+
+        Returns:
+            list: The objects.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        objs = []
+        start, end = self.__class_range(cls_name)
+        for i in range(start, end):
+            record = self.__decoder.decode(self.__table.entry(i)[1])
+            if record.get(attr, None) == id:
+                objs.append(self.get(cls_name, record['id']))
+        return objs
+
+    def ordered(self, cls, attr, low=None, high=None, reverse=False):
+        """Generates the stored objects of a given class in the order of
+        a numeric attribute, which are sorted by decoding the records of
+        the class.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            attr (str): The name of the attribute.
+            low (int|float): The lowest value, which is included.
+            high (int|float): The highest value, which is included.
+            reverse (bool): Whether to start with the highest value.
+
+        Yields:
+            BaseModel: An object whose attribute is a number in the range.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            return
+        default = schema_defaults(self.model_classes[cls_name]).get(attr, None)
+        index = SortedIndex(
+            (record['id'], record.get(attr, default))
+            for record in self.records(cls_name)
+        )
+        for obj_id in index.keys(low, high, reverse):
+            yield self.get(cls_name, obj_id)
+
+    def within(self, cls, south, west, north, east):
+        """Retrieves the stored objects of a given class in a box of
+        latitudes and longitudes by decoding the records of the class.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            south (float): The south edge of the box.
+            west (float): The west edge of the box.
+            north (float): The north edge of the box.
+            east (float): The east edge of the box, which is less than the
+            west edge if the box crosses the 180th meridian.
+
+        Returns:
+            list: The objects.
+        """
+        return [
+            self.get(cls, record['id'])
+            for record, lat, lon in self.__locations(cls)
+            if in_box(lat, lon, south, west, north, east)
+        ]
+
+    def near(self, cls, lat, lon, km, k=None):
+        """Retrieves the stored objects of a given class within a
+        distance of a location by decoding the records of the class.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            lat (float): The latitude of the location in degrees.
+            lon (float): The longitude of the location in degrees.
+            km (float): The maximum distance in kilometers.
+            k (int): The maximum number of objects, which are the nearest
+            ones. All the objects are included if it is None.
+
+        Returns:
+            list: The distances (in kilometers) and the objects, which
+            are sorted by their distances.
+        """
+        south, west, north, east = bounding_box(lat, lon, km)
+        found = nearest(
+            (
+                (record['id'], record_lat, record_lon)
+                for record, record_lat, record_lon in self.__locations(cls)
+                if in_box(record_lat, record_lon, south, west, north, east)
+            ),
+            lat, lon, km, k
+        )
+        return [
+            (distance, self.get(cls, obj_id)) for distance, obj_id in found
+        ]
+
+    def search(self, cls, text, k=None):
+        """Ranks the stored objects of a given class whose text matches
+        a text with BM25 by decoding the records of the class.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are searched if it is None.
+            text (str): The text to search for.
+            k (int): The maximum number of objects, which are the best
+            matches. All the matches are included if it is None.
+
+        Returns:
+            list: The scores and the objects, which are sorted from the
+            best match.
+        """
+        found = search_records(
+            (
+                record for record in self.records(cls)
+                if record['__class__'] in TEXT_ATTRS
+            ),
+            text, k
+        )
+        return [
+            (score, self.get(*key.split('.', 1))) for score, key in found
+        ]
+
+    def aggregate(self, cls, aggregates, group_by=None):
+        """Computes some aggregates of the stored objects of a given class
+        in groups, by putting the attributes of their records in columns.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            aggregates (Iterable): The aggregates, such as 'count' or
+            'avg(price_by_night)', or tuples of a function and the name of
+            an attribute.
+            group_by (str): The name of the attribute whose values group
+            the objects. All the objects are in one group if it is None.
+
+        Raises:
+            ValueError: If the class doesn't exist or an aggregate is
+            invalid.
+
+        Returns:
+            list: A dictionary for each group, which holds the value of
+            the grouping attribute and the results of the aggregates by
+            their names.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return aggregate_records(
+            self.records(cls_name), self.model_classes[cls_name], aggregates,
+            group_by
+        )
+
+    def new(self, obj):
+        """Refuses to store a new object.
+
+        Raises:
+            UnsupportedOperation: Always.
+        """
+        raise io.UnsupportedOperation('The storage is read-only')
+
+    def import_file(self, cls, file_path, progress=None):
+        """Refuses to import objects.
+
+        Raises:
+            UnsupportedOperation: Always.
+        """
+        raise io.UnsupportedOperation('The storage is read-only')
+
+    def export_file(self, cls, file_path, row_format=None, attrs=None,
+                    predicates=()):
+        """Writes the stored objects of a given class to a CSV, JSON
+        Lines, or columnar file, streaming their records from the storage.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            file_path (str): The path to the file.
+            row_format (str): The format of the file, which is determined
+            by the extension of the file if it is None.
+            attrs (list): The names of the attributes to export. All of the
+            attributes are exported if it is None.
+            predicates (Iterable): The predicates that the objects have to
+            satisfy, in the form accepted by Query.where.
+
+        Raises:
+            OSError: If the file can't be written.
+            ValueError: If the class doesn't exist, the format is unknown,
+            or a predicate is invalid.
+
+        Returns:
+            int: The number of objects exported.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return export_objects(
+            self, self.model_classes[cls_name], file_path, row_format, attrs,
+            predicates
+        )
+
+    def mark_changed(self, obj):
+        """Refuses to mark an object as changed.
+
+        Raises:
+            UnsupportedOperation: Always.
+        """
+        raise io.UnsupportedOperation('The storage is read-only')
+
+    def delete(self, obj=None):
+        """Refuses to remove an object.
+
+        Raises:
+            UnsupportedOperation: Always.
+        """
+        raise io.UnsupportedOperation('The storage is read-only')
+
+    def save(self):
+        """Refuses to save the objects.
+
+        Raises:
+            UnsupportedOperation: Always.
+        """
+        raise io.UnsupportedOperation('The storage is read-only')
+
+    def flush(self):
+        """Does nothing since nothing is ever written.
+        """
+
+    @contextmanager
+    def batch(self):
+        """Does nothing since nothing is ever written.
+
+        Yields:
+            MmapStorage: This storage.
+        """
+        yield self
+
+    def reload(self, *, progress=None):
+        """Maps the storage file into memory if it exists. Only the header
+        of the file is read.
+
+        Args:
+            progress (Callable): An optional function that is called
+            with the number of objects, the number of bytes read, and the
+            size of the file.
+
+        Returns:
+            int: The number of stored objects.
+        """
+        self.close()
+        if os.path.isfile(self.file_path) and \
+                (os.stat(self.file_path).st_size > 0):
+            with open(self.file_path, mode='rb') as file:
+                self.__buf = mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            self.__table = MmapTable(self.__buf)
+        if progress is not None:
+            file_size = len(self.__buf) if self.__buf is not None else 0
+            progress(len(self.__table), file_size, file_size)
+        return len(self.__table)
+
+    def close(self):
+        """Unmaps the storage file and forgets the decoded objects.
+        """
+        self.__objects = dict()
+        self.__table = []
+        if self.__buf is not None:
+            self.__buf.close()
+            self.__buf = None
+
+    def __locations(self, cls):
+        """Generates the records of the objects of a class that have a
+        valid location.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+
+        Yields:
+            tuple: The record of an object and its latitude and longitude.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in LOCATION_ATTRS:
+            return
+        model_cls = self.model_classes[cls_name]
+        lat_attr, lon_attr = LOCATION_ATTRS[cls_name]
+        defaults = schema_defaults(model_cls)
+        lat_default = defaults.get(lat_attr, None)
+        lon_default = defaults.get(lon_attr, None)
+        for record in self.records(cls_name):
+            lat = record.get(lat_attr, lat_default)
+            lon = record.get(lon_attr, lon_default)
+            if is_location(lat, lon):
+                yield record, lat, lon
+
+    def __class_range(self, cls):
+        """Finds the positions of the records of a class, which are next
+        to each other since the records are sorted by their keys.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+
+        Returns:
+            tuple: The position of the first record of the class and the
+            position after its last record.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        prefix = cls_name.encode('utf-8')
+        # '/' follows '.', so the keys of the class are below this bound
+        return (
+            bisect_left(self.__table, prefix + b'.'),
+            bisect_left(self.__table, prefix + b'/')
+        )
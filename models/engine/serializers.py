@@ -0,0 +1,431 @@
+#!/usr/bin/python3
+"""A module containing the serializers of the file storage engine.
+Running it as a script converts a storage file between the formats:
+    python3 -m models.engine.serializers <source file> <destination file>
+"""
+import os
+import pickle
+import struct
+import sys
+from datetime import datetime, timedelta
+from json import JSONDecoder, JSONEncoder
+
+from models.engine.json_stream import iter_json_object
+
+
+DATETIME_ATTRS = ('created_at', 'updated_at')
+"""The attributes of the models that hold datetime values.
+"""
+EPOCH = datetime(1970, 1, 1)
+"""The datetime from which epoch microseconds are counted.
+"""
+MICROSECOND = timedelta(microseconds=1)
+"""The unit of the epoch microseconds.
+"""
+
+
+def datetime_to_micros(value):
+    """Converts a datetime to the number of microseconds since the epoch.
+
+    Args:
+        value (datetime): The datetime to convert.
+
+    Returns:
+        int: The number of microseconds since the epoch.
+    """
+    return (value - EPOCH) // MICROSECOND
+
+
+def micros_to_datetime(value):
+    """Converts a number of microseconds since the epoch to a datetime.
+
+    Args:
+        value (int): The number of microseconds since the epoch.
+
+    Returns:
+        datetime: The datetime.
+    """
+    return EPOCH + timedelta(0, 0, value)
+
+
+class JSONSerializer:
+    """Represents the serializer for the JSON storage format.
+    """
+    name = 'json'
+    extensions = ('.json',)
+
+    def __init__(self):
+        """Initializes a JSONSerializer instance.
+        """
+        self.__encoder = JSONEncoder()
+
+    def to_record(self, value):
+        """Serializes a stored object to a record of this format.
+
+        Args:
+            value (BaseModel|dict): The object or its record.
+
+        Returns:
+            str: The JSON text of the object's dictionary.
+        """
+        if type(value) is not dict:
+            return self.__encoder.encode(value.to_dict())
+        record = value
+        for key in DATETIME_ATTRS:
+            if isinstance(record.get(key, None), datetime):
+                if record is value:
+                    record = dict(value)
+                record[key] = record[key].isoformat()
+        return self.__encoder.encode(record)
+
+    def dump(self, file, records):
+        """Writes records to a file.
+
+        Args:
+            file (BinaryIO): The file to write to.
+            records (Iterable): The key and record pairs to write.
+        """
+        encode = self.__encoder.encode
+        entries = []
+        sep = b'{'
+        for key, record in records:
+            entries.append('{}: {}'.format(encode(key), record))
+            if len(entries) >= 1024:
+                file.write(sep + ', '.join(entries).encode('utf-8'))
+                entries.clear()
+                sep = b', '
+        if len(entries) > 0:
+            file.write(sep + ', '.join(entries).encode('utf-8'))
+            sep = b', '
+        file.write(b'{}' if sep == b'{' else b'}')
+
+    def load(self, file):
+        """Reads the records in a file one at a time.
+
+        Args:
+            file (BinaryIO): The file to read from.
+
+        Yields:
+            tuple: The key, the record, and the number of bytes read.
+        """
+        yield from iter_json_object(file)
+
+
+class RecordUnpickler(pickle.Unpickler):
+    """Represents an unpickler that only loads plain data types.
+    """
+
+    def find_class(self, module, name):
+        """Forbids loading any class or function.
+
+        Raises:
+            UnpicklingError: Always.
+        """
+        raise pickle.UnpicklingError(
+            'Forbidden global {}.{}'.format(module, name)
+        )
+
+
+class BinarySerializer:
+    """Represents the serializer for the binary storage format. The file
+    consists of a header followed by chunks of records that share the
+    same class and attributes, each pickled with protocol 5. The datetime
+    attributes are stored as integer epoch microseconds.
+    """
+    name = 'binary'
+    extensions = ('.bin',)
+    magic = 'hbnb-binary'
+    version = 1
+    chunk_size = 4096
+    """The maximum number of records in a chunk.
+    """
+
+    def to_record(self, value):
+        """Serializes a stored object to a record of this format.
+
+        Args:
+            value (BaseModel|dict): The object or its record.
+
+        Returns:
+            dict: The record of the object.
+        """
+        if type(value) is dict:
+            record = dict(value)
+            cls_name = record.pop('__class__')
+        else:
+            record = dict(value._attributes())
+            cls_name = value.__class__.__name__
+        for key, attr in record.items():
+            if key in DATETIME_ATTRS:
+                if isinstance(attr, str):
+                    attr = datetime.fromisoformat(attr)
+                record[key] = datetime_to_micros(attr)
+            elif isinstance(attr, datetime):
+                record[key] = attr.isoformat()
+        record['__class__'] = cls_name
+        return record
+
+    def dump(self, file, records):
+        """Writes records to a file.
+
+        Args:
+            file (BinaryIO): The file to write to.
+            records (Iterable): The key and record pairs to write.
+        """
+        pickler = pickle.Pickler(file, protocol=5)
+        pickler.dump({'format': self.magic, 'version': self.version})
+        schema = None
+        rows = []
+        for key, record in records:
+            fields = tuple(k for k in record.keys() if k != '__class__')
+            record_schema = (record['__class__'], fields)
+            if (record_schema != schema) or (len(rows) >= self.chunk_size):
+                if len(rows) > 0:
+                    pickler.dump((schema[0], schema[1], rows))
+                    pickler.clear_memo()
+                schema = record_schema
+                rows = []
+            rows.append((key,) + tuple(record[k] for k in fields))
+        if len(rows) > 0:
+            pickler.dump((schema[0], schema[1], rows))
+        pickler.dump(None)
+
+    def load(self, file):
+        """Reads the records in a file one at a time.
+
+        Args:
+            file (BinaryIO): The file to read from.
+
+        Yields:
+            tuple: The key, the record, and the number of bytes read.
+        """
+        unpickler = RecordUnpickler(file)
+        header = unpickler.load()
+        if (type(header) is not dict) or (header.get('format') != self.magic):
+            raise ValueError('Not a binary storage file')
+        while True:
+            chunk = unpickler.load()
+            if chunk is None:
+                break
+            cls_name, fields, rows = chunk
+            dt_fields = [k for k in fields if k in DATETIME_ATTRS]
+            bytes_read = file.tell()
+            for row in rows:
+                record = dict(zip(fields, row[1:]))
+                for k in dt_fields:
+                    record[k] = micros_to_datetime(record[k])
+                record['__class__'] = cls_name
+                yield row[0], record, bytes_read
+
+
+class MmapSerializer:
+    """Represents the serializer for the memory-mapped storage format,
+    which can be read without parsing the whole file. The file consists
+    of a header, a table of the positions of the records sorted by their
+    keys, and the packed records, each of which is a key followed by the
+    JSON text of the record.
+    """
+    name = 'mmap'
+    extensions = ('.mmap',)
+    magic = b'HBNBMMAP'
+    version = 1
+    header = struct.Struct('<8sII')
+    """The magic number, the version, and the number of records.
+    """
+    entry = struct.Struct('<QII')
+    """The offset of a record, and the lengths of its key and JSON text.
+    """
+
+    def __init__(self):
+        """Initializes a MmapSerializer instance.
+        """
+        self.__json = JSONSerializer()
+
+    def to_record(self, value):
+        """Serializes a stored object to a record of this format.
+
+        Args:
+            value (BaseModel|dict): The object or its record.
+
+        Returns:
+            str: The JSON text of the object's dictionary.
+        """
+        return self.__json.to_record(value)
+
+    def dump(self, file, records):
+        """Writes records to a file. The records are sorted by their keys
+        so that they can be looked up with a binary search.
+
+        Args:
+            file (BinaryIO): The file to write to.
+            records (Iterable): The key and record pairs to write.
+        """
+        entries = sorted(
+            (key.encode('utf-8'), record.encode('utf-8'))
+            for key, record in records
+        )
+        file.write(self.header.pack(self.magic, self.version, len(entries)))
+        offset = self.header.size + self.entry.size * len(entries)
+        for key, record in entries:
+            file.write(self.entry.pack(offset, len(key), len(record)))
+            offset += len(key) + len(record)
+        for key, record in entries:
+            file.write(key)
+            file.write(record)
+
+    def load(self, file):
+        """Reads the records in a file one at a time.
+
+        Args:
+            file (BinaryIO): The file to read from.
+
+        Yields:
+            tuple: The key, the record, and the number of bytes read.
+        """
+        buf = file.read()
+        if len(buf) == 0:
+            return
+        decoder = JSONDecoder()
+        table = MmapTable(buf)
+        for i in range(len(table)):
+            key, record, end = table.entry(i)
+            yield key, decoder.decode(record), end
+
+
+class MmapTable:
+    """Represents the sorted sequence of the keys in a buffer of the
+    memory-mapped storage format, whose records are decoded when they
+    are accessed.
+    """
+
+    def __init__(self, buf):
+        """Initializes a new MmapTable.
+
+        Args:
+            buf (mmap|bytes): The contents of a file in the memory-mapped
+            format.
+
+        Raises:
+            ValueError: If the buffer isn't in the memory-mapped format.
+        """
+        header = MmapSerializer.header
+        if len(buf) < header.size:
+            raise ValueError('Not a memory-mapped storage file')
+        magic, version, n = header.unpack_from(buf, 0)
+        if (magic != MmapSerializer.magic) or \
+                (version != MmapSerializer.version):
+            raise ValueError('Not a memory-mapped storage file')
+        self.__buf = buf
+        self.__n = n
+
+    def __len__(self):
+        """Retrieves the number of records.
+
+        Returns:
+            int: The number of records.
+        """
+        return self.__n
+
+    def __getitem__(self, i):
+        """Retrieves the key of a record.
+
+        Args:
+            i (int): The position of the record.
+
+        Returns:
+            bytes: The UTF-8 encoding of the key.
+        """
+        if not (0 <= i < self.__n):
+            raise IndexError(i)
+        offset, key_len, _ = MmapSerializer.entry.unpack_from(
+            self.__buf,
+            MmapSerializer.header.size + MmapSerializer.entry.size * i
+        )
+        return self.__buf[offset:offset + key_len]
+
+    def entry(self, i):
+        """Retrieves a record.
+
+        Args:
+            i (int): The position of the record.
+
+        Returns:
+            tuple: The key, the JSON text of the record, and the offset of
+            the end of the record.
+        """
+        offset, key_len, record_len = MmapSerializer.entry.unpack_from(
+            self.__buf,
+            MmapSerializer.header.size + MmapSerializer.entry.size * i
+        )
+        start = offset + key_len
+        end = start + record_len
+        return (
+            self.__buf[offset:start].decode('utf-8'),
+            self.__buf[start:end].decode('utf-8'),
+            end
+        )
+
+
+serializers = (JSONSerializer(), BinarySerializer(), MmapSerializer())
+"""The available serializers.
+"""
+
+
+def serializer_for(file_path, name=None):
+    """Retrieves the serializer for a storage file.
+
+    Args:
+        file_path (str): The path to the storage file.
+        name (str): The name of the serializer to use regardless of the
+        extension of the file.
+
+    Returns:
+        JSONSerializer|BinarySerializer: The serializer. The JSON
+        serializer is used for unknown extensions.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    for serializer in serializers:
+        if (name == serializer.name) or ((name is None) and
+                                         (ext in serializer.extensions)):
+            return serializer
+    if name is not None:
+        raise ValueError('Unknown storage format: {}'.format(name))
+    return serializers[0]
+
+
+def convert(src_path, dest_path):
+    """Converts a storage file to the format of another storage file.
+
+    Args:
+        src_path (str): The path to the source file.
+        dest_path (str): The path to the destination file.
+
+    Returns:
+        int: The number of records converted.
+    """
+    src_serializer = serializer_for(src_path)
+    dest_serializer = serializer_for(dest_path)
+    n = 0
+
+    def records(file):
+        """Generates the records of the source file converted for the
+        destination serializer, counting them.
+        """
+        nonlocal n
+        for key, record, _ in src_serializer.load(file):
+            n += 1
+            yield key, dest_serializer.to_record(record)
+
+    with open(src_path, mode='rb') as src_file:
+        with open(dest_path, mode='wb') as dest_file:
+            dest_serializer.dump(dest_file, records(src_file))
+    return n
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print('Usage: {} <source file> <destination file>'.format(
+            sys.argv[0]
+        ), file=sys.stderr)
+        sys.exit(1)
+    print('{} records converted'.format(convert(sys.argv[1], sys.argv[2])))
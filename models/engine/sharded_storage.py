@@ -0,0 +1,563 @@
+#!/usr/bin/python3
+"""A module containing the sharded file storage engine.
+"""
+import os
+import threading
+import zlib
+from collections import ChainMap
+from heapq import merge
+from itertools import islice
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+
+from models.engine.columns import aggregate_records
+from models.engine.file_storage import FileStorage
+from models.engine.serializers import serializer_for
+from models.exporter import export_objects
+from models.importer import import_objects
+from models.registry import ModelRegistry
+
+
+class ShardedStorage:
+    """Represents the file storage that keeps the objects of each class in
+    separate files, called shards. Only the shards with changed objects
+    are written when the storage is saved, and the shards of a class are
+    only loaded when the class is first used.
+    """
+
+    def __init__(self, dir_path=None, partitions=None):
+        """Initializes a ShardedStorage instance.
+
+        Args:
+            dir_path (str): The path to the directory of the shards. It
+            is read from the HBNB_SHARD_DIR environment variable if it is
+            None.
+            partitions (int): The number of shards of each class, among
+            which the objects are spread by their id. It is read from the
+            HBNB_SHARD_PARTITIONS environment variable if it is None.
+        """
+        if dir_path is None:
+            dir_path = os.getenv('HBNB_SHARD_DIR', 'file_shards')
+        if partitions is None:
+            partitions = int(os.getenv('HBNB_SHARD_PARTITIONS', '1'))
+        if partitions < 1:
+            raise ValueError('The number of partitions must be positive')
+        self.dir_path = dir_path
+        self.partitions = partitions
+        self.model_classes = ModelRegistry()
+        ext = serializer_for(
+            '', os.getenv('HBNB_FILE_FORMAT', 'json')
+        ).extensions[0]
+        self.__shards = dict()
+        for cls_name in self.model_classes.keys():
+            cls_shards = []
+            for i in range(partitions):
+                if partitions == 1:
+                    file_name = '{}{}'.format(cls_name, ext)
+                else:
+                    file_name = '{}.{}{}'.format(cls_name, i, ext)
+                shard = FileStorage(os.path.join(dir_path, file_name))
+                shard.model_classes = self.model_classes
+                cls_shards.append(shard)
+            self.__shards[cls_name] = cls_shards
+        self.__loaded = set()
+        self.__lock = threading.RLock()
+        self.__batch_depth = 0
+        self.__batch_saved = False
+
+    def all(self):
+        """Returns all the stored objects, loading the shards that
+        haven't been loaded.
+
+        Returns:
+            ChainMap: A view of the stored objects.
+        """
+        self.__load(self.__shards.keys())
+        return ChainMap(*(
+            shard.all() for shard in self.__iter_shards(self.__shards)
+        ))
+
+    def new(self, obj):
+        """Stores a new object.
+
+        Args:
+            obj (BaseModel): The object to store.
+        """
+        self.__shard_for(obj.__class__.__name__, obj.id).new(obj)
+
+    def import_file(self, cls, file_path, progress=None):
+        """Creates objects of a given class from the rows of a CSV or JSON
+        Lines file and stores them. The objects are saved once at the end,
+        and none of them are stored if a row is invalid.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            file_path (str): The path to the file.
+            progress (Callable): An optional function that is called with
+            the number of rows imported after each batch of rows.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If the class doesn't exist, the file isn't in a
+            known format, or a row is invalid.
+
+        Returns:
+            int: The number of objects created.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return import_objects(
+            self, self.model_classes[cls_name], file_path, progress
+        )
+
+    def export_file(self, cls, file_path, row_format=None, attrs=None,
+                    predicates=()):
+        """Writes the stored objects of a given class to a CSV, JSON
+        Lines, or columnar file, streaming their records from the storage.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            file_path (str): The path to the file.
+            row_format (str): The format of the file, which is determined
+            by the extension of the file if it is None.
+            attrs (list): The names of the attributes to export. All of the
+            attributes are exported if it is None.
+            predicates (Iterable): The predicates that the objects have to
+            satisfy, in the form accepted by Query.where.
+
+        Raises:
+            OSError: If the file can't be written.
+            ValueError: If the class doesn't exist, the format is unknown,
+            or a predicate is invalid.
+
+        Returns:
+            int: The number of objects exported.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return export_objects(
+            self, self.model_classes[cls_name], file_path, row_format, attrs,
+            predicates
+        )
+
+    def get(self, cls, id):
+        """Retrieves a stored object of a given class with a given id.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            id (str): The id of the object.
+
+        Returns:
+            BaseModel: The object if it exists, otherwise None.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.__shards:
+            return None
+        return self.__shard_for(cls_name, id).get(cls_name, id)
+
+    def count(self, cls=None):
+        """Counts the stored objects of a given class.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are counted if it is None.
+
+        Returns:
+            int: The number of objects.
+        """
+        cls_names = self.__class_names(cls)
+        self.__load(cls_names)
+        return sum(
+            shard.count(cls_name)
+            for cls_name in cls_names
+            for shard in self.__shards[cls_name]
+        )
+
+    def strings(self, cls=None):
+        """Generates the string representations of the stored objects
+        of a given class without materializing lazily loaded objects.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are included if it is None.
+
+        Yields:
+            str: The string representation of an object.
+        """
+        cls_names = self.__class_names(cls)
+        self.__load(cls_names)
+        for cls_name in cls_names:
+            for shard in self.__shards[cls_name]:
+                yield from shard.strings(cls_name)
+
+    def records(self, cls=None):
+        """Generates the serialized records of the stored objects of a
+        given class without materializing lazily loaded objects.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are included if it is None.
+
+        Yields:
+            dict: The serialized record of an object, which must not be
+            modified.
+        """
+        cls_names = self.__class_names(cls)
+        self.__load(cls_names)
+        for cls_name in cls_names:
+            for shard in self.__shards[cls_name]:
+                yield from shard.records(cls_name)
+
+    def related(self, cls, attr, id):
+        """Retrieves the stored objects of a given class whose attribute
+        refers to the object with a given id.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            attr (str): The attribute that holds the id.
+            id (str): The id of the referred object.
+
+        Returns:
+            list: The objects.
+        """
+        cls_names = self.__class_names(cls)
+        self.__load(cls_names)
+        return [
+            obj
+            for cls_name in cls_names
+            for shard in self.__shards[cls_name]
+            for obj in shard.related(cls_name, attr, id)
+        ]
+
+    def ordered(self, cls, attr, low=None, high=None, reverse=False):
+        """Generates the stored objects of a given class in the order of
+        a numeric attribute by merging the ordered objects of its shards.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            attr (str): The name of the attribute.
+            low (int|float): The lowest value, which is included.
+            high (int|float): The highest value, which is included.
+            reverse (bool): Whether to start with the highest value.
+
+        Yields:
+            BaseModel: An object whose attribute is a number in the range.
+        """
+        cls_names = self.__class_names(cls)
+        self.__load(cls_names)
+        yield from merge(
+            *(
+                shard.ordered(cls_name, attr, low, high, reverse)
+                for cls_name in cls_names
+                for shard in self.__shards[cls_name]
+            ),
+            key=lambda obj: (getattr(obj, attr), obj.id),
+            reverse=reverse
+        )
+
+    def within(self, cls, south, west, north, east):
+        """Retrieves the stored objects of a given class in a box of
+        latitudes and longitudes from the grid indexes of its shards.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            south (float): The south edge of the box.
+            west (float): The west edge of the box.
+            north (float): The north edge of the box.
+            east (float): The east edge of the box, which is less than the
+            west edge if the box crosses the 180th meridian.
+
+        Returns:
+            list: The objects.
+        """
+        cls_names = self.__class_names(cls)
+        self.__load(cls_names)
+        return [
+            obj
+            for cls_name in cls_names
+            for shard in self.__shards[cls_name]
+            for obj in shard.within(cls_name, south, west, north, east)
+        ]
+
+    def near(self, cls, lat, lon, km, k=None):
+        """Retrieves the stored objects of a given class within a
+        distance of a location by merging the nearest objects of its
+        shards.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            lat (float): The latitude of the location in degrees.
+            lon (float): The longitude of the location in degrees.
+            km (float): The maximum distance in kilometers.
+            k (int): The maximum number of objects, which are the nearest
+            ones. All the objects are included if it is None.
+
+        Returns:
+            list: The distances (in kilometers) and the objects, which
+            are sorted by their distances.
+        """
+        cls_names = self.__class_names(cls)
+        self.__load(cls_names)
+        found = merge(
+            *(
+                shard.near(cls_name, lat, lon, km, k)
+                for cls_name in cls_names
+                for shard in self.__shards[cls_name]
+            ),
+            key=itemgetter(0)
+        )
+        return list(islice(found, k))
+
+    def search(self, cls, text, k=None):
+        """Ranks the stored objects of a given class whose text matches
+        a text by merging the best matches of its shards. Each shard ranks
+        its objects with the statistics of its own text index.
+
+        Args:
+            cls (type|str): The class or the name of the class. All the
+            stored objects are searched if it is None.
+            text (str): The text to search for.
+            k (int): The maximum number of objects, which are the best
+            matches. All the matches are included if it is None.
+
+        Returns:
+            list: The scores and the objects, which are sorted from the
+            best match.
+        """
+        cls_names = self.__class_names(cls)
+        self.__load(cls_names)
+        found = merge(
+            *(
+                shard.search(cls_name, text, k)
+                for cls_name in cls_names
+                for shard in self.__shards[cls_name]
+            ),
+            key=itemgetter(0), reverse=True
+        )
+        return list(islice(found, k))
+
+    def aggregate(self, cls, aggregates, group_by=None):
+        """Computes some aggregates of the stored objects of a given class
+        in groups, by putting the attributes of their records in columns.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            aggregates (Iterable): The aggregates, such as 'count' or
+            'avg(price_by_night)', or tuples of a function and the name of
+            an attribute.
+            group_by (str): The name of the attribute whose values group
+            the objects. All the objects are in one group if it is None.
+
+        Raises:
+            ValueError: If the class doesn't exist or an aggregate is
+            invalid.
+
+        Returns:
+            list: A dictionary for each group, which holds the value of
+            the grouping attribute and the results of the aggregates by
+            their names.
+        """
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        if cls_name not in self.model_classes:
+            raise ValueError('Unknown class: {}'.format(cls_name))
+        return aggregate_records(
+            self.records(cls_name), self.model_classes[cls_name], aggregates,
+            group_by
+        )
+
+    def mark_changed(self, obj):
+        """Marks a stored object as changed so that the next save
+        persists it.
+
+        Args:
+            obj (BaseModel): The changed object.
+        """
+        self.__shard_for(obj.__class__.__name__, obj.id).mark_changed(obj)
+
+    def delete(self, obj=None):
+        """Removes an object from the stored objects.
+
+        Args:
+            obj (BaseModel): The object to remove.
+        """
+        if obj is None:
+            return
+        self.__shard_for(obj.__class__.__name__, obj.id).delete(obj)
+
+    def save(self):
+        """Writes the shards that have changed objects to their files.
+        Inside a batch, the shards are only written when it ends.
+        """
+        with self.__lock:
+            if self.__batch_depth > 0:
+                self.__batch_saved = True
+                return
+            shards = [
+                shard for shard in self.__iter_shards(self.__loaded)
+                if shard.has_changes()
+            ]
+        if len(shards) > 0:
+            os.makedirs(self.dir_path, exist_ok=True)
+        for shard in shards:
+            shard.save()
+
+    def flush(self):
+        """Writes the saves that are waiting for the write-behind threads
+        of the shards.
+        """
+        for shard in self.__iter_shards(self.__shards):
+            shard.flush()
+
+    def close(self):
+        """Writes the saves that are waiting for the write-behind threads
+        of the shards and removes their lock files unless other processes
+        hold them.
+        """
+        for shard in self.__iter_shards(self.__shards):
+            shard.close()
+
+    @contextmanager
+    def batch(self):
+        """Groups the changes made within a with statement so that the
+        saves requested in it are done once when it ends. If an exception
+        escapes the with statement, the stored objects are restored to
+        their state before it began and nothing is saved.
+
+        Yields:
+            ShardedStorage: This storage.
+        """
+        with self.__lock:
+            loaded = set(self.__loaded)
+            self.__batch_depth += 1
+            if self.__batch_depth == 1:
+                self.__batch_saved = False
+        try:
+            with ExitStack() as stack:
+                for shard in self.__iter_shards(self.__shards):
+                    stack.enter_context(shard.batch())
+                yield self
+        except BaseException:
+            with self.__lock:
+                self.__batch_depth -= 1
+                # the shards loaded within the batch were emptied again
+                self.__loaded &= loaded
+            raise
+        with self.__lock:
+            self.__batch_depth -= 1
+            saved = (self.__batch_depth == 0) and self.__batch_saved
+        if saved:
+            self.save()
+
+    def reload(self, *, progress=None, classes=None):
+        """Loads the shards of some classes from their files in parallel.
+
+        Args:
+            progress (Callable): An optional function that is called
+            with the number of objects loaded, the number of bytes read,
+            and the size of the files every now and then while loading.
+            classes (Iterable): The names of the classes to load. All the
+            classes are loaded if it is None, and the other classes are
+            loaded when they are first used.
+
+        Returns:
+            int: The number of objects loaded.
+        """
+        cls_names = self.__shards.keys() if classes is None else classes
+        for cls_name in cls_names:
+            if cls_name not in self.__shards:
+                raise ValueError('Unknown class: {}'.format(cls_name))
+        with self.__lock:
+            self.__loaded.clear()
+        return self.__load(cls_names, progress)
+
+    def __load(self, cls_names, progress=None):
+        """Loads the shards of some classes that haven't been loaded.
+
+        Args:
+            cls_names (Iterable): The names of the classes to load.
+            progress (Callable): The function to report the progress to.
+
+        Returns:
+            int: The number of objects loaded.
+        """
+        with self.__lock:
+            cls_names = [c for c in cls_names if c not in self.__loaded]
+            if len(cls_names) == 0:
+                return 0
+            shards = list(self.__iter_shards(cls_names))
+            totals = {}
+            totals_lock = threading.Lock()
+            total_size = sum(
+                os.stat(shard.file_path).st_size for shard in shards
+                if os.path.isfile(shard.file_path)
+            )
+
+            def reload(shard):
+                """Loads a shard, reporting its progress with the others.
+                """
+                def report(n, bytes_read, file_size):
+                    """Adds the progress of a shard to the totals.
+                    """
+                    with totals_lock:
+                        totals[shard] = (n, bytes_read)
+                        progress(
+                            sum(t[0] for t in totals.values()),
+                            sum(t[1] for t in totals.values()),
+                            total_size
+                        )
+                if progress is None:
+                    return shard.reload()
+                return shard.reload(progress=report)
+
+            with ThreadPoolExecutor() as executor:
+                n = sum(executor.map(reload, shards))
+            self.__loaded.update(cls_names)
+        return n
+
+    def __class_names(self, cls):
+        """Retrieves the names of the classes that a class argument
+        refers to.
+
+        Args:
+            cls (type|str): The class or the name of the class, or None
+            for all the classes.
+
+        Returns:
+            list: The names of the classes.
+        """
+        if cls is None:
+            return list(self.__shards.keys())
+        cls_name = cls if isinstance(cls, str) else cls.__name__
+        return [cls_name] if cls_name in self.__shards else []
+
+    def __iter_shards(self, cls_names):
+        """Iterates over the shards of some classes.
+
+        Args:
+            cls_names (Iterable): The names of the classes.
+
+        Yields:
+            FileStorage: A shard.
+        """
+        for cls_name in cls_names:
+            yield from self.__shards[cls_name]
+
+    def __shard_for(self, cls_name, id):
+        """Retrieves the loaded shard that holds the object of a given
+        class with a given id.
+
+        Args:
+            cls_name (str): The name of the class.
+            id (str): The id of the object.
+
+        Returns:
+            FileStorage: The shard.
+        """
+        self.__load((cls_name,))
+        shards = self.__shards[cls_name]
+        if len(shards) == 1:
+            return shards[0]
+        return shards[zlib.crc32(str(id).encode('utf-8')) % len(shards)]
@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+"""A module containing the index of objects sorted by an attribute.
+"""
+from bisect import bisect_left, insort
+
+
+CHUNK_SIZE = 512
+"""The number of entries that the chunks of a sorted index are split
+into, which are split again when they grow to twice this size.
+"""
+
+
+class _LastKey:
+    """Represents a key that sorts after the keys of all the objects, so
+    that the entries with a value end before (value, _LAST_KEY).
+    """
+
+    def __lt__(self, other):
+        """Checks if this key sorts before another key.
+
+        Args:
+            other (str): The other key.
+
+        Returns:
+            bool: False, as no key sorts after this one.
+        """
+        return False
+
+    def __gt__(self, other):
+        """Checks if this key sorts after another key.
+
+        Args:
+            other (str): The other key.
+
+        Returns:
+            bool: True, as every key sorts before this one.
+        """
+        return True
+
+
+_LAST_KEY = _LastKey()
+"""The key that sorts after the keys of all the objects.
+"""
+
+
+def is_sortable(value):
+    """Checks if the value of an attribute can be kept in a sorted index,
+    which only holds numbers.
+
+    Args:
+        value (any): The value.
+
+    Returns:
+        bool: True if the value is an int or a float other than NaN.
+    """
+    return (type(value) in (int, float)) and (value == value)
+
+
+class SortedIndex:
+    """Represents the keys of some objects sorted by the value of one of
+    their attributes. The entries are kept in sorted chunks the way the
+    leaves of a B-tree are, so that adding or removing a key only moves
+    the entries of a chunk, and a range of values is found by bisection.
+    """
+
+    def __init__(self, items=()):
+        """Initializes a new SortedIndex.
+
+        Args:
+            items (Iterable): The keys of the objects and the values of
+            their attributes. The values that aren't numbers are left out.
+        """
+        self.__values = {k: v for k, v in items if is_sortable(v)}
+        entries = sorted((v, k) for k, v in self.__values.items())
+        self.__chunks = [
+            entries[i:i + CHUNK_SIZE]
+            for i in range(0, len(entries), CHUNK_SIZE)
+        ]
+        self.__maxes = [chunk[-1] for chunk in self.__chunks]
+
+    def __len__(self):
+        """Counts the keys in this index.
+
+        Returns:
+            int: The number of keys.
+        """
+        return len(self.__values)
+
+    def add(self, key, value):
+        """Adds a key or moves it to its new value.
+
+        Args:
+            key (str): The key of the object.
+            value (any): The value of the attribute of the object. The key
+            is removed if the value isn't a number.
+        """
+        old_value = self.__values.get(key, None)
+        if old_value is not None:
+            if (type(old_value) is type(value)) and (old_value == value):
+                return
+            self.remove(key)
+        if (type(value) not in (int, float)) or (value != value):
+            return
+        self.__values[key] = value
+        entry = (value, key)
+        chunks, maxes = self.__chunks, self.__maxes
+        i = bisect_left(maxes, entry)
+        if i == len(maxes):
+            if i == 0:
+                chunks.append([entry])
+                maxes.append(entry)
+                return
+            i -= 1
+            chunk = chunks[i]
+            chunk.append(entry)
+            maxes[i] = entry
+        else:
+            chunk = chunks[i]
+            insort(chunk, entry)
+        if len(chunk) > 2 * CHUNK_SIZE:
+            chunks[i:i + 1] = [chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]]
+            maxes[i:i + 1] = [chunk[CHUNK_SIZE - 1], chunk[-1]]
+
+    def remove(self, key):
+        """Removes a key if it is in this index.
+
+        Args:
+            key (str): The key of the object.
+        """
+        if key not in self.__values:
+            return
+        entry = (self.__values.pop(key), key)
+        i = bisect_left(self.__maxes, entry)
+        chunk = self.__chunks[i]
+        del chunk[bisect_left(chunk, entry)]
+        if len(chunk) == 0:
+            del self.__chunks[i]
+            del self.__maxes[i]
+        else:
+            self.__maxes[i] = chunk[-1]
+
+    def keys(self, low=None, high=None, reverse=False):
+        """Generates the keys whose values are in a range, in the order of
+        their values. Finding the range takes O(log n) time.
+
+        Args:
+            low (int|float): The lowest value, which is included.
+            high (int|float): The highest value, which is included.
+            reverse (bool): Whether to start with the highest value.
+
+        Yields:
+            str: The key of an object.
+        """
+        chunks, maxes = self.__chunks, self.__maxes
+        if len(chunks) == 0:
+            return
+        first, start = 0, 0
+        if low is not None:
+            # (low,) sorts before every entry whose value is low
+            first = bisect_left(maxes, (low,))
+            if first == len(chunks):
+                return
+            start = bisect_left(chunks[first], (low,))
+        last, end = len(chunks) - 1, len(chunks[-1])
+        if high is not None:
+            last = bisect_left(maxes, (high, _LAST_KEY))
+            if last < len(chunks):
+                end = bisect_left(chunks[last], (high, _LAST_KEY))
+            else:
+                last, end = len(chunks) - 1, len(chunks[-1])
+        positions = range(last, first - 1, -1) if reverse \
+            else range(first, last + 1)
+        for i in positions:
+            chunk = chunks[i][
+                start if i == first else 0:end if i == last else None
+            ]
+            for _, key in (reversed(chunk) if reverse else chunk):
+                yield key
@@ -0,0 +1,279 @@
+#!/usr/bin/python3
+"""A module containing the index of objects by their location.
+"""
+import heapq
+import math
+from itertools import chain
+
+from models.engine.sorted_index import is_sortable
+
+
+EARTH_RADIUS = 6371.0088
+"""The mean radius of the Earth in kilometers.
+"""
+CELL_SIZE = 0.1
+"""The size (in degrees) of the cells of a grid index.
+"""
+
+
+def is_location(lat, lon):
+    """Checks if a latitude and a longitude are a valid location.
+
+    Args:
+        lat (int|float): The latitude in degrees.
+        lon (int|float): The longitude in degrees.
+
+    Returns:
+        bool: True if they are numbers within their ranges.
+    """
+    return is_sortable(lat) and is_sortable(lon) and \
+        (-90 <= lat <= 90) and (-180 <= lon <= 180)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Computes the great-circle distance between two locations.
+
+    Args:
+        lat1 (float): The latitude of the first location in degrees.
+        lon1 (float): The longitude of the first location in degrees.
+        lat2 (float): The latitude of the second location in degrees.
+        lon2 (float): The longitude of the second location in degrees.
+
+    Returns:
+        float: The distance in kilometers.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) \
+        * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lon, km):
+    """Computes the smallest box of latitudes and longitudes that contains
+    a circle on the surface of the Earth.
+
+    Args:
+        lat (float): The latitude of the center in degrees.
+        lon (float): The longitude of the center in degrees.
+        km (float): The radius in kilometers.
+
+    Returns:
+        tuple: The south, west, north, and east edges of the box in
+        degrees. The west edge is greater than the east edge if the box
+        crosses the 180th meridian.
+    """
+    angle = km / EARTH_RADIUS
+    south = lat - math.degrees(angle)
+    north = lat + math.degrees(angle)
+    if (south <= -90) or (north >= 90) or (angle >= math.pi / 2):
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+    ratio = math.sin(angle) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return south, -180.0, north, 180.0
+    delta = math.degrees(math.asin(ratio))
+    west, east = lon - delta, lon + delta
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return south, west, north, east
+
+
+def nearest(points, lat, lon, km, k=None):
+    """Finds the points within a distance of a location.
+
+    Args:
+        points (Iterable): The items and their latitudes and longitudes.
+        lat (float): The latitude of the location in degrees.
+        lon (float): The longitude of the location in degrees.
+        km (float): The maximum distance in kilometers.
+        k (int): The maximum number of points, which are the nearest
+        ones. All the points are included if it is None.
+
+    Returns:
+        list: The distances and the items of the points, which are
+        sorted by their distances.
+    """
+    found = []
+    for i, (item, point_lat, point_lon) in enumerate(points):
+        distance = haversine(lat, lon, point_lat, point_lon)
+        if distance <= km:
+            found.append((distance, i, item))
+    if k is None:
+        found.sort()
+    else:
+        found = heapq.nsmallest(k, found)
+    return [(distance, item) for distance, _, item in found]
+
+
+def in_box(lat, lon, south, west, north, east):
+    """Checks if a location is in a box of latitudes and longitudes.
+
+    Args:
+        lat (float): The latitude of the location in degrees.
+        lon (float): The longitude of the location in degrees.
+        south (float): The south edge of the box.
+        west (float): The west edge of the box.
+        north (float): The north edge of the box.
+        east (float): The east edge of the box, which is less than the
+        west edge if the box crosses the 180th meridian.
+
+    Returns:
+        bool: True if the location is in the box.
+    """
+    if not (south <= lat <= north):
+        return False
+    if west <= east:
+        return west <= lon <= east
+    return (lon >= west) or (lon <= east)
+
+
+class GridIndex:
+    """Represents the keys of some objects in the cells of a grid of
+    latitudes and longitudes, so that only the cells that overlap an area
+    have to be searched for the objects in the area.
+    """
+
+    def __init__(self, items=(), cell_size=CELL_SIZE):
+        """Initializes a new GridIndex.
+
+        Args:
+            items (Iterable): The keys of the objects and their latitudes
+            and longitudes. The invalid locations are left out.
+            cell_size (float): The size of the cells in degrees.
+        """
+        self.cell_size = cell_size
+        self.__rows = math.ceil(180 / cell_size)
+        self.__cols = math.ceil(360 / cell_size)
+        self.__cells = dict()
+        self.__locations = dict()
+        for key, lat, lon in items:
+            self.add(key, lat, lon)
+
+    def __len__(self):
+        """Counts the keys in this index.
+
+        Returns:
+            int: The number of keys.
+        """
+        return len(self.__locations)
+
+    def add(self, key, lat, lon):
+        """Adds a key or moves it to its new location.
+
+        Args:
+            key (str): The key of the object.
+            lat (float): The latitude of the object in degrees.
+            lon (float): The longitude of the object in degrees. The key
+            is removed if the location isn't valid.
+        """
+        location = self.__locations.get(key, None)
+        if location is not None:
+            if location == (lat, lon):
+                return
+            self.remove(key)
+        # the comparisons are False for NaN
+        if (type(lat) not in (int, float)) or \
+                (type(lon) not in (int, float)) or \
+                not ((-90 <= lat <= 90) and (-180 <= lon <= 180)):
+            return
+        cell = (
+            min(int((lat + 90) // self.cell_size), self.__rows - 1),
+            min(int((lon + 180) // self.cell_size), self.__cols - 1)
+        )
+        cell_keys = self.__cells.get(cell, None)
+        if cell_keys is None:
+            cell_keys = self.__cells[cell] = {}
+        cell_keys[key] = location = (lat, lon)
+        self.__locations[key] = location
+
+    def remove(self, key):
+        """Removes a key if it is in this index.
+
+        Args:
+            key (str): The key of the object.
+        """
+        location = self.__locations.pop(key, None)
+        if location is None:
+            return
+        cell = (self.__row(location[0]), self.__col(location[1]))
+        del self.__cells[cell][key]
+        if len(self.__cells[cell]) == 0:
+            del self.__cells[cell]
+
+    def within(self, south, west, north, east):
+        """Generates the keys in a box of latitudes and longitudes.
+
+        Args:
+            south (float): The south edge of the box.
+            west (float): The west edge of the box.
+            north (float): The north edge of the box.
+            east (float): The east edge of the box, which is less than the
+            west edge if the box crosses the 180th meridian.
+
+        Yields:
+            tuple: A key and its latitude and longitude.
+        """
+        rows = range(
+            self.__row(max(south, -90)), self.__row(min(north, 90)) + 1
+        )
+        if west <= east:
+            cols = range(self.__col(west), self.__col(east) + 1)
+        else:
+            cols = chain(
+                range(self.__col(west), self.__cols),
+                range(0, self.__col(east) + 1)
+            )
+        cols = list(cols)
+        if len(rows) * len(cols) > len(self.__cells):
+            col_set = set(cols)
+            cells = [
+                cell for cell in list(self.__cells)
+                if (cell[0] in rows) and (cell[1] in col_set)
+            ]
+        else:
+            cells = [(row, col) for row in rows for col in cols]
+        for cell in cells:
+            for key, (lat, lon) in list(self.__cells.get(cell, {}).items()):
+                if in_box(lat, lon, south, west, north, east):
+                    yield key, lat, lon
+
+    def near(self, lat, lon, km, k=None):
+        """Finds the keys within a distance of a location.
+
+        Args:
+            lat (float): The latitude of the location in degrees.
+            lon (float): The longitude of the location in degrees.
+            km (float): The maximum distance in kilometers.
+            k (int): The maximum number of keys, which are the nearest
+            ones. All the keys are included if it is None.
+
+        Returns:
+            list: The distances and the keys, which are sorted by their
+            distances.
+        """
+        return nearest(
+            self.within(*bounding_box(lat, lon, km)), lat, lon, km, k
+        )
+
+    def __row(self, lat):
+        """Computes the row of the cells that contains a latitude.
+
+        Args:
+            lat (float): The latitude in degrees.
+
+        Returns:
+            int: The row.
+        """
+        return min(int((lat + 90) // self.cell_size), self.__rows - 1)
+
+    def __col(self, lon):
+        """Computes the column of the cells that contains a longitude.
+
+        Args:
+            lon (float): The longitude in degrees.
+
+        Returns:
+            int: The column.
+        """
+        return min(int((lon + 180) // self.cell_size), self.__cols - 1)
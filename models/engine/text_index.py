@@ -0,0 +1,417 @@
+#!/usr/bin/python3
+"""A module containing the full-text index of objects.
+"""
+import heapq
+import json
+import math
+import os
+import re
+import zlib
+
+from models.registry import TEXT_ATTRS
+
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'if',
+    'in', 'into', 'is', 'it', 'no', 'not', 'of', 'on', 'or', 'so', 'such',
+    'that', 'the', 'their', 'then', 'there', 'these', 'they', 'this', 'to',
+    'was', 'will', 'with'
+))
+"""The words that are too common to be indexed.
+"""
+TOKEN_PATTERN = re.compile(r'\w+')
+"""The pattern of the words of a text.
+"""
+BM25_K1 = 1.2
+"""The BM25 parameter that limits the effect of the frequency of a term.
+"""
+BM25_B = 0.75
+"""The BM25 parameter that sets the effect of the length of a document.
+"""
+INDEX_VERSION = 1
+"""The version of the format of the files of text indexes.
+"""
+
+
+def tokenize(text):
+    """Splits a text into its indexed terms.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list: The terms, which are lowercase words other than stop words.
+    """
+    return [
+        term for term in TOKEN_PATTERN.findall(text.lower())
+        if term not in STOP_WORDS
+    ]
+
+
+def text_checksum(text):
+    """Computes the checksum that tells if the text of a document has
+    changed since it was indexed.
+
+    Args:
+        text (str): The text of the document.
+
+    Returns:
+        int: The checksum.
+    """
+    return zlib.crc32(text.encode('utf-8'))
+
+
+def join_text(cls_name, attributes):
+    """Joins the free text of an object into the text of its document.
+
+    Args:
+        cls_name (str): The name of the class of the object.
+        attributes (Mapping): The attributes of the object.
+
+    Returns:
+        str: The text attributes of the object joined by new lines.
+    """
+    texts = (
+        attributes.get(attr, None) for attr in TEXT_ATTRS.get(cls_name, ())
+    )
+    return '\n'.join(text for text in texts if isinstance(text, str))
+
+
+def search_records(records, text, k=None):
+    """Ranks some serialized records by scanning them, for the storage
+    engines that don't keep a full-text index.
+
+    Args:
+        records (Iterable): The serialized records.
+        text (str): The text to search for.
+        k (int): The maximum number of records, which are the best
+        matches. All the matches are included if it is None.
+
+    Returns:
+        list: The scores and the keys of the records, which are sorted
+        from the best match.
+    """
+    index = TextIndex()
+    for record in records:
+        cls_name = record['__class__']
+        index.add(
+            '{}.{}'.format(cls_name, record['id']),
+            join_text(cls_name, record)
+        )
+    return index.search(text, k)
+
+
+class TextIndex:
+    """Represents an inverted index of the terms in the texts of some
+    objects, which ranks the objects that match a text with BM25.
+    """
+
+    def __init__(self):
+        """Initializes a new TextIndex.
+        """
+        self.fingerprint = None
+        """The state of the storage that the index was saved with, or None
+        if it is unknown.
+        """
+        self.__postings = dict()
+        self.__documents = dict()
+        self.__class_lengths = dict()
+        self.__changed = set()
+
+    def __len__(self):
+        """Counts the documents in this index.
+
+        Returns:
+            int: The number of documents.
+        """
+        return len(self.__documents)
+
+    def __contains__(self, key):
+        """Checks if a document is in this index.
+
+        Args:
+            key (str): The key of the document.
+
+        Returns:
+            bool: True if the document is in this index.
+        """
+        return key in self.__documents
+
+    @property
+    def changed(self):
+        """Whether documents have been added or removed since this index
+        was last written.
+        """
+        return len(self.__changed) > 0
+
+    def checksum(self, key):
+        """Retrieves the checksum of the text of a document.
+
+        Args:
+            key (str): The key of the document.
+
+        Returns:
+            int: The checksum, or None if the document isn't indexed.
+        """
+        document = self.__documents.get(key, None)
+        return None if document is None else document[0]
+
+    def keys(self):
+        """Retrieves the keys of the documents in this index.
+
+        Returns:
+            list: The keys.
+        """
+        return list(self.__documents.keys())
+
+    def add(self, key, text, checksum=None):
+        """Adds a document or replaces its text.
+
+        Args:
+            key (str): The key of the document.
+            text (str): The text of the document.
+            checksum (int): The checksum of the text, which is computed if
+            it is None.
+        """
+        if checksum is None:
+            checksum = text_checksum(text)
+        if self.checksum(key) == checksum:
+            return
+        frequencies = dict()
+        for term in tokenize(text):
+            frequencies[term] = frequencies.get(term, 0) + 1
+        self.__add_document(key, checksum, frequencies)
+
+    def remove(self, key):
+        """Removes a document if it is in this index.
+
+        Args:
+            key (str): The key of the document.
+        """
+        document = self.__documents.pop(key, None)
+        if document is None:
+            return
+        self.__changed.add(key)
+        _, length, frequencies = document
+        cls_prefix = self.__class_prefix(key)
+        count, total_length = self.__class_lengths[cls_prefix]
+        if count == 1:
+            del self.__class_lengths[cls_prefix]
+        else:
+            self.__class_lengths[cls_prefix] = (
+                count - 1, total_length - length
+            )
+        for term in frequencies:
+            postings = self.__postings[term]
+            del postings[key]
+            if len(postings) == 0:
+                del self.__postings[term]
+
+    def search(self, text, k=None, prefix=''):
+        """Ranks the documents that contain any of the terms of a text
+        with BM25. The frequencies of the terms and the lengths of the
+        documents are counted among the documents searched.
+
+        Args:
+            text (str): The text to search for.
+            k (int): The maximum number of documents, which are the best
+            matches. All the matches are included if it is None.
+            prefix (str): The prefix of the keys of the documents to
+            search.
+
+        Returns:
+            list: The scores and the keys of the documents, which are
+            sorted from the best match.
+        """
+        n, total_length = self.__lengths(prefix)
+        if n == 0:
+            return []
+        average_length = total_length / n or 1
+        scores = dict()
+        for term in set(tokenize(text)):
+            postings = [
+                (key, frequency)
+                for key, frequency in self.__postings.get(term, {}).items()
+                if key.startswith(prefix)
+            ]
+            idf = math.log(
+                1 + (n - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for key, frequency in postings:
+                length = self.__documents[key][1]
+                scores[key] = scores.get(key, 0) + idf * frequency * \
+                    (BM25_K1 + 1) / (frequency + BM25_K1 * (
+                        1 - BM25_B + BM25_B * length / average_length
+                    ))
+        found = ((-score, key) for key, score in scores.items())
+        if k is None:
+            found = sorted(found)
+        else:
+            found = heapq.nsmallest(k, found)
+        return [(-score, key) for score, key in found]
+
+    def dump(self, file_path):
+        """Writes this index to a file, which replaces the file
+        atomically, and removes the journal of the changes written to the
+        file it replaces.
+
+        Args:
+            file_path (str): The path to the file.
+        """
+        tmp_path = '{}.{}.tmp'.format(file_path, os.getpid())
+        # an old file left without its journal doesn't match the storage
+        try:
+            os.unlink(self.journal_path(file_path))
+        except FileNotFoundError:
+            pass
+        try:
+            with open(tmp_path, mode='w', encoding='utf-8') as file:
+                json.dump({
+                    'version': INDEX_VERSION,
+                    'fingerprint': self.fingerprint,
+                    'documents': {
+                        key: [checksum, frequencies]
+                        for key, (checksum, _, frequencies)
+                        in self.__documents.items()
+                    }
+                }, file)
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.isfile(tmp_path):
+                os.unlink(tmp_path)
+        self.__changed.clear()
+
+    def dump_changes(self, file_path):
+        """Appends the documents that have changed since this index was
+        last written to the journal of its file, along with the state of
+        the storage that the index matches.
+
+        Args:
+            file_path (str): The path to the file of the index.
+        """
+        if len(self.__changed) == 0:
+            return
+        documents = dict()
+        for key in self.__changed:
+            document = self.__documents.get(key, None)
+            if document is None:
+                documents[key] = None
+            else:
+                documents[key] = [document[0], document[2]]
+        entry = {'fingerprint': self.fingerprint, 'documents': documents}
+        with open(self.journal_path(file_path), mode='a',
+                  encoding='utf-8') as file:
+            file.write(json.dumps(entry) + '\n')
+        self.__changed.clear()
+
+    @staticmethod
+    def journal_path(file_path):
+        """Retrieves the path to the journal of the changes appended to
+        the file of an index.
+
+        Args:
+            file_path (str): The path to the file of the index.
+
+        Returns:
+            str: The path to the journal.
+        """
+        return '{}.journal'.format(file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        """Reads an index from a file and applies the changes appended to
+        its journal.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If the file isn't an index in the current format.
+
+        Returns:
+            TextIndex: The index.
+        """
+        with open(file_path, mode='r', encoding='utf-8') as file:
+            data = json.load(file)
+        if (type(data) is not dict) or \
+                (data.get('version', None) != INDEX_VERSION):
+            raise ValueError('Unsupported text index')
+        index = cls()
+        index.fingerprint = data['fingerprint']
+        for key, (checksum, frequencies) in data['documents'].items():
+            index.__add_document(key, checksum, frequencies)
+        try:
+            with open(cls.journal_path(file_path), mode='r',
+                      encoding='utf-8') as file:
+                for line in file:
+                    entry = json.loads(line)
+                    index.fingerprint = entry['fingerprint']
+                    for key, document in entry['documents'].items():
+                        if document is None:
+                            index.remove(key)
+                        else:
+                            index.__add_document(key, *document)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            # an entry cut short, which the storage is checked against
+            index.fingerprint = None
+        index.__changed.clear()
+        return index
+
+    @staticmethod
+    def __class_prefix(key):
+        """Retrieves the prefix of the key of a document that names the
+        class of its object.
+
+        Args:
+            key (str): The key of the document.
+
+        Returns:
+            str: The class name followed by a dot.
+        """
+        return key.partition('.')[0] + '.'
+
+    def __lengths(self, prefix):
+        """Counts the documents whose keys start with a prefix and sums
+        their lengths, which are kept for each class.
+
+        Args:
+            prefix (str): The prefix of the keys of the documents.
+
+        Returns:
+            tuple: The number of documents and their total length.
+        """
+        if '.' in prefix[:-1]:
+            # a prefix within a class
+            lengths = [
+                (1, length) for key, (_, length, _)
+                in self.__documents.items()
+                if key.startswith(prefix)
+            ]
+        else:
+            lengths = [
+                lengths for cls_prefix, lengths
+                in self.__class_lengths.items()
+                if cls_prefix.startswith(prefix)
+            ]
+        return sum(n for n, _ in lengths), sum(t for _, t in lengths)
+
+    def __add_document(self, key, checksum, frequencies):
+        """Adds a document from the frequencies of its terms.
+
+        Args:
+            key (str): The key of the document.
+            checksum (int): The checksum of the text of the document.
+            frequencies (dict): The terms of the document and the number
+            of times each one occurs.
+        """
+        self.remove(key)
+        self.__changed.add(key)
+        length = sum(frequencies.values())
+        self.__documents[key] = (checksum, length, frequencies)
+        cls_prefix = self.__class_prefix(key)
+        count, total_length = self.__class_lengths.get(cls_prefix, (0, 0))
+        self.__class_lengths[cls_prefix] = (count + 1, total_length + length)
+        for term, frequency in frequencies.items():
+            self.__postings.setdefault(term, {})[key] = frequency
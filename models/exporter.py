@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+"""A module containing the bulk export of objects to data files.
+"""
+import csv
+import os
+from json import JSONEncoder
+
+from models.engine.columns import Column, dump_columns
+from models.importer import file_format
+from models.query import Query
+
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'columnar')
+"""The formats that the objects can be exported to.
+"""
+COLUMNAR_EXTENSION = '.columnar'
+"""The extension of the columnar files.
+"""
+
+
+def export_format(file_path):
+    """Determines the format of an exported file from its extension.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Raises:
+        ValueError: If the extension isn't one of a known format.
+
+    Returns:
+        str: The format, which is csv, jsonl, or columnar.
+    """
+    if os.path.splitext(file_path)[1].lower() == COLUMNAR_EXTENSION:
+        return 'columnar'
+    return file_format(file_path)
+
+
+def record_attributes(records):
+    """Collects the names of the attributes of some serialized records in
+    the order they are first seen, without their class.
+
+    Args:
+        records (Iterable): The serialized records.
+
+    Returns:
+        list: The names of the attributes.
+    """
+    attrs = {}
+    for record in records:
+        for attr in record:
+            if attr not in attrs:
+                attrs[attr] = None
+    attrs.pop('__class__', None)
+    return list(attrs)
+
+
+def csv_cell(value, encoder):
+    """Converts a value to the text of a CSV cell. The values that are
+    neither strings nor numbers are written as JSON.
+
+    Args:
+        value (any): The value, which is None if it is missing.
+        encoder (JSONEncoder): The encoder of the other values.
+
+    Returns:
+        str|int|float: The cell.
+    """
+    if value is None:
+        return ''
+    if type(value) in (str, int, float):
+        return value
+    return encoder.encode(value)
+
+
+def write_rows(rows, file_path, row_format, attrs, cls_name):
+    """Writes some rows to a file, which replaces the file atomically.
+
+    Args:
+        rows (Iterable): The rows, which are dictionaries of attributes.
+        file_path (str): The path to the file.
+        row_format (str): The format of the file.
+        attrs (list): The names of the attributes in the order of the
+        columns, which is unused for JSON Lines files.
+        cls_name (str): The name of the class of the objects.
+
+    Returns:
+        int: The number of rows written.
+    """
+    n = 0
+    tmp_path = '{}.{}.tmp'.format(file_path, os.getpid())
+    try:
+        if row_format == 'columnar':
+            columns = {attr: Column() for attr in attrs}
+            for row in rows:
+                for attr, column in columns.items():
+                    column.append(row.get(attr, None))
+                n += 1
+            dump_columns(tmp_path, cls_name, columns)
+        else:
+            encoder = JSONEncoder()
+            with open(tmp_path, mode='w', encoding='utf-8',
+                      newline='') as file:
+                if row_format == 'csv':
+                    writer = csv.writer(file)
+                    writer.writerow(attrs)
+                    for row in rows:
+                        writer.writerow([
+                            csv_cell(row.get(attr, None), encoder)
+                            for attr in attrs
+                        ])
+                        n += 1
+                else:
+                    for row in rows:
+                        file.write(encoder.encode(row))
+                        file.write('\n')
+                        n += 1
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.isfile(tmp_path):
+            os.unlink(tmp_path)
+    return n
+
+
+def export_objects(storage, cls, file_path, row_format=None, attrs=None,
+                   predicates=()):
+    """Writes the stored objects of a model class to a CSV, JSON Lines,
+    or columnar file. The serialized records are streamed from the
+    storage to the file, which is read twice to find the columns if the
+    attributes aren't given for a CSV or columnar file.
+
+    Args:
+        storage (FileStorage|ShardedStorage|DBStorage|MmapStorage): The
+        storage.
+        cls (type): The model class.
+        file_path (str): The path to the file.
+        row_format (str): The format of the file, which is determined by
+        the extension of the file if it is None.
+        attrs (list): The names of the attributes to export. All of the
+        attributes are exported if it is None.
+        predicates (Iterable): The predicates that the objects have to
+        satisfy, in the form accepted by Query.where.
+
+    Raises:
+        OSError: If the file can't be written.
+        ValueError: If the format is unknown or a predicate is invalid.
+
+    Returns:
+        int: The number of objects exported.
+    """
+    if row_format is None:
+        row_format = export_format(file_path)
+    if row_format not in EXPORT_FORMATS:
+        raise ValueError('Unsupported file format: {}'.format(row_format))
+    query = Query(cls, storage).where(*predicates)
+    if attrs is not None:
+        query.select(*attrs)
+    elif row_format != 'jsonl':
+        attrs = record_attributes(query)
+        query.select(*attrs)
+    return write_rows(
+        query.rows(serialized=True), file_path, row_format, attrs,
+        query.cls_name
+    )
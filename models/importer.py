@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+"""A module containing the bulk import of objects from data files.
+"""
+import csv
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from uuid import uuid4
+
+from models.compact import schema_defaults
+
+
+IMPORT_BATCH_SIZE = 10000
+"""The number of rows that are turned into objects at once.
+"""
+FILE_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+"""The formats of the data files by their extensions.
+"""
+DATETIME_ATTRS = ('created_at', 'updated_at')
+"""The attributes that hold the times an object was created and updated.
+"""
+
+
+def coerce_attribute(cls, name, value):
+    """Converts a value to the type of the default value of an attribute
+    of a model class, which is a string if the class doesn't declare the
+    attribute. A string is read as JSON for a list or a dictionary.
+
+    Args:
+        cls (type): The model class.
+        name (str): The name of the attribute.
+        value (any): The value.
+
+    Raises:
+        ValueError: If the attribute is a method or a property of the
+        class, or the value can't be converted.
+
+    Returns:
+        any: The converted value.
+    """
+    defaults = schema_defaults(cls)
+    if name in defaults:
+        default = defaults[name]
+    else:
+        member = getattr(cls, name, None)
+        if callable(member) or isinstance(member, property):
+            raise ValueError('{} is not an attribute'.format(name))
+        default = ''
+    attr_type = type(default)
+    if isinstance(value, attr_type):
+        return value
+    try:
+        if (attr_type in (list, dict)) and isinstance(value, str):
+            # lists and dictionaries are exported to CSV files as JSON
+            value = json.loads(value)
+            if isinstance(value, attr_type):
+                return value
+            raise ValueError(value)
+        return attr_type(value)
+    except (TypeError, ValueError):
+        raise ValueError('{} is not a valid {}'.format(
+            name, attr_type.__name__
+        ))
+
+
+def file_format(file_path):
+    """Determines the format of a data file from its extension.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Raises:
+        ValueError: If the extension isn't one of a known format.
+
+    Returns:
+        str: The format, which is csv or jsonl.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in FILE_FORMATS:
+        raise ValueError('Unsupported file format: {}'.format(extension))
+    return FILE_FORMATS[extension]
+
+
+def read_rows(file_path):
+    """Reads the rows of a CSV or JSON Lines file one at a time. The
+    empty cells of a CSV file and the empty lines of a JSON Lines file
+    are left out.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Raises:
+        ValueError: If the file isn't in a known format, or a line of a
+        JSON Lines file isn't an object.
+
+    Yields:
+        tuple: The line number and the fields of a row.
+    """
+    row_format = file_format(file_path)
+    with open(file_path, mode='r', encoding='utf-8-sig', newline='') as file:
+        if row_format == 'csv':
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, {
+                    key: value for key, value in row.items()
+                    if (key is not None) and (value not in ('', None))
+                }
+            return
+        decoder = json.JSONDecoder()
+        for line_num, line in enumerate(file, 1):
+            if line.strip() == '':
+                continue
+            try:
+                row = decoder.decode(line)
+            except ValueError:
+                row = None
+            if type(row) is not dict:
+                raise ValueError(
+                    'line {}: not a JSON object'.format(line_num)
+                )
+            yield line_num, row
+
+
+def row_attributes(cls, row, now):
+    """Creates the attributes of a new object of a model class from the
+    fields of a row. The id and the times are kept if the row has them.
+
+    Args:
+        cls (type): The model class.
+        row (dict): The fields of the row.
+        now (str): The time of the import in ISO format, which is given
+        to the objects without the times.
+
+    Raises:
+        ValueError: If a field can't be converted to its attribute.
+
+    Returns:
+        dict: The attributes, which can be passed to the class.
+    """
+    attrs = {'id': None, 'created_at': now, 'updated_at': now}
+    for key, value in row.items():
+        if key == '__class__':
+            continue
+        if key in DATETIME_ATTRS:
+            if not isinstance(value, str):
+                raise ValueError('{} is not a valid time'.format(key))
+            datetime.fromisoformat(value)
+            attrs[key] = value
+        elif key == 'id':
+            attrs[key] = str(value)
+        else:
+            attrs[key] = coerce_attribute(cls, key, value)
+    if attrs['id'] is None:
+        attrs['id'] = str(uuid4())
+    return attrs
+
+
+def import_objects(storage, cls, file_path, progress=None):
+    """Creates objects of a model class from the rows of a CSV or JSON
+    Lines file and stores them. The rows are turned into objects in
+    batches and the objects are saved once at the end. If a row is
+    invalid, none of the objects are stored.
+
+    Args:
+        storage (FileStorage|ShardedStorage|DBStorage): The storage.
+        cls (type): The model class.
+        file_path (str): The path to the file.
+        progress (Callable): An optional function that is called with the
+        number of rows imported after each batch.
+
+    Raises:
+        OSError: If the file can't be read.
+        ValueError: If the file isn't in a known format or a row is
+        invalid, whose line number is in the message.
+
+    Returns:
+        int: The number of objects created.
+    """
+    now = datetime.now().isoformat()
+    rows = read_rows(file_path)
+    n = 0
+    with storage.batch():
+        while True:
+            batch = list(islice(rows, IMPORT_BATCH_SIZE))
+            if len(batch) == 0:
+                break
+            for line_num, row in batch:
+                try:
+                    attrs = row_attributes(cls, row, now)
+                except ValueError as error:
+                    raise ValueError(
+                        'line {}: {}'.format(line_num, error)
+                    ) from error
+                storage.new(cls(**attrs))
+            n += len(batch)
+            if progress is not None:
+                progress(n)
+        storage.save()
+    return n
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """A module containing the model for place data sets.
 """
-from models.base_model import BaseModel
+from models.base_model import BaseModel, DefaultList
 
 
 class Place(BaseModel):
@@ -17,4 +17,11 @@ class Place(BaseModel):
     price_by_night = 0
     latitude = 0.0
     longitude = 0.0
-    amenity_ids = []
+    amenity_ids = DefaultList()
+
+    @property
+    def reviews(self):
+        """The reviews of this place.
+        """
+        from models import storage
+        return storage.related('Review', 'place_id', self.id)
@@ -0,0 +1,494 @@
+#!/usr/bin/python3
+"""A module containing the queries over the stored objects.
+"""
+import operator
+import re
+from datetime import datetime
+from itertools import islice
+
+from models.compact import schema_defaults
+from models.engine.lazy_objects import record_str
+from models.engine.sorted_index import SortedIndex, is_sortable
+from models.engine.spatial_index import is_location
+from models.registry import FOREIGN_KEYS, SORTED_ATTRS
+
+
+OPERATORS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+"""The comparison operators that can be used in the predicates.
+"""
+STRING_ATTRS = ('id', 'created_at', 'updated_at')
+"""The attributes of all the objects, which hold strings in the
+serialized records.
+"""
+QUERY_METHODS = (
+    'where', 'near', 'within', 'select', 'order_by', 'offset', 'limit'
+)
+"""The methods that can start a query in the console.
+"""
+PREDICATE_PATTERN = re.compile(r'\s*([a-zA-Z_]\w*)\s*(==|!=|<=|>=|=|<|>)(.*)')
+"""The pattern of a predicate, such as price_by_night<100.
+"""
+CALL_PATTERN = re.compile(r'\s*\.\s*([a-zA-Z_]+)\s*\(((?:[^()"]|"[^"]*")*)\)')
+"""The pattern of a method call in a query, such as .limit(50).
+"""
+_MISSING = object()
+
+
+def split_args(args_txt):
+    """Splits the arguments of a method call in a query at the commas
+    that are not quoted.
+
+    Args:
+        args_txt (str): The arguments of the call.
+
+    Returns:
+        list: The arguments, which are stripped of surrounding spaces.
+    """
+    if args_txt.strip() == '':
+        return []
+    args = []
+    quoted = False
+    start = 0
+    for i, char in enumerate(args_txt):
+        if char == '"':
+            quoted = not quoted
+        elif (char == ',') and not quoted:
+            args.append(args_txt[start:i].strip())
+            start = i + 1
+    args.append(args_txt[start:].strip())
+    return args
+
+
+def parse_value(value_txt, default=_MISSING):
+    """Parses the value of a predicate. The value is converted to the
+    type of the default value of the attribute the way the update command
+    does, otherwise it is read as a number if it isn't quoted.
+
+    Args:
+        value_txt (str): The text of the value.
+        default (any): The default value of the attribute.
+
+    Raises:
+        ValueError: If the value can't be converted.
+
+    Returns:
+        any: The value.
+    """
+    txt = value_txt.strip()
+    quoted = (len(txt) >= 2) and (txt[0] == '"') and (txt[-1] == '"')
+    if quoted:
+        txt = txt[1:-1]
+    if type(default) in (str, int, float):
+        return type(default)(txt)
+    if not quoted:
+        for value_type in (int, float):
+            try:
+                return value_type(txt)
+            except ValueError:
+                pass
+    return txt
+
+
+class Query:
+    """Represents a query over the stored objects of a class, which is
+    evaluated lazily and stops reading the objects once its limit is
+    reached. The objects are read in the order of a sorted index if a
+    predicate compares one of its attributes, and from a spatial index if
+    the query is restricted to an area.
+    """
+
+    def __init__(self, cls, storage=None):
+        """Initializes a new Query.
+
+        Args:
+            cls (type|str): The class or the name of the class.
+            storage (object): The storage of the objects. The storage of
+            the models is used if it is None.
+        """
+        if storage is None:
+            from models import storage
+        self.cls_name = cls if isinstance(cls, str) else cls.__name__
+        self.predicates = []
+        self.attrs = None
+        self.order = None
+        self.area = None
+        self.start = 0
+        self.stop = None
+        self.__storage = storage
+
+    def where(self, *predicates):
+        """Adds predicates that the objects have to satisfy.
+
+        Args:
+            *predicates (tuple): The predicates, each of which is either
+            the text of a comparison, such as 'max_guest>=4', or a tuple of
+            an attribute name, an operator, and a value.
+
+        Raises:
+            ValueError: If a predicate is invalid.
+
+        Returns:
+            Query: This query.
+        """
+        cls = self.__storage.model_classes[self.cls_name]
+        for predicate in predicates:
+            if isinstance(predicate, str):
+                match = PREDICATE_PATTERN.fullmatch(predicate)
+                if match is None:
+                    raise ValueError(predicate)
+                attr, op, value_txt = match.groups()
+                default = schema_defaults(cls).get(attr, _MISSING)
+                if attr in STRING_ATTRS:
+                    default = ''
+                value = parse_value(value_txt, default)
+            else:
+                attr, op, value = predicate
+            if op not in OPERATORS:
+                raise ValueError(op)
+            self.predicates.append((attr, op, value))
+        return self
+
+    def near(self, lat, lon, km):
+        """Restricts the results to the objects within a distance of a
+        location, which are sorted by their distances unless the results
+        are sorted by an attribute.
+
+        Args:
+            lat (float): The latitude of the location in degrees.
+            lon (float): The longitude of the location in degrees.
+            km (float): The maximum distance in kilometers.
+
+        Raises:
+            ValueError: If the location or the distance is invalid.
+
+        Returns:
+            Query: This query.
+        """
+        lat, lon, km = float(lat), float(lon), float(km)
+        if not (is_location(lat, lon) and (km >= 0)):
+            raise ValueError((lat, lon, km))
+        self.area = ('near', (lat, lon, km))
+        return self
+
+    def within(self, south, west, north, east):
+        """Restricts the results to the objects in a box of latitudes
+        and longitudes.
+
+        Args:
+            south (float): The south edge of the box.
+            west (float): The west edge of the box.
+            north (float): The north edge of the box.
+            east (float): The east edge of the box, which is less than the
+            west edge if the box crosses the 180th meridian.
+
+        Raises:
+            ValueError: If an edge is invalid.
+
+        Returns:
+            Query: This query.
+        """
+        box = (float(south), float(west), float(north), float(east))
+        if not (is_location(box[0], box[1]) and is_location(box[2], box[3])):
+            raise ValueError(box)
+        self.area = ('within', box)
+        return self
+
+    def select(self, *attrs):
+        """Restricts the results to some attributes of the objects.
+
+        Args:
+            *attrs (tuple): The names of the attributes.
+
+        Returns:
+            Query: This query.
+        """
+        self.attrs = tuple(attrs)
+        return self
+
+    def order_by(self, attr):
+        """Sorts the results by a numeric attribute. The objects whose
+        attribute isn't a number are left out.
+
+        Args:
+            attr (str): The name of the attribute, which is preceded by a
+            minus sign for a descending order.
+
+        Raises:
+            ValueError: If the name of the attribute is invalid.
+
+        Returns:
+            Query: This query.
+        """
+        reverse = attr.startswith('-')
+        attr = attr[1:] if reverse else attr
+        if not attr.isidentifier():
+            raise ValueError(attr)
+        self.order = (attr, reverse)
+        return self
+
+    def offset(self, n):
+        """Skips a number of the matching objects.
+
+        Args:
+            n (int): The number of objects to skip.
+
+        Raises:
+            ValueError: If the number is negative.
+
+        Returns:
+            Query: This query.
+        """
+        n = int(n)
+        if n < 0:
+            raise ValueError(n)
+        self.start = n
+        return self
+
+    def limit(self, n):
+        """Restricts the number of results.
+
+        Args:
+            n (int): The maximum number of results.
+
+        Raises:
+            ValueError: If the number is negative.
+
+        Returns:
+            Query: This query.
+        """
+        n = int(n)
+        if n < 0:
+            raise ValueError(n)
+        self.stop = n
+        return self
+
+    def __iter__(self):
+        """Generates the serialized records of the matching objects.
+
+        Yields:
+            dict: The serialized record of an object.
+        """
+        defaults = schema_defaults(self.__storage.model_classes[self.cls_name])
+        checks = []
+        for attr, op, value in self.predicates:
+            checks.append(
+                (attr, OPERATORS[op], value, defaults.get(attr, _MISSING))
+            )
+        records = (
+            record
+            for record in self.__candidates()
+            if all(
+                self.__check(record, attr, compare, value, default)
+                for attr, compare, value, default in checks
+            )
+        )
+        stop = None if self.stop is None else self.start + self.stop
+        yield from islice(records, self.start, stop)
+
+    def count(self):
+        """Counts the results.
+
+        Returns:
+            int: The number of results.
+        """
+        return sum(1 for _ in self)
+
+    def rows(self, serialized=False):
+        """Generates the results, which are the string representations
+        of the matching objects, or dictionaries of the selected
+        attributes.
+
+        Args:
+            serialized (bool): Whether to generate the serialized records
+            of the matching objects instead of their string
+            representations when no attributes are selected.
+
+        Yields:
+            str|dict: A result.
+        """
+        if self.attrs is None:
+            for record in self:
+                yield record if serialized else record_str(record)
+            return
+        defaults = schema_defaults(self.__storage.model_classes[self.cls_name])
+        for record in self:
+            row = {}
+            for attr in self.attrs:
+                value = record.get(attr, defaults.get(attr, _MISSING))
+                if value is not _MISSING:
+                    row[attr] = value
+            yield row
+
+    def __candidates(self):
+        """Generates the serialized records of the objects that might
+        match in the order of the results. They are looked up in the index
+        of a foreign key if a predicate compares one for equality, or in a
+        sorted index if the results are sorted or a predicate compares a
+        sorted attribute.
+
+        Yields:
+            dict: The serialized record of an object.
+        """
+        if self.area is not None:
+            if self.area[0] == 'near':
+                k = None
+                if (len(self.predicates) == 0) and (self.order is None) \
+                        and (self.stop is not None):
+                    k = self.start + self.stop
+                objs = [
+                    obj for _, obj in self.__storage.near(
+                        self.cls_name, *self.area[1], k
+                    )
+                ]
+            else:
+                objs = self.__storage.within(self.cls_name, *self.area[1])
+            for obj in self.__sort(objs):
+                yield obj.to_dict()
+            return
+        foreign_keys = FOREIGN_KEYS.get(self.cls_name, ())
+        for attr, op, value in self.predicates:
+            if (OPERATORS[op] is operator.eq) and (attr in foreign_keys) and \
+                    isinstance(value, str):
+                objs = self.__storage.related(self.cls_name, attr, value)
+                for obj in self.__sort(objs):
+                    yield obj.to_dict()
+                return
+        if self.order is not None:
+            attr, reverse = self.order
+        else:
+            attr, reverse = None, False
+            for sorted_attr in SORTED_ATTRS.get(self.cls_name, ()):
+                if self.__bounds(sorted_attr) != (None, None):
+                    attr = sorted_attr
+                    break
+        if attr is None:
+            yield from self.__storage.records(self.cls_name)
+            return
+        low, high = self.__bounds(attr)
+        for obj in self.__storage.ordered(
+            self.cls_name, attr, low, high, reverse
+        ):
+            yield obj.to_dict()
+
+    def __sort(self, objs):
+        """Sorts some objects in the order of the results.
+
+        Args:
+            objs (list): The objects.
+
+        Returns:
+            Iterable: The sorted objects, or the objects in their order if
+            the results aren't sorted.
+        """
+        if self.order is None:
+            return objs
+        attr, reverse = self.order
+        objs_by_key = {i: obj for i, obj in enumerate(objs)}
+        index = SortedIndex(
+            (i, getattr(obj, attr, None)) for i, obj in objs_by_key.items()
+        )
+        return (objs_by_key[i] for i in index.keys(reverse=reverse))
+
+    def __bounds(self, attr):
+        """Finds the range of the values of an attribute that the
+        predicates allow.
+
+        Args:
+            attr (str): The name of the attribute.
+
+        Returns:
+            tuple: The lowest and the highest values, either of which is
+            None if it isn't bounded.
+        """
+        low, high = None, None
+        for pred_attr, op, value in self.predicates:
+            if (pred_attr != attr) or not is_sortable(value):
+                continue
+            if op in ('==', '=', '>', '>='):
+                low = value if low is None else max(low, value)
+            if op in ('==', '=', '<', '<='):
+                high = value if high is None else min(high, value)
+        return low, high
+
+    @staticmethod
+    def __check(record, attr, compare, value, default):
+        """Checks if an object satisfies a predicate. An attribute that
+        isn't set takes its default value, and values that can't be
+        compared don't match.
+
+        Args:
+            record (dict): The serialized record of the object.
+            attr (str): The name of the attribute.
+            compare (Callable): The comparison operator.
+            value (any): The value to compare with.
+            default (any): The default value of the attribute.
+
+        Returns:
+            bool: True if the object satisfies the predicate.
+        """
+        attr_value = record.get(attr, default)
+        if attr_value is _MISSING:
+            return False
+        if isinstance(attr_value, datetime):
+            attr_value = attr_value.isoformat()
+        try:
+            return bool(compare(attr_value, value))
+        except TypeError:
+            return False
+
+
+def parse_query(query_txt, storage=None):
+    """Parses a query in the dot syntax of the console, such as
+    Place.where(price_by_night<100, max_guest>=4).limit(50).count().
+
+    Args:
+        query_txt (str): The text of the query.
+        storage (object): The storage of the objects. The storage of the
+        models is used if it is None.
+
+    Raises:
+        ValueError: If the query is invalid.
+
+    Returns:
+        tuple: The query, and whether the query ends with count().
+    """
+    match = re.match(r'\s*([a-zA-Z]+)', query_txt)
+    if match is None:
+        raise ValueError(query_txt)
+    query = Query(match.group(1), storage)
+    counted = False
+    pos = match.end()
+    while query_txt[pos:].strip() != '':
+        if counted:
+            raise ValueError(query_txt)
+        match = CALL_PATTERN.match(query_txt, pos)
+        if match is None:
+            raise ValueError(query_txt)
+        method, args_txt = match.groups()
+        args = split_args(args_txt)
+        if method == 'where':
+            query.where(*args)
+        elif method == 'select':
+            query.select(*args)
+        elif (method == 'order_by') and (len(args) == 1):
+            query.order_by(args[0])
+        elif (method == 'near') and (len(args) == 3):
+            query.near(*args)
+        elif (method == 'within') and (len(args) == 4):
+            query.within(*args)
+        elif (method in ('offset', 'limit')) and (len(args) == 1):
+            getattr(query, method)(args[0])
+        elif (method == 'count') and (len(args) == 0):
+            counted = True
+        else:
+            raise ValueError(method)
+        pos = match.end()
+    return query, counted
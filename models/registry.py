@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""A module containing the registry of the model classes.
+"""
+import os
+from collections.abc import Mapping
+from importlib import import_module
+
+
+MODEL_MODULES = {
+    'BaseModel': 'models.base_model',
+    'User': 'models.user',
+    'State': 'models.state',
+    'City': 'models.city',
+    'Amenity': 'models.amenity',
+    'Place': 'models.place',
+    'Review': 'models.review'
+}
+"""The names of the model classes and the modules that define them.
+"""
+RELATIONSHIPS = (
+    ('State', 'cities', 'City', 'state_id'),
+    ('City', 'places', 'Place', 'city_id'),
+    ('User', 'places', 'Place', 'user_id'),
+    ('Place', 'reviews', 'Review', 'place_id'),
+    ('User', 'reviews', 'Review', 'user_id'),
+)
+"""The relationships between the model classes, each of which consists
+of the name of the parent class, the name of the relationship, the name
+of the child class, and the attribute of the child class that holds the
+id of the parent.
+"""
+FOREIGN_KEYS = dict()
+"""The names of the model classes and the attributes that hold the ids
+of their parents.
+"""
+for _, _, child, attr in RELATIONSHIPS:
+    if attr not in FOREIGN_KEYS.setdefault(child, ()):
+        FOREIGN_KEYS[child] += (attr,)
+SORTED_ATTRS = {
+    'Place': (
+        'price_by_night', 'number_rooms', 'number_bathrooms', 'max_guest',
+        'latitude', 'longitude'
+    ),
+}
+"""The names of the model classes and their numeric attributes, which
+are kept in sorted indexes by the storage engines that support them.
+"""
+LOCATION_ATTRS = {
+    'Place': ('latitude', 'longitude'),
+}
+"""The names of the model classes and their attributes that hold the
+latitude and the longitude of the objects, which are kept in spatial
+indexes by the storage engines that support them.
+"""
+TEXT_ATTRS = {
+    'Place': ('name', 'description'),
+    'Review': ('text',),
+}
+"""The names of the model classes and their attributes that hold free
+text, which are kept in full-text indexes.
+"""
+
+
+class ModelRegistry(Mapping):
+    """Represents the mapping of the names of the model classes to the
+    classes, which imports the module of a class when the class is first
+    retrieved.
+    """
+
+    def __init__(self, compact=None):
+        """Initializes a new ModelRegistry.
+
+        Args:
+            compact (bool): Whether to map the names to the compact
+            variants of the classes. It is read from the
+            HBNB_COMPACT_MODELS environment variable if it is None.
+        """
+        if compact is None:
+            compact = os.getenv('HBNB_COMPACT_MODELS', '0') == '1'
+        self.compact = compact
+        self.__classes = dict()
+
+    def __getitem__(self, cls_name):
+        """Retrieves a model class, importing its module if necessary.
+
+        Args:
+            cls_name (str): The name of the class.
+
+        Returns:
+            type: The class.
+        """
+        cls = self.__classes.get(cls_name, None)
+        if cls is None:
+            module = import_module(MODEL_MODULES[cls_name])
+            cls = getattr(module, cls_name)
+            if self.compact:
+                cls = import_module('models.compact').compact_class(cls)
+            self.__classes[cls_name] = cls
+        return cls
+
+    def __contains__(self, cls_name):
+        """Checks if a name is the name of a model class without
+        importing any module.
+
+        Args:
+            cls_name (str): The name to check.
+
+        Returns:
+            bool: True if it is the name of a model class.
+        """
+        return cls_name in MODEL_MODULES
+
+    def __iter__(self):
+        """Iterates over the names of the model classes.
+
+        Yields:
+            str: The name of a class.
+        """
+        yield from MODEL_MODULES.keys()
+
+    def __len__(self):
+        """Counts the model classes.
+
+        Returns:
+            int: The number of classes.
+        """
+        return len(MODEL_MODULES)
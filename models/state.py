@@ -8,3 +8,10 @@ class State(BaseModel):
     """Represents a state data set.
     """
     name = ''
+
+    @property
+    def cities(self):
+        """The cities in this state.
+        """
+        from models import storage
+        return storage.related('City', 'state_id', self.id)
@@ -11,3 +11,17 @@ class User(BaseModel):
     password = ''
     first_name = ''
     last_name = ''
+
+    @property
+    def places(self):
+        """The places owned by this user.
+        """
+        from models import storage
+        return storage.related('Place', 'user_id', self.id)
+
+    @property
+    def reviews(self):
+        """The reviews written by this user.
+        """
+        from models import storage
+        return storage.related('Review', 'user_id', self.id)
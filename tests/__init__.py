@@ -27,11 +27,13 @@ def delete_file(file_path: str):
 
 
 def reset_store(store: FileStorage, file_path='file.json'):
-    """Resets the items in the given store.
+    """Resets the items in the given store and removes the lock file
+    left by the stores saved before.
     Args:
         store (FileStorage): The FileStorage to reset.
         file_path (str): The path to the store's file.
     """
+    delete_file('{}.lock'.format(file_path))
     with open(file_path, mode='w') as file:
         file.write('{}')
         if store is not None:
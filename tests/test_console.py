@@ -7,10 +7,15 @@ import unittest
 from io import StringIO
 from unittest.mock import patch
 
-from console import HBNBCommand
+from console import (
+    HBNBCommand, parse_command, split_func_args, split_line
+)
 from models import storage
 from models.base_model import BaseModel
-from tests import clear_stream
+from models.engine.file_storage import FileStorage
+from models.engine.mmap_storage import MmapStorage
+from models.registry import ModelRegistry
+from tests import clear_stream, delete_file, write_text_file
 
 
 class TestHBNBCommand(unittest.TestCase):
@@ -194,6 +199,52 @@ class TestHBNBCommand(unittest.TestCase):
             cons.onecmd(cmd_line)
             self.assertIn(mdl_id, cout.getvalue())
 
+    def test_all_output(self):
+        """Tests the output options of the all command.
+        """
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            for _ in range(3):
+                cons.onecmd('create Amenity')
+            strings = list(storage.strings('Amenity'))
+            records = list(storage.records('Amenity'))
+            clear_stream(cout)
+            with patch('console.OUTPUT_CHUNK_SIZE', 1):
+                cons.onecmd('all Amenity')
+            self.assertEqual(cout.getvalue(), '{}\n'.format(strings))
+            clear_stream(cout)
+            cons.onecmd('all Amenity --offset 1 --limit=1')
+            self.assertEqual(cout.getvalue(), '{}\n'.format(strings[1:2]))
+            clear_stream(cout)
+            cons.onecmd('all Amenity --limit 0')
+            self.assertEqual(cout.getvalue(), '[]\n')
+            clear_stream(cout)
+            with patch('console.OUTPUT_CHUNK_SIZE', 1):
+                cons.onecmd(cons.precmd('Amenity.all("--jsonl")'))
+            self.assertEqual(
+                [json.loads(ln) for ln in cout.getvalue().splitlines()],
+                records
+            )
+            clear_stream(cout)
+            cons.onecmd('all Amenity --jsonl --offset=2 --limit 1')
+            self.assertEqual(json.loads(cout.getvalue()), records[2])
+            clear_stream(cout)
+            cons.onecmd(cons.precmd(
+                'Amenity.select(id).offset(1).limit(1) --jsonl'
+            ))
+            self.assertEqual(
+                cout.getvalue(), '{{"id": "{}"}}\n'.format(records[1]['id'])
+            )
+            for line in ('all Amenity --csv', 'all --limit',
+                         'all Amenity --offset -1', 'all --limit=a'):
+                clear_stream(cout)
+                cons.onecmd(line)
+                self.assertEqual(
+                    cout.getvalue(), '*** Unknown syntax: {}\n'.format(
+                        line.partition(' ')[2]
+                    )
+                )
+
     def test_class_count(self):
         """Tests the ClassName.count() feature.
         """
@@ -279,3 +330,424 @@ class TestHBNBCommand(unittest.TestCase):
                 "'name': 'Basketball court'",
                 cout.getvalue()
             )
+
+    def test_class_update_2(self):
+        """Tests that the arguments of ClassName.update(id, dict_repr)
+        reach the command as they were parsed.
+        """
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            cons.onecmd('create Amenity')
+            mdl_id = cout.getvalue().strip()
+            cons.onecmd(cons.precmd(
+                'Amenity.update("{}", {{"name": "Pool, indoor"}})'.format(
+                    mdl_id
+                )
+            ))
+            clear_stream(cout)
+            cons.onecmd('show Amenity {}'.format(mdl_id))
+            self.assertIn("'name': 'Pool, indoor'", cout.getvalue())
+
+    def test_compact_update(self):
+        """Tests updating and querying the objects of the compact model
+        classes, whose slots hide the defaults of the attributes.
+        """
+        compact_storage = FileStorage('compact.json')
+        compact_storage.model_classes = ModelRegistry(compact=True)
+        with patch('console.storage', compact_storage), \
+                patch('models.storage', compact_storage), \
+                patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            place_ids = []
+            for _ in range(3):
+                clear_stream(cout)
+                cons.onecmd('create Place')
+                place_ids.append(cout.getvalue().strip())
+            clear_stream(cout)
+            cons.onecmd('update Place {} price_by_night 5'.format(
+                place_ids[0]
+            ))
+            cons.onecmd('update Place {} price_by_night "50"'.format(
+                place_ids[2]
+            ))
+            self.assertEqual(cout.getvalue(), '')
+            self.assertEqual(
+                compact_storage.get('Place', place_ids[2]).price_by_night, 50
+            )
+            cons.onecmd(cons.precmd('Place.where(price_by_night<10)'))
+            self.assertIn(place_ids[0], cout.getvalue())
+            self.assertIn(place_ids[1], cout.getvalue())
+            self.assertNotIn(place_ids[2], cout.getvalue())
+        delete_file('compact.json')
+        delete_file('compact.json.lock')
+
+    def test_invalid_update(self):
+        """Tests updating objects with values that can't be stored in
+        their attributes.
+        """
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            cons.onecmd('create Place')
+            place_id = cout.getvalue().strip()
+            clear_stream(cout)
+            cons.onecmd('create User')
+            user_id = cout.getvalue().strip()
+            for line, error in (
+                ('update Place {} amenity_ids abc'.format(place_id),
+                 'amenity_ids is not a valid list'),
+                ('update User {} places x'.format(user_id),
+                 'places is not an attribute'),
+                ('Place.update("{}", {{"name": "Loft", "max_guest": "x"}})'
+                 .format(place_id), 'max_guest is not a valid int'),
+            ):
+                clear_stream(cout)
+                cons.onecmd(cons.precmd(line))
+                self.assertEqual(cout.getvalue(), '** {} **\n'.format(error))
+            place = storage.get('Place', place_id)
+            self.assertEqual(place.amenity_ids, [])
+            self.assertEqual(place.name, '')
+
+    def test_read_only(self):
+        """Tests the commands that change the objects with a read-only
+        storage.
+        """
+        file_storage = FileStorage('read_only.mmap')
+        file_storage.new(BaseModel(id='5', name='Chris'))
+        file_storage.save()
+        mmap_storage = MmapStorage('read_only.mmap')
+        mmap_storage.reload()
+        with patch('console.storage', mmap_storage), \
+                patch('models.storage', mmap_storage), \
+                patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            for line in (
+                'create BaseModel',
+                'update BaseModel 5 name "Ada"',
+                'BaseModel.update("5", {"name": "Ada"})',
+                'destroy BaseModel 5',
+            ):
+                clear_stream(cout)
+                cons.onecmd(cons.precmd(line))
+                self.assertEqual(
+                    cout.getvalue(), '** storage is read-only **\n'
+                )
+            clear_stream(cout)
+            cons.onecmd('show BaseModel 5')
+            self.assertIn("'name': 'Chris'", cout.getvalue())
+        delete_file('read_only.mmap')
+        delete_file('read_only.mmap.lock')
+
+    def test_parse_command(self):
+        """Tests the parsing of the lines of command.
+        """
+        self.assertEqual(
+            parse_command('User.show("5")'), ('show User "5"', ('User', '5'))
+        )
+        self.assertEqual(parse_command('User.all()'), ('all User', ('User',)))
+        self.assertEqual(
+            parse_command('Place.where(max_guest>2)'),
+            ('query Place.where(max_guest>2)', None)
+        )
+        self.assertEqual(
+            parse_command('User.show("5)'), ('User.show("5)', None)
+        )
+        self.assertEqual(parse_command('help'), ('help', None))
+        self.assertEqual(
+            split_func_args('"id", name ,{"a": {"b": 1}}, 2'),
+            ['id', 'name', '{"a": {"b": 1}}', '2']
+        )
+        self.assertEqual(split_func_args(''), [])
+        with self.assertRaises(SyntaxError):
+            split_func_args('{"a": 1')
+        self.assertEqual(split_line('User "a b" c'), ('User', 'a b', 'c'))
+        cons = HBNBCommand()
+        line = cons.precmd('Place.update("5", {"name": "x"})')
+        self.assertEqual(
+            cons.split_args(line.partition(' ')[2]),
+            ['Place', '5', '{"name": "x"}']
+        )
+        self.assertEqual(cons.split_args('Place 6'), ['Place', '6'])
+        # a line typed after the call is split as it's written
+        line = cons.precmd(line)
+        self.assertEqual(
+            cons.split_args(line.partition(' ')[2]),
+            ['Place', '5', '{name: x}']
+        )
+
+    def test_batch(self):
+        """Tests the batch command.
+        """
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            delete_file('commands.txt')
+            cons.onecmd('batch')
+            self.assertEqual(cout.getvalue(), '** file path missing **\n')
+            clear_stream(cout)
+            cons.onecmd('batch commands.txt')
+            self.assertEqual(cout.getvalue(), "** file doesn't exist **\n")
+            clear_stream(cout)
+            cons.onecmd('create State')
+            mdl_id = cout.getvalue().strip()
+            write_text_file('commands.txt', '\n'.join([
+                '# renames a state',
+                'update State {} name Lagos'.format(mdl_id),
+                '',
+                'State.update({}, "capital", "Ikeja")'.format(mdl_id),
+                'quit',
+                'destroy State {}'.format(mdl_id),
+            ]))
+            clear_stream(cout)
+            cons.onecmd('batch commands.txt')
+            self.assertEqual(cout.getvalue(), '')
+            os.unlink('commands.txt')
+            with open('file.json', mode='r') as file:
+                json_obj = json.load(file)
+                mdl_dict = json_obj['State.{}'.format(mdl_id)]
+                self.assertEqual(mdl_dict['name'], 'Lagos')
+                self.assertEqual(mdl_dict['capital'], 'Ikeja')
+
+    def test_related(self):
+        """Tests the cities, places, and reviews commands.
+        """
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            cons.onecmd('create Place')
+            place_id = cout.getvalue().strip()
+            clear_stream(cout)
+            cons.onecmd('create Review')
+            review_id = cout.getvalue().strip()
+            cons.onecmd('update Review {} place_id {}'.format(
+                review_id, place_id
+            ))
+            clear_stream(cout)
+            cons.onecmd(cons.precmd('Place.reviews("{}")'.format(place_id)))
+            self.assertIn('[Review] ({})'.format(review_id), cout.getvalue())
+            self.assertEqual(
+                storage.get('Place', place_id).reviews,
+                [storage.get('Review', review_id)]
+            )
+            clear_stream(cout)
+            cons.onecmd('destroy Review {}'.format(review_id))
+            cons.onecmd('reviews Place {}'.format(place_id))
+            self.assertEqual(cout.getvalue(), '[]\n')
+            clear_stream(cout)
+            cons.onecmd('reviews Place')
+            self.assertEqual(cout.getvalue(), '** instance id missing **\n')
+            clear_stream(cout)
+            cons.onecmd('reviews City {}'.format(place_id))
+            self.assertEqual(
+                cout.getvalue(),
+                '*** Unknown syntax: reviews City {}\n'.format(place_id)
+            )
+            clear_stream(cout)
+            cons.onecmd('cities State 0')
+            self.assertEqual(cout.getvalue(), '** no instance found **\n')
+            clear_stream(cout)
+            cons.onecmd('places')
+            self.assertEqual(cout.getvalue(), '** class name missing **\n')
+
+    def test_query(self):
+        """Tests the query command and its dot syntax.
+        """
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            place_ids = []
+            for price in (50, 150, 80):
+                clear_stream(cout)
+                cons.onecmd('create Place')
+                place_ids.append(cout.getvalue().strip())
+                cons.onecmd('update Place {} price_by_night {}'.format(
+                    place_ids[-1], price
+                ))
+            clear_stream(cout)
+            cons.onecmd(cons.precmd(
+                'Place.where(price_by_night<100, id!="{}")'.format(
+                    place_ids[2]
+                )
+            ))
+            self.assertIn('[Place] ({})'.format(place_ids[0]), cout.getvalue())
+            self.assertNotIn(place_ids[2], cout.getvalue())
+            clear_stream(cout)
+            cons.onecmd(cons.precmd(
+                'Place.where(id=="{}").select(price_by_night)'.format(
+                    place_ids[1]
+                )
+            ))
+            self.assertEqual(cout.getvalue(), "[{'price_by_night': 150}]\n")
+            clear_stream(cout)
+            cons.onecmd(cons.precmd('Place.select(id).limit(2).count()'))
+            self.assertEqual(cout.getvalue(), '2\n')
+            clear_stream(cout)
+            cons.onecmd(cons.precmd(
+                'Place.order_by(-price_by_night).select(id).limit(1)'
+            ))
+            self.assertNotIn(place_ids[0], cout.getvalue())
+            self.assertNotIn(place_ids[2], cout.getvalue())
+            cons.onecmd('update Place {} latitude -89.99'.format(
+                place_ids[1]
+            ))
+            clear_stream(cout)
+            cons.onecmd(cons.precmd('Place.near(-90, 0, 5).select(id)'))
+            self.assertEqual(
+                cout.getvalue(), "[{{'id': '{}'}}]\n".format(place_ids[1])
+            )
+            clear_stream(cout)
+            cons.onecmd(cons.precmd('Place.where(price_by_night<"a")'))
+            self.assertEqual(
+                cout.getvalue(),
+                '*** Unknown syntax: Place.where(price_by_night<"a")\n'
+            )
+            clear_stream(cout)
+            cons.onecmd('query Spaceship.limit(1)')
+            self.assertEqual(cout.getvalue(), "** class doesn't exist **\n")
+            clear_stream(cout)
+            cons.onecmd('query')
+            self.assertEqual(cout.getvalue(), '** class name missing **\n')
+
+    def test_search(self):
+        """Tests the search command and its dot syntax.
+        """
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            review_ids = []
+            for text in ('Great view of the lagoon', 'Great host'):
+                clear_stream(cout)
+                cons.onecmd('create Review')
+                review_ids.append(cout.getvalue().strip())
+                cons.onecmd('update Review {} text "{}"'.format(
+                    review_ids[-1], text
+                ))
+            clear_stream(cout)
+            cons.onecmd(cons.precmd('Review.search("lagoon view")'))
+            self.assertIn(
+                '[Review] ({})'.format(review_ids[0]), cout.getvalue()
+            )
+            self.assertNotIn(review_ids[1], cout.getvalue())
+            clear_stream(cout)
+            cons.onecmd('search Review great host')
+            self.assertLess(
+                cout.getvalue().index(review_ids[1]),
+                cout.getvalue().index(review_ids[0])
+            )
+            clear_stream(cout)
+            cons.onecmd('search User great')
+            self.assertEqual(cout.getvalue(), '[]\n')
+            clear_stream(cout)
+            cons.onecmd('search Review')
+            self.assertEqual(cout.getvalue(), '** search text missing **\n')
+            clear_stream(cout)
+            cons.onecmd('search Spaceship great')
+            self.assertEqual(cout.getvalue(), "** class doesn't exist **\n")
+            clear_stream(cout)
+            cons.onecmd('search')
+            self.assertEqual(cout.getvalue(), '** class name missing **\n')
+        delete_file(storage.text_index_path)
+
+    def test_import(self):
+        """Tests the import command.
+        """
+        write_text_file('users.csv', 'email,first_name\na@b.c,Chris\n,Ada\n')
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            n = storage.count('User')
+            cons.onecmd('import User users.csv')
+            self.assertRegex(
+                cout.getvalue(),
+                r'^2 objects imported in [\d.]+s \(\d+ rows/s\)\n$'
+            )
+            self.assertEqual(storage.count('User'), n + 2)
+            self.assertEqual(
+                len(storage.related('User', 'first_name', 'Ada')), 1
+            )
+            write_text_file('users.csv', 'id,created_at\n1,yesterday\n')
+            for line, output in (
+                ('import User users.csv',
+                 '** line 2: Invalid isoformat string: \'yesterday\' **\n'),
+                ('import User users.txt', "** file doesn't exist **\n"),
+                ('import User', '** file path missing **\n'),
+                ('import Spaceship users.csv', "** class doesn't exist **\n"),
+                ('import', '** class name missing **\n'),
+            ):
+                clear_stream(cout)
+                cons.onecmd(line)
+                self.assertEqual(cout.getvalue(), output)
+            self.assertEqual(storage.count('User'), n + 2)
+        delete_file('users.csv')
+
+    def test_aggregate(self):
+        """Tests the aggregate command.
+        """
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            cons.onecmd('create Amenity')
+            amenity_id = cout.getvalue().strip()
+            cons.onecmd('update Amenity {} name "Pool"'.format(amenity_id))
+            n = storage.count('Amenity')
+            clear_stream(cout)
+            cons.onecmd('aggregate Amenity count')
+            self.assertEqual(cout.getvalue(), "[{{'count': {}}}]\n".format(n))
+            clear_stream(cout)
+            cons.onecmd(cons.precmd(
+                'Amenity.aggregate("count", "max(rank)", "--by", "name", '
+                '"--jsonl")'
+            ))
+            self.assertIn(
+                '{"name": "Pool", "count": ',
+                cout.getvalue().splitlines()[-1]
+            )
+            for line, output in (
+                ('aggregate Amenity median(rank)',
+                 '** Invalid aggregate: median(rank) **\n'),
+                ('aggregate Amenity count --per name',
+                 '*** Unknown syntax: Amenity count --per name\n'),
+                ('aggregate Amenity', '** aggregate missing **\n'),
+                ('aggregate Spaceship count', "** class doesn't exist **\n"),
+                ('aggregate', '** class name missing **\n'),
+            ):
+                clear_stream(cout)
+                cons.onecmd(line)
+                self.assertEqual(cout.getvalue(), output)
+
+    def test_export(self):
+        """Tests the export command.
+        """
+        with patch('sys.stdout', new=StringIO()) as cout:
+            cons = HBNBCommand()
+            cons.onecmd('create User')
+            user_id = cout.getvalue().strip()
+            cons.onecmd('update User {} first_name "Hedy"'.format(user_id))
+            n = sum(
+                1 for record in storage.records('User')
+                if record.get('first_name', None) == 'Hedy'
+            )
+            clear_stream(cout)
+            cons.onecmd(
+                'export User users.jsonl --columns id,first_name '
+                '--where "first_name==Hedy"'
+            )
+            self.assertRegex(
+                cout.getvalue(),
+                r'^{} objects exported in [\d.]+s \(\d+ rows/s\)\n$'.format(n)
+            )
+            with open('users.jsonl', mode='r') as file:
+                rows = [json.loads(line) for line in file]
+            self.assertIn({'id': user_id, 'first_name': 'Hedy'}, rows)
+            clear_stream(cout)
+            cons.onecmd(cons.precmd('User.export("users.columnar")'))
+            self.assertRegex(cout.getvalue(), r'^\d+ objects exported in ')
+            for line, output in (
+                ('export User users.txt',
+                 '** Unsupported file format: .txt **\n'),
+                ('export User users.csv --format xml',
+                 '** Unsupported file format: xml **\n'),
+                ('export User users.csv --columns "a b"',
+                 '*** Unknown syntax: User users.csv --columns "a b"\n'),
+                ('export User', '** file path missing **\n'),
+                ('export Spaceship users.csv', "** class doesn't exist **\n"),
+                ('export', '** class name missing **\n'),
+            ):
+                clear_stream(cout)
+                cons.onecmd(line)
+                self.assertEqual(cout.getvalue(), output)
+        delete_file('users.jsonl')
+        delete_file('users.columnar')
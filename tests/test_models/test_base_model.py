@@ -6,7 +6,7 @@ import unittest
 from datetime import datetime
 from time import sleep
 
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Model
 from tests import write_text_file
 
 
@@ -231,6 +231,67 @@ class TestBaseModel(unittest.TestCase):
         with self.assertRaises(TypeError):
             BaseModel().to_dict(45)
 
+    def test_changed(self):
+        """Tests the change tracking of the BaseModel class.
+        """
+        mdl = BaseModel()
+        self.assertTrue(mdl._is_changed())
+        mdl._mark_persisted()
+        self.assertFalse(mdl._is_changed())
+        mdl.name = 'Chris'
+        self.assertTrue(mdl._is_changed())
+        mdl._mark_persisted()
+        del mdl.name
+        self.assertTrue(mdl._is_changed())
+        mdl._mark_persisted()
+        mdl.save()
+        self.assertFalse(mdl._is_changed())
+        self.assertNotIn('_BaseModel__state', mdl.__dict__)
+        self.assertNotIn('_BaseModel__state', mdl.to_dict())
+
+    def test_cache(self):
+        """Tests that the cached representations of an instance follow
+        the changes to its attributes.
+        """
+        mdl = BaseModel()
+        self.assertIs(str(mdl), str(mdl))
+        record = mdl.to_dict()
+        record['name'] = 'Changed'
+        self.assertNotIn('name', mdl.to_dict())
+        mdl.name = 'Chris'
+        self.assertIn("'name': 'Chris'", str(mdl))
+        self.assertEqual(mdl.to_dict()['name'], 'Chris')
+        mdl._mark_persisted()
+        setattr(mdl, 'name', 'Akpanoko')
+        self.assertTrue(mdl._is_changed())
+        self.assertIn("'name': 'Akpanoko'", str(mdl))
+        self.assertEqual(mdl.to_dict()['name'], 'Akpanoko')
+        del mdl.name
+        self.assertNotIn('name', str(mdl))
+        self.assertNotIn('name', mdl.to_dict())
+
+    def test_attributes(self):
+        """Tests the attributes of the instances of a model class that
+        keeps them in slots.
+        """
+        class SlottedModel(Model):
+            """Represents a model that keeps its attributes in slots.
+            """
+            __slots__ = ('id', 'name', '_cache')
+
+        class MixedModel(SlottedModel):
+            """Represents a model that keeps its attributes in slots and
+            in a dictionary.
+            """
+
+        mdl = SlottedModel(id='5')
+        self.assertEqual(mdl._attributes(), {'id': '5'})
+        mdl.name = 'Chris'
+        mdl._cache = 1
+        self.assertEqual(mdl._attributes(), {'id': '5', 'name': 'Chris'})
+        mdl = MixedModel(id='6', age=13)
+        self.assertEqual(mdl._attributes(), {'id': '6', 'age': 13})
+
     def tearDown(self):
         """Deconstructs this test class.
         """
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""A unit test module for the compact representation of the models.
+"""
+import os
+import unittest
+from datetime import datetime
+
+from models.base_model import BaseModel
+from models.compact import CompactModel, compact_class, schema_defaults
+from models.place import Place
+from models.user import User
+
+
+class TestCompactModel(unittest.TestCase):
+    """Represents the test class for the compact model classes.
+    """
+
+    def test_compact_class(self):
+        """Tests the creation of compact model classes.
+        """
+        cls = compact_class(Place)
+        self.assertIs(compact_class(Place), cls)
+        self.assertIs(compact_class(cls), cls)
+        self.assertEqual(cls.__name__, 'Place')
+        self.assertTrue(issubclass(cls, Place))
+        self.assertTrue(issubclass(cls, BaseModel))
+        self.assertTrue(issubclass(cls, CompactModel))
+        self.assertFalse(issubclass(cls, User))
+        self.assertFalse(issubclass(Place, cls))
+        self.assertIsInstance(cls(id='1'), Place)
+        self.assertNotIsInstance(Place(id='1'), cls)
+        self.assertIn('price_by_night', cls.compact_fields)
+        self.assertIn('amenity_ids', cls.compact_fields)
+        self.assertEqual(
+            cls.compact_fields[:3],
+            ('id', 'created_at', 'updated_at')
+        )
+        self.assertEqual(compact_class(BaseModel).compact_fields[3:], ())
+
+    def test_attributes(self):
+        """Tests the attributes of compact model instances.
+        """
+        cls = compact_class(User)
+        mdl = cls()
+        self.assertIsInstance(mdl, User)
+        self.assertIsInstance(mdl.id, str)
+        self.assertIsInstance(mdl.created_at, datetime)
+        self.assertEqual(mdl.first_name, '')
+        self.assertFalse(hasattr(mdl, '__dict__'))
+        mdl.first_name = 'Chris'
+        mdl.age = 13
+        self.assertEqual(mdl.first_name, 'Chris')
+        self.assertEqual(mdl.age, 13)
+        self.assertFalse(hasattr(mdl, '__dict__'))
+        del mdl.age
+        self.assertFalse(hasattr(mdl, 'age'))
+        with self.assertRaises(AttributeError):
+            mdl.age
+        self.assertFalse(hasattr(cls(foo=45), 'id'))
+        self.assertEqual(cls(email='a@b.c').email, 'a@b.c')
+
+    def test_schema_defaults(self):
+        """Tests that the defaults of the attributes are read from the
+        compact classes, whose slots hide them.
+        """
+        cls = compact_class(Place)
+        self.assertEqual(schema_defaults(cls), schema_defaults(Place))
+        self.assertEqual(schema_defaults(cls)['price_by_night'], 0)
+        self.assertEqual(schema_defaults(cls)['amenity_ids'], [])
+        self.assertNotIn('reviews', schema_defaults(cls))
+        self.assertIsInstance(cls.reviews, property)
+        for place_cls in (Place, cls):
+            mdl = place_cls(id='1')
+            mdl.amenity_ids.append('a-1')
+            self.assertEqual(mdl.amenity_ids, ['a-1'])
+            self.assertEqual(place_cls(id='2').amenity_ids, [])
+        self.assertEqual(Place.amenity_ids, [])
+
+    def test_str_to_dict(self):
+        """Tests the __str__ and to_dict functions of compact model
+        instances against the regular ones.
+        """
+        datetime_now = datetime.today().isoformat()
+        kwargs = {
+            'id': 'p-34',
+            'created_at': datetime_now,
+            'updated_at': datetime_now,
+            'name': 'Zuba',
+            'price_by_night': 120,
+            'foo': [1, 2]
+        }
+        mdl = Place(**kwargs)
+        compact_mdl = compact_class(Place)(**kwargs)
+        self.assertEqual(str(compact_mdl), str(mdl))
+        self.assertDictEqual(compact_mdl.to_dict(), mdl.to_dict())
+        compact_mdl.name = 'Loft'
+        compact_mdl.bar = 'baz'
+        mdl.name = 'Loft'
+        mdl.bar = 'baz'
+        self.assertEqual(str(compact_mdl), str(mdl))
+        self.assertDictEqual(compact_mdl.to_dict(), mdl.to_dict())
+        del compact_mdl.bar
+        self.assertNotIn('bar', str(compact_mdl))
+        self.assertEqual(
+            str(compact_class(Place)(id='m-345')),
+            "[Place] (m-345) {'id': 'm-345'}"
+        )
+
+    def tearDown(self):
+        """Deconstructs this test class.
+        """
+        super().tearDown()
+        if os.path.isfile('file.json'):
+            os.unlink('file.json')
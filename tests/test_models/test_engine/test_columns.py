@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""A unit test module for the columns of attributes.
+"""
+import unittest
+
+from models.engine.columns import (
+    Column, ColumnTable, aggregate_records, dump_columns, load_columns,
+    parse_aggregate
+)
+from models.place import Place
+from tests import delete_file, write_text_file
+
+
+class TestColumns(unittest.TestCase):
+    """Represents the test class for the Column class and the columnar
+    files.
+    """
+
+    def tearDown(self):
+        """Removes the columnar file.
+        """
+        delete_file('places.columnar')
+
+    def test_append(self):
+        """Tests that a column changes its type to fit its values.
+        """
+        column = Column()
+        for value in (1, 2):
+            column.append(value)
+        self.assertEqual((column.type, column.values.typecode), ('int', 'q'))
+        column.append(2.5)
+        self.assertEqual((column.type, column.values.typecode), ('float', 'd'))
+        column.append('a')
+        column.append(True)
+        column.append(['a'])
+        column.append('a')
+        self.assertEqual(column.type, 'value')
+        self.assertEqual(list(column), [1, 2, 2.5, 'a', True, ['a'], 'a'])
+        self.assertEqual(column.dictionary, [1, 2, 2.5, 'a', True, ['a']])
+        self.assertEqual(column[6], 'a')
+        column.set(0, None)
+        column.remove(1)
+        self.assertEqual(list(column), [None, 'a', 2.5, 'a', True, ['a']])
+        column.remove(5)
+        self.assertEqual(len(column), 5)
+        column = Column()
+        column.append(2 ** 64)
+        self.assertEqual(list(column), [2 ** 64])
+
+    def test_extend(self):
+        """Tests adding the values of an empty column at once.
+        """
+        for values, column_type in (([1, 2], 'int'), ([1, 2.5], 'float'),
+                                    (['a', 'b', 'a'], 'value'),
+                                    ([1, None], 'value')):
+            column = Column()
+            column.extend(values)
+            self.assertEqual(column.type, column_type)
+            self.assertEqual(list(column), values)
+        column.extend(['a', 1])
+        column.append('a')
+        self.assertEqual(list(column), [1, None, 'a', 1, 'a'])
+        self.assertEqual(column.dictionary, [1, None, 'a'])
+        column = Column()
+        column.extend(['a', 'b'])
+        column.append('b')
+        self.assertEqual(column.encode()[0].tolist(), [0, 1, 1])
+        column = Column()
+        column.extend([3, 1, 3])
+        self.assertEqual(column.encode()[0].tolist(), [0, 1, 0])
+        self.assertEqual(column.encode()[1], [3, 1])
+
+    def test_table(self):
+        """Tests updating and aggregating the rows of a table.
+        """
+        table = ColumnTable(['a', 'b', 'c'])
+        table.add_column('city_id', ['x', 'y', 'x'])
+        table.add_column('max_guest', [1, 2, 3])
+        self.assertEqual(len(table), 3)
+        aggregates = [parse_aggregate(aggregate) for aggregate in (
+            'count', 'sum(max_guest)', 'avg( max_guest )', 'min(max_guest)',
+            'max(max_guest)'
+        )]
+        self.assertEqual(table.aggregate(aggregates, 'city_id'), [
+            {'city_id': 'x', 'count': 2, 'sum(max_guest)': 4,
+             'avg(max_guest)': 2.0, 'min(max_guest)': 1,
+             'max(max_guest)': 3},
+            {'city_id': 'y', 'count': 1, 'sum(max_guest)': 2,
+             'avg(max_guest)': 2.0, 'min(max_guest)': 2,
+             'max(max_guest)': 2},
+        ])
+        values = {'city_id': 'z', 'max_guest': 'many'}
+        table.update('b', values.get)
+        table.update('d', {'city_id': 'x', 'max_guest': 4.5}.get)
+        table.remove('a')
+        table.remove('e')
+        self.assertEqual(sorted(table.keys()), ['b', 'c', 'd'])
+        self.assertEqual(table.aggregate(aggregates[:3], 'city_id'), [
+            {'city_id': 'x', 'count': 2, 'sum(max_guest)': 7.5,
+             'avg(max_guest)': 3.75},
+            {'city_id': 'z', 'count': 1, 'sum(max_guest)': 0,
+             'avg(max_guest)': None},
+        ])
+        self.assertEqual(table.aggregate(aggregates[1:]), [
+            {'sum(max_guest)': 7.5, 'avg(max_guest)': 3.75,
+             'min(max_guest)': 3, 'max(max_guest)': 4.5},
+        ])
+        table.add_column('number_rooms', [2, 2, 1])
+        self.assertEqual(
+            table.aggregate([('count', None)], 'number_rooms'),
+            [{'number_rooms': 1, 'count': 1}, {'number_rooms': 2, 'count': 2}]
+        )
+        for aggregate in ('median(price)', 'count(id)', 'sum', 'sum(a b)',
+                          ('avg', None)):
+            with self.assertRaises(ValueError):
+                parse_aggregate(aggregate)
+
+    def test_aggregate_records(self):
+        """Tests aggregating some serialized records.
+        """
+        records = [
+            {'__class__': 'Place', 'id': '1', 'city_id': 'x'},
+            {'__class__': 'Place', 'id': '2', 'city_id': 'x',
+             'price_by_night': 30},
+            {'__class__': 'Place', 'id': '3', 'price_by_night': 15},
+        ]
+        self.assertEqual(
+            aggregate_records(records, Place, ['count', 'sum(price_by_night)'],
+                              'city_id'),
+            [{'city_id': '', 'count': 1, 'sum(price_by_night)': 15},
+             {'city_id': 'x', 'count': 2, 'sum(price_by_night)': 30}]
+        )
+        self.assertEqual(
+            aggregate_records([], Place, ['count', 'max(latitude)']),
+            [{'count': 0, 'max(latitude)': None}]
+        )
+
+    def test_dump(self):
+        """Tests writing and reading the columns of a file.
+        """
+        columns = {'id': Column(), 'max_guest': Column(), 'price': Column()}
+        for i in range(3):
+            columns['id'].append(str(i))
+            columns['max_guest'].append(i)
+            columns['price'].append(i / 2)
+        dump_columns('places.columnar', 'Place', columns)
+        cls_name, loaded = load_columns('places.columnar')
+        self.assertEqual(cls_name, 'Place')
+        self.assertEqual(list(loaded), ['id', 'max_guest', 'price'])
+        for name, column in columns.items():
+            self.assertEqual(loaded[name].type, column.type)
+            self.assertEqual(list(loaded[name]), list(column))
+        loaded['id'].append('0')
+        self.assertEqual(loaded['id'].values[-1], 0)
+        write_text_file('places.columnar', '{}')
+        with self.assertRaises(ValueError):
+            load_columns('places.columnar')
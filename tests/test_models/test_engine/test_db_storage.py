@@ -0,0 +1,288 @@
+#!/usr/bin/python3
+"""A unit test module for the SQLite storage.
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from models.city import City
+from models.engine.db_storage import DBStorage
+from models.place import Place
+from models.registry import ModelRegistry
+from models.review import Review
+from models.user import User
+
+
+class TestDBStorage(unittest.TestCase):
+    """Represents the test class for the DBStorage class.
+    """
+
+    def setUp(self):
+        """Initializes this test class.
+        """
+        super().setUp()
+        self.dir_path = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.dir_path, 'hbnb.db')
+
+    def test_save(self):
+        """Tests the new, save, and reload functions of the DBStorage
+        class.
+        """
+        store = DBStorage(self.db_path)
+        mdl = Place(id='5', name='Home', city_id='7', number_rooms=3)
+        store.new(mdl)
+        store.new(City(id='7', name='Oklahoma'))
+        self.assertIs(store.get(Place, '5'), mdl)
+        self.assertEqual(store.count(), 2)
+        store.save()
+        mdl.name = 'Cabin'
+        self.assertEqual(store.reload(), 2)
+        self.assertIsNot(store.get(Place, '5'), mdl)
+        self.assertEqual(store.get(Place, '5').name, 'Home')
+        self.assertEqual(store.get(Place, '5').number_rooms, 3)
+        self.assertEqual(
+            [mdl.id for mdl in store.related(Place, 'city_id', '7')],
+            ['5']
+        )
+        self.assertEqual(store.related(Place, 'name', 'Home'), [
+            store.get(Place, '5')
+        ])
+        self.assertEqual(store.related(Place, 'user_id', '7'), [])
+        self.assertEqual(
+            [record['city_id'] for record in store.records(Place)], ['7']
+        )
+        store.new(Place(id='6', number_rooms=1))
+        store.new(Place(id='7', number_rooms=1.5, rating=2))
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered(Place, 'number_rooms', 1)],
+            ['6', '7', '5']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered(Place, 'number_rooms', 1, 2,
+                                             True)],
+            ['7', '6']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered(Place, 'rating')], ['7']
+        )
+        with self.assertRaises(ValueError):
+            list(store.ordered(Place, 'rating) OR (1'))
+        mdl = store.get(Place, '6')
+        mdl.latitude = 10.5
+        mdl.longitude = 179.9
+        store.mark_changed(mdl)
+        store.new(Place(id='8', latitude=10.5, longitude=-179.9))
+        self.assertEqual(
+            [mdl.id for mdl in store.within(Place, 10, 179, 11, -179)],
+            ['6', '8']
+        )
+        self.assertEqual(
+            [mdl.id for _, mdl in store.near(Place, 10.5, -179.95, 50)],
+            ['8', '6']
+        )
+        self.assertEqual(store.near(City, 10.5, -179.95, 50), [])
+        store.new(User(id='9'))
+        store.reload()
+        self.assertIsNone(store.get(User, '9'))
+        store.close()
+        with sqlite3.connect(self.db_path) as connection:
+            row = connection.execute(
+                'SELECT city_id FROM Place WHERE id = ?', ('5',)
+            ).fetchone()
+            self.assertEqual(row, ('7',))
+            indexes = connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                "AND tbl_name = 'Place'"
+            ).fetchall()
+            self.assertIn(('ix_Place_city_id',), indexes)
+
+    def test_compact_ordered(self):
+        """Tests ordering the objects of the compact model classes, whose
+        slots hide the defaults of the attributes.
+        """
+        store = DBStorage(self.db_path)
+        store.model_classes = ModelRegistry(compact=True)
+        cls = store.model_classes['Place']
+        store.new(cls(id='0', price_by_night=5, city_id='7'))
+        store.new(cls(id='1'))
+        store.save()
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered(Place, 'price_by_night')],
+            ['1', '0']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered(Place, 'price_by_night',
+                                             high=0)],
+            ['1']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in store.related(Place, 'city_id', '7')], ['0']
+        )
+        store.close()
+
+    def test_search(self):
+        """Tests that the full-text tables follow the changes to the
+        objects.
+        """
+        store = DBStorage(self.db_path)
+        store.new(Place(id='0', name='Loft', description='Great view'))
+        store.new(Place(id='1', name='Great loft'))
+        store.new(Review(id='2', text='Great host, great view'))
+        store.save()
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(Place, 'great view')],
+            ['0', '1']
+        )
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(None, 'great', 1)], ['2']
+        )
+        self.assertEqual(store.search(User, 'great'), [])
+        self.assertEqual(store.search(Place, 'the'), [])
+        self.assertEqual(
+            store.aggregate(Place, ['count'], 'name'),
+            [{'name': 'Great loft', 'count': 1}, {'name': 'Loft', 'count': 1}]
+        )
+        mdl = store.get(Place, '1')
+        mdl.name = 'Small flat'
+        store.delete(store.get(Review, '2'))
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(None, 'great')], ['0']
+        )
+        store.save()
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(Place, 'flat')], ['1']
+        )
+        store.close()
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute('DROP TABLE Place_text')
+        store = DBStorage(self.db_path)
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(Place, 'flat')], ['1']
+        )
+        store.close()
+
+    def test_import_file(self):
+        """Tests creating objects from the rows of a file, which are
+        committed at once.
+        """
+        file_path = os.path.join(self.dir_path, 'places.csv')
+        with open(file_path, mode='w') as file:
+            file.write('id,name,max_guest\n1,Loft,2\n2,Cabin,x\n')
+        store = DBStorage(self.db_path)
+        with self.assertRaises(ValueError):
+            store.import_file(Place, file_path)
+        self.assertEqual(store.count(Place), 0)
+        with open(file_path, mode='w') as file:
+            file.write('id,name,max_guest\n1,Loft,2\n2,Cabin,4\n')
+        self.assertEqual(store.import_file(Place, file_path), 2)
+        store.close()
+        store = DBStorage(self.db_path)
+        self.assertEqual(store.get(Place, '2').max_guest, 4)
+        self.assertEqual(store.export_file(
+            Place, file_path, attrs=['name'], predicates=['max_guest>2']
+        ), 1)
+        with open(file_path, mode='r') as file:
+            self.assertEqual(file.read(), 'name\nCabin\n')
+        store.close()
+
+    def test_update(self):
+        """Tests that changed objects are written on save.
+        """
+        store = DBStorage(self.db_path)
+        mdl = User(id='5', first_name='Chris')
+        store.new(mdl)
+        store.new(User(id='6'))
+        store.save()
+        mdl.first_name = 'Akpanoko'
+        store.save()
+        new_store = DBStorage(self.db_path)
+        self.assertEqual(new_store.get(User, '5').first_name, 'Akpanoko')
+        # an updated object keeps its place
+        self.assertEqual(
+            [record['id'] for record in new_store.records(User)], ['5', '6']
+        )
+        store.delete(store.get(User, '6'))
+        store.save()
+        store.delete(mdl)
+        self.assertIsNone(store.get(User, '5'))
+        self.assertEqual(new_store.count(User), 1)
+        store.save()
+        self.assertEqual(new_store.count(User), 0)
+        store.close()
+        new_store.close()
+
+    def test_all(self):
+        """Tests the all and strings functions of the DBStorage class.
+        """
+        store = DBStorage(self.db_path)
+        mdl = User(id='5', first_name='Chris')
+        mdl1 = City(id='7', name='Oklahoma')
+        store.new(mdl)
+        store.new(mdl1)
+        objs = store.all()
+        self.assertEqual(len(objs), 2)
+        self.assertEqual(sorted(objs.keys()), ['City.7', 'User.5'])
+        self.assertIs(objs['User.5'], mdl)
+        self.assertNotIn('User.7', objs)
+        mdl.last_name = 'Ebi'
+        self.assertEqual(list(store.strings(User)), [str(mdl)])
+        self.assertEqual(len(list(store.strings())), 2)
+        store.close()
+
+    def test_batch(self):
+        """Tests the batch function of the DBStorage class.
+        """
+        store = DBStorage(self.db_path)
+        mdl = User(id='5', first_name='Chris')
+        store.new(mdl)
+        store.save()
+        with self.assertRaises(ValueError):
+            with store.batch():
+                mdl.first_name = 'Akpanoko'
+                store.new(City(id='7'))
+                store.save()
+                raise ValueError()
+        self.assertEqual(mdl.first_name, 'Chris')
+        self.assertIsNone(store.get(City, '7'))
+        with store.batch():
+            store.new(City(id='7'))
+            store.save()
+            self.assertEqual(DBStorage(self.db_path).count(City), 0)
+        self.assertEqual(DBStorage(self.db_path).count(City), 1)
+        store.close()
+
+    def test_unsaved(self):
+        """Tests that the DBStorage class doesn't lock the database until
+        the changes are saved.
+        """
+        store = DBStorage(self.db_path)
+        mdl = City(id='7', name='Oklahoma')
+        store.new(mdl)
+        store.save()
+        store.new(City(id='8'))
+        store.delete(mdl)
+        self.assertEqual(list(store.keys()), ['City.8'])
+        self.assertEqual(store.count(City), 1)
+        with sqlite3.connect(self.db_path, timeout=0) as connection:
+            connection.execute(
+                'UPDATE City SET attributes = attributes WHERE id = ?', ('7',)
+            )
+        self.assertEqual(DBStorage(self.db_path).count(City), 1)
+        with store.batch():
+            store.new(City(id='9'))
+        self.assertEqual(store.count(City), 2)
+        with sqlite3.connect(self.db_path, timeout=0) as connection:
+            rows = connection.execute('SELECT id FROM City').fetchall()
+            self.assertEqual(rows, [('7',)])
+        store.save()
+        self.assertEqual(DBStorage(self.db_path).count(City), 2)
+        self.assertIsNone(DBStorage(self.db_path).get(City, '7'))
+        store.close()
+
+    def tearDown(self):
+        """Deconstructs this test class.
+        """
+        super().tearDown()
+        shutil.rmtree(self.dir_path)
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+"""A unit test module for the deferred storage.
+"""
+import unittest
+
+from models.engine.deferred_storage import DeferredStorage
+from models.engine.file_storage import FileStorage
+
+
+class TestDeferredStorage(unittest.TestCase):
+    """Represents the test class for the DeferredStorage class.
+    """
+
+    def test_engine(self):
+        """Tests that the engine is created when it is first used.
+        """
+        engines = []
+
+        def create_storage():
+            """Creates a storage engine and records it.
+            """
+            engines.append(FileStorage())
+            return engines[-1]
+
+        store = DeferredStorage(create_storage)
+        self.assertIn('User', store.model_classes.keys())
+        self.assertFalse(store.is_loaded)
+        self.assertEqual(engines, [])
+        store.close()
+        self.assertFalse(store.is_loaded)
+        store.lazy_mode = True
+        self.assertTrue(store.is_loaded)
+        self.assertTrue(engines[0].lazy_mode)
+        self.assertIs(store.all(), engines[0].all())
+        self.assertIs(store.engine, engines[0])
+        self.assertEqual(len(engines), 1)
+        with self.assertRaises(AttributeError):
+            store.nothing
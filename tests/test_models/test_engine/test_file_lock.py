@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+"""A unit test module for the lock of the storage file.
+"""
+import os
+import threading
+import unittest
+
+from models.engine.file_lock import FileLock
+from tests import delete_file, read_text_file, write_text_file
+
+
+class TestFileLock(unittest.TestCase):
+    """Represents the test class for the FileLock class.
+    """
+
+    def tearDown(self):
+        """Removes the lock file.
+        """
+        delete_file('file.json.lock')
+
+    def test_update(self):
+        """Tests that the generation grows by two with each write and is
+        odd while the file is being written.
+        """
+        lock = FileLock('file.json.lock')
+        self.assertEqual(lock.generation(), 0)
+        with lock.update() as (generation, new_generation):
+            self.assertEqual(generation, 0)
+            self.assertEqual(new_generation % 2, 0)
+            self.assertGreater(new_generation, 0)
+            self.assertEqual(lock.generation(), new_generation - 1)
+        self.assertEqual(lock.generation(), new_generation)
+        self.assertEqual(
+            read_text_file('file.json.lock'), str(new_generation).zfill(20)
+        )
+        with self.assertRaises(ValueError):
+            with lock.update():
+                raise ValueError()
+        self.assertEqual(lock.generation(), new_generation + 2)
+        # an interrupted write
+        write_text_file('file.json.lock', '5'.zfill(20))
+        with lock.update() as (generation, new_generation):
+            self.assertEqual((generation, new_generation), (5, 8))
+        write_text_file('file.json.lock', 'garbage')
+        self.assertEqual(lock.generation(), 0)
+
+    def test_read(self):
+        """Tests that a read is attempted again if the file is written
+        in the meantime.
+        """
+        lock = FileLock('file.json.lock')
+        reads = []
+
+        def read_file():
+            """Reads the file, which is written during the first read.
+            """
+            reads.append(lock.generation())
+            if len(reads) == 1:
+                with lock.update():
+                    pass
+            return len(reads)
+
+        self.assertEqual(lock.read(read_file), (lock.generation(), 2))
+        self.assertEqual(reads, [0, lock.generation()])
+
+    def test_hold(self):
+        """Tests that the writers of different threads exclude each other
+        and that the readers wait for them once the attempts run out.
+        """
+        lock = FileLock('file.json.lock')
+        events = []
+
+        def write_file():
+            """Writes the file while holding the lock.
+            """
+            with lock.update() as generations:
+                events.append(generations)
+
+        with lock.update() as (_, generation):
+            writer = threading.Thread(target=write_file)
+            reader = threading.Thread(
+                target=lambda: events.append(lock.read(lambda: 'read')[1])
+            )
+            writer.start()
+            reader.start()
+            writer.join(0.2)
+            reader.join(0.2)
+            self.assertTrue(writer.is_alive())
+            self.assertTrue(reader.is_alive())
+            events.append('released')
+        writer.join()
+        reader.join()
+        self.assertEqual(events[0], 'released')
+        self.assertCountEqual(
+            events[1:], [(generation, generation + 2), 'read']
+        )
+
+    def test_remove(self):
+        """Tests that the lock file is only removed when no process holds
+        the lock, and that a new lock file doesn't repeat the generations
+        of the removed one.
+        """
+        lock = FileLock('file.json.lock')
+        lock.remove()
+        with lock.update() as (_, generation):
+            lock.remove()
+            self.assertTrue(os.path.isfile('file.json.lock'))
+        lock.remove()
+        self.assertFalse(os.path.isfile('file.json.lock'))
+        self.assertEqual(lock.generation(), 0)
+        with lock.update() as (_, new_generation):
+            pass
+        self.assertNotEqual(new_generation, generation)
+
+    def test_hold_removed(self):
+        """Tests that a lock awaited while the lock file is removed is
+        held on the new lock file.
+        """
+        lock = FileLock('file.json.lock')
+        held = []
+
+        def hold_lock():
+            """Records the lock file that the lock is held on.
+            """
+            with lock.hold() as fd:
+                held.append(os.fstat(fd).st_ino)
+
+        with lock.hold():
+            waiter = threading.Thread(target=hold_lock)
+            waiter.start()
+            waiter.join(0.2)
+            os.unlink('file.json.lock')
+        waiter.join()
+        self.assertEqual(held, [os.stat('file.json.lock').st_ino])
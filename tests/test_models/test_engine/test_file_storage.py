@@ -1,19 +1,41 @@
 #!/usr/bin/python3
 """A unit test module for the file storage.
 """
+import errno
+import json
+import multiprocessing
 import os
+import time
 import unittest
+from datetime import datetime
+from unittest.mock import patch
 
 from models import storage
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
 from models.engine.file_storage import FileStorage
+from models.engine.serializers import BinarySerializer, JSONSerializer
+from models.engine.text_index import TextIndex
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
-from tests import write_text_file, reset_store
+from tests import read_text_file, reset_store, write_text_file
+
+
+def add_users(prefix, n):
+    """Stores users one save at a time in a process of its own.
+
+    Args:
+        prefix (str): The prefix of the ids of the users.
+        n (int): The number of users.
+    """
+    store = FileStorage()
+    store.reload()
+    for i in range(n):
+        store.new(User(id='{}-{}'.format(prefix, i)))
+        store.save()
 
 
 class TestFileStorage(unittest.TestCase):
@@ -98,6 +120,35 @@ class TestFileStorage(unittest.TestCase):
         with self.assertRaises(TypeError):
             store.save(None)
 
+    def test_reload_relations(self):
+        """Tests reloading records whose attributes were saved under the
+        names of the read-only relationships of their classes.
+        """
+        write_text_file('file.json', json.dumps({
+            'User.5': {
+                '__class__': 'User', 'id': '5', 'first_name': 'Chris',
+                'places': ['7'], 'reviews': []
+            },
+            'City.7': {'__class__': 'City', 'id': '7', 'places': 'x'},
+            'Place.9': {
+                '__class__': 'Place', 'id': '9', 'user_id': '5',
+                'reviews': ['1']
+            }
+        }))
+        for lazy_mode in (False, True):
+            store = FileStorage()
+            store.lazy_mode = lazy_mode
+            self.assertEqual(store.reload(), 3)
+            mdl = store.get(User, '5')
+            self.assertEqual(mdl.first_name, 'Chris')
+            self.assertNotIn('places', mdl.to_dict())
+            self.assertNotIn('places', store.get(City, '7').to_dict())
+            self.assertNotIn('reviews', store.get(Place, '9').to_dict())
+        mdl.first_name = 'Ebi'
+        store.mark_changed(mdl)
+        store.save()
+        self.assertNotIn('"places": ["7"]', read_text_file('file.json'))
+
     def test_reload(self):
         """Tests the reload function of the FileStorage class.
         """
@@ -126,6 +177,11 @@ class TestFileStorage(unittest.TestCase):
         reset_store(new_store)
         new_store.reload()
         self.assertEqual(len(new_store.all()), 0)
+        # the objects were removed by another store, unless stored again
+        store.save()
+        self.assertEqual(len(store.all()), 0)
+        store.new(mdl)
+        store.new(mdl1)
         store.save()
         new_store.reload()
         self.assertEqual(len(new_store.all()), 2)
@@ -142,9 +198,626 @@ class TestFileStorage(unittest.TestCase):
         with self.assertRaises(TypeError):
             store.reload(None)
 
+    def test_get(self):
+        """Tests the get and count functions of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        mdl = User(id='5')
+        mdl1 = City(id='5', name='Oklahoma')
+        store.new(mdl)
+        store.new(mdl1)
+        self.assertIs(store.get(User, '5'), mdl)
+        self.assertIs(store.get('City', '5'), mdl1)
+        self.assertIsNone(store.get('Place', '5'))
+        self.assertIsNone(store.get(User, '7'))
+        self.assertEqual(store.count(), 2)
+        self.assertEqual(store.count(User), 1)
+        self.assertEqual(store.count('Review'), 0)
+        store.delete(mdl)
+        self.assertIsNone(store.get(User, '5'))
+        self.assertEqual(store.count(User), 0)
+        store.save()
+        new_store = FileStorage()
+        new_store.reload()
+        self.assertEqual(new_store.get(City, '5').name, 'Oklahoma')
+        self.assertEqual(new_store.count(City), 1)
+        with self.assertRaises(TypeError):
+            store.get(User)
+
+    def test_lazy(self):
+        """Tests the lazy mode of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        store.new(User(id='5', first_name='Chris'))
+        store.new(City(id='7', name='Oklahoma'))
+        store.save()
+        new_store = FileStorage()
+        new_store.lazy_mode = True
+        new_store.reload()
+        self.assertEqual(new_store.count(User), 1)
+        self.assertEqual(
+            sorted(new_store.strings()),
+            sorted(map(str, store.all().values()))
+        )
+        for value in dict.values(new_store.all()):
+            self.assertIs(type(value), dict)
+        mdl = new_store.get(User, '5')
+        self.assertIsInstance(mdl, User)
+        self.assertEqual(mdl.first_name, 'Chris')
+        self.assertIsInstance(new_store.all()['City.7'], City)
+        new_store.delete(mdl)
+        new_store.save()
+        store.reload()
+        self.assertEqual(list(store.all().keys()), ['City.7'])
+
+    def test_save_changed(self):
+        """Tests that the FileStorage class only serializes changed
+        objects again.
+        """
+        store = FileStorage()
+        reset_store(store)
+        mdl = User(id='5', first_name='Chris')
+        mdl1 = City(id='7', name='Oklahoma')
+        store.new(mdl)
+        store.new(mdl1)
+        store.save()
+        self.assertFalse(mdl._is_changed())
+        self.assertFalse(mdl1._is_changed())
+        snapshot = read_text_file('file.json')
+        mdl.first_name = 'Akpanoko'
+        self.assertTrue(mdl._is_changed())
+        store.save()
+        self.assertFalse(mdl._is_changed())
+        self.assertEqual(
+            read_text_file('file.json'),
+            snapshot.replace('Chris', 'Akpanoko')
+        )
+        new_store = FileStorage()
+        new_store.reload()
+        self.assertFalse(new_store.get(User, '5')._is_changed())
+        self.assertEqual(new_store.get(User, '5').first_name, 'Akpanoko')
+
+    def test_binary(self):
+        """Tests the FileStorage class with the binary format.
+        """
+        store = FileStorage()
+        reset_store(store)
+        store.serializer = BinarySerializer()
+        mdl = User(id='5', first_name='Chris')
+        mdl.created_at = mdl.updated_at = datetime.today()
+        store.new(mdl)
+        store.save()
+        with open('file.json', mode='rb') as file:
+            self.assertEqual(file.read(1), b'\x80')
+        new_store = FileStorage()
+        new_store.serializer = BinarySerializer()
+        for lazy_mode in (False, True):
+            new_store.lazy_mode = lazy_mode
+            self.assertEqual(new_store.reload(), 1)
+            self.assertEqual(list(new_store.strings()), [str(mdl)])
+            self.assertEqual(
+                new_store.get(User, '5').to_dict(),
+                mdl.to_dict()
+            )
+
+    def test_merge(self):
+        """Tests that the changes other stores made to the storage file
+        are merged before saving instead of overwritten.
+        """
+        store = FileStorage()
+        reset_store(store)
+        other_store = FileStorage()
+        other_store.reload()
+        mdl = User(id='5', first_name='Chris')
+        store.new(mdl)
+        store.save()
+        other_store.new(City(id='7', name='Oklahoma'))
+        other_store.save()
+        self.assertEqual(other_store.get(User, '5').first_name, 'Chris')
+        mdl.first_name = 'Akpanoko'
+        store.save()
+        self.assertEqual(store.get(City, '7').name, 'Oklahoma')
+        self.assertEqual(store.count(City), 1)
+        # removals
+        other_store.delete(other_store.get(City, '7'))
+        other_store.save()
+        store.new(State(id='9', name='Texas'))
+        store.save()
+        self.assertIsNone(store.get(City, '7'))
+        self.assertNotIn('Oklahoma', read_text_file('file.json'))
+        # the objects changed in a store keep their changes
+        other_store.get(User, '5').first_name = 'Ada'
+        other_store.save()
+        self.assertEqual(other_store.get(State, '9').name, 'Texas')
+        self.assertEqual(other_store.get(User, '5').first_name, 'Ada')
+        store.new(City(id='8', name='Tulsa'))
+        store.save()
+        self.assertIs(store.get(User, '5'), mdl)
+        self.assertEqual(mdl.first_name, 'Ada')
+        mdl.first_name = 'Grace'
+        other_store.get(State, '9').name = 'Utah'
+        other_store.save()
+        store.save()
+        self.assertEqual(store.get(State, '9').name, 'Utah')
+        new_store = FileStorage()
+        new_store.reload()
+        self.assertEqual(new_store.get(User, '5').first_name, 'Grace')
+        self.assertEqual(new_store.get(State, '9').name, 'Utah')
+        self.assertEqual(new_store.count(), 3)
+
+    def test_merge_journal(self):
+        """Tests that only the new entries of the journal are merged
+        before saving in the journal mode.
+        """
+        store = FileStorage()
+        reset_store(store)
+        store.journal_mode = True
+        other_store = FileStorage()
+        other_store.reload()
+        other_store.journal_mode = True
+        store.new(User(id='5', first_name='Chris'))
+        store.save()
+        other_store.new(City(id='7', name='Oklahoma'))
+        other_store.save()
+        self.assertEqual(read_text_file('file.json'), '{}')
+        self.assertEqual(
+            len(read_text_file(store.journal_path).splitlines()), 2
+        )
+        self.assertEqual(other_store.get(User, '5').first_name, 'Chris')
+        other_store.delete(other_store.get(User, '5'))
+        other_store.save()
+        store.new(State(id='9', name='Texas'))
+        store.save()
+        self.assertIsNone(store.get(User, '5'))
+        self.assertEqual(store.get(City, '7').name, 'Oklahoma')
+        # compaction
+        store.journal_limit = 0
+        store.new(User(id='6'))
+        store.save()
+        store.new(User(id='8'))
+        store.save()
+        other_store.new(Place(id='10'))
+        other_store.save()
+        self.assertEqual(other_store.count(), 5)
+        store.journal_mode = False
+        store.save()
+        self.assertFalse(os.path.isfile(store.journal_path))
+        new_store = FileStorage()
+        self.assertEqual(new_store.reload(), 5)
+
+    def test_processes(self):
+        """Tests that the saves of different processes sharing the
+        storage file aren't lost.
+        """
+        store = FileStorage()
+        reset_store(store)
+        context = multiprocessing.get_context('spawn')
+        processes = [
+            context.Process(target=add_users, args=(str(i), 10))
+            for i in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        self.assertEqual(store.reload(), 40)
+
+    def test_journal(self):
+        """Tests the journal mode of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        mdl = User(id='5')
+        mdl1 = City(id='7', name='Oklahoma')
+        store.new(mdl)
+        store.new(mdl1)
+        store.save()
+        store.journal_mode = True
+        self.assertFalse(os.path.isfile(store.journal_path))
+        snapshot = read_text_file('file.json')
+        mdl1.name = 'Texas'
+        store.mark_changed(mdl1)
+        store.delete(mdl)
+        store.save()
+        self.assertEqual(read_text_file('file.json'), snapshot)
+        self.assertEqual(
+            len(read_text_file(store.journal_path).splitlines()), 2
+        )
+        new_store = FileStorage()
+        new_store.reload()
+        self.assertNotIn('User.5', new_store.all())
+        self.assertEqual(new_store.all()['City.7'].name, 'Texas')
+        # compaction
+        store.journal_limit = 0
+        mdl1.name = 'Utah'
+        store.mark_changed(mdl1)
+        store.save()
+        store.reload()
+        self.assertFalse(os.path.isfile(store.journal_path))
+        self.assertIn('Utah', read_text_file('file.json'))
+        self.assertEqual(store.all()['City.7'].name, 'Utah')
+        # a full save discards the journal
+        store.journal_limit = 4096
+        store.delete(store.all()['City.7'])
+        store.save()
+        self.assertTrue(os.path.isfile(store.journal_path))
+        store.journal_mode = False
+        store.save()
+        self.assertFalse(os.path.isfile(store.journal_path))
+        self.assertEqual(read_text_file('file.json'), '{}')
+        with self.assertRaises(TypeError):
+            store.delete(mdl, None)
+
+    def test_batch(self):
+        """Tests the batch function of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        mdl = User(id='5', first_name='Chris')
+        mdl1 = City(id='7', name='Oklahoma')
+        store.new(mdl)
+        store.new(mdl1)
+        store.save()
+        snapshot = read_text_file('file.json')
+        with store.batch():
+            mdl.first_name = 'Akpanoko'
+            store.mark_changed(mdl)
+            store.save()
+            with store.batch():
+                store.new(Place(id='9'))
+                store.save()
+            self.assertEqual(read_text_file('file.json'), snapshot)
+        self.assertEqual(store.count(), 3)
+        new_store = FileStorage()
+        new_store.reload()
+        self.assertEqual(new_store.get(User, '5').first_name, 'Akpanoko')
+        self.assertIsNotNone(new_store.get(Place, '9'))
+        # rollback
+        snapshot = read_text_file('file.json')
+        with self.assertRaises(ValueError):
+            with store.batch():
+                mdl.first_name = 'Chris'
+                mdl.nickname = 'Ebi'
+                store.delete(mdl1)
+                store.new(Review(id='11'))
+                store.save()
+                raise ValueError()
+        self.assertEqual(read_text_file('file.json'), snapshot)
+        self.assertEqual(mdl.first_name, 'Akpanoko')
+        self.assertFalse(hasattr(mdl, 'nickname'))
+        self.assertFalse(mdl._is_changed())
+        self.assertIs(store.get(City, '7'), mdl1)
+        self.assertIsNone(store.get(Review, '11'))
+        self.assertEqual(store.count(), 3)
+        store.save()
+        self.assertEqual(read_text_file('file.json'), snapshot)
+
+    def test_related(self):
+        """Tests the related function of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        place = Place(id='5', city_id='7')
+        review = Review(id='9', place_id='5', user_id='2')
+        review1 = Review(id='10', place_id='5', user_id='3')
+        store.new(place)
+        store.new(review)
+        store.new(review1)
+        self.assertEqual(store.related(Review, 'place_id', '5'), [
+            review, review1
+        ])
+        self.assertEqual(store.related('Review', 'user_id', '3'), [review1])
+        self.assertEqual(store.related('Place', 'city_id', '7'), [place])
+        self.assertEqual(store.related('Place', 'name', ''), [place])
+        self.assertEqual(store.related('Review', 'text', 'Nice'), [])
+        review1.place_id = '6'
+        store.mark_changed(review1)
+        self.assertEqual(store.related(Review, 'place_id', '5'), [review])
+        self.assertEqual(store.related(Review, 'place_id', '6'), [review1])
+        store.delete(review)
+        self.assertEqual(store.related(Review, 'place_id', '5'), [])
+        store.save()
+        for lazy_mode in (False, True):
+            new_store = FileStorage()
+            new_store.lazy_mode = lazy_mode
+            new_store.reload()
+            self.assertEqual(
+                [r.id for r in new_store.related(Review, 'place_id', '6')],
+                ['10']
+            )
+
+    def test_ordered(self):
+        """Tests the ordered function of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        for i, price in enumerate((30, 10, 20)):
+            store.new(Place(id=str(i), price_by_night=price, rating=i))
+        store.new(Place(id='3'))
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered(Place, 'price_by_night')],
+            ['3', '1', '2', '0']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered('Place', 'price_by_night',
+                                             10, 20, True)],
+            ['2', '1']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered(Place, 'rating', 1)], ['1', '2']
+        )
+        mdl = store.get(Place, '0')
+        mdl.price_by_night = 5
+        store.mark_changed(mdl)
+        store.delete(store.get(Place, '1'))
+        store.new(Place(id='4', price_by_night=15))
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered(Place, 'price_by_night', 1)],
+            ['0', '4', '2']
+        )
+        store.save()
+        store.lazy_mode = True
+        store.reload()
+        self.assertEqual(
+            [mdl.id for mdl in store.ordered(Place, 'price_by_night', 1)],
+            ['0', '4', '2']
+        )
+
+    def test_near(self):
+        """Tests the within and near functions of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        store.new(Place(id='0', latitude=6.45, longitude=3.39))
+        store.new(Place(id='1', latitude=6.52, longitude=3.38))
+        store.new(Place(id='2', latitude=9.06, longitude=7.49))
+        store.new(Place(id='3', latitude='north', longitude=3.39))
+        store.new(User(id='4', latitude=6.45, longitude=3.39))
+        self.assertEqual(
+            [(round(d), mdl.id) for d, mdl in store.near(Place, 6.5, 3.4, 50)],
+            [(3, '1'), (6, '0')]
+        )
+        self.assertEqual(
+            [mdl.id for _, mdl in store.near('Place', 6.5, 3.4, 1000, 1)],
+            ['1']
+        )
+        self.assertEqual(store.near(User, 6.45, 3.39, 50), [])
+        self.assertEqual(
+            sorted(mdl.id for mdl in store.within(Place, 6, 3, 10, 8)),
+            ['0', '1', '2']
+        )
+        mdl = store.get(Place, '1')
+        mdl.latitude = 9.05
+        store.mark_changed(mdl)
+        store.delete(store.get(Place, '0'))
+        self.assertEqual(
+            [mdl.id for _, mdl in store.near(Place, 9, 7.5, 50)], ['2']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in store.within(Place, 6, 3, 10, 4)], ['1']
+        )
+        store.save()
+        store.lazy_mode = True
+        store.reload()
+        self.assertEqual(
+            [mdl.id for mdl in store.within(Place, 6, 3, 10, 4)], ['1']
+        )
+
+    def test_search(self):
+        """Tests the search function of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        store.new(Place(id='0', name='Loft', description='Great view'))
+        store.new(Place(id='1', name='Great loft'))
+        store.new(Review(id='2', text='Great host, great view'))
+        store.new(User(id='3', first_name='Great'))
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(Place, 'great view')],
+            ['0', '1']
+        )
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(None, 'great', 2)],
+            ['2', '1']
+        )
+        self.assertEqual(store.search(User, 'great'), [])
+        mdl = store.get(Place, '1')
+        mdl.name = 'Small flat'
+        store.mark_changed(mdl)
+        store.delete(store.get(Review, '2'))
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(None, 'great')], ['0']
+        )
+        store.save()
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search('Place', 'flat')], ['1']
+        )
+        self.assertTrue(os.path.isfile(store.text_index_path))
+        # only the changed documents are appended when the storage is saved
+        journal_path = TextIndex.journal_path(store.text_index_path)
+        self.assertEqual(len(read_text_file(journal_path).splitlines()), 1)
+        saved_index = TextIndex.load(store.text_index_path)
+        self.assertIsNotNone(saved_index.fingerprint)
+        self.assertEqual(
+            [key for _, key in saved_index.search('flat')], ['Place.1']
+        )
+        self.assertNotIn('Review.2', saved_index)
+        store.new(User(id='5'))
+        store.save()
+        self.assertEqual(len(read_text_file(journal_path).splitlines()), 1)
+        store.close()
+        self.assertFalse(os.path.isfile(journal_path))
+        saved_index = TextIndex.load(store.text_index_path)
+        self.assertEqual(
+            saved_index.fingerprint[0][1], os.path.getsize('file.json')
+        )
+        self.assertEqual(
+            [key for _, key in saved_index.search('flat')], ['Place.1']
+        )
+        store.lazy_mode = True
+        store.reload()
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(Place, 'loft flat')],
+            ['1', '0']
+        )
+        other = FileStorage()
+        other.reload()
+        other.new(Place(id='4', description='Lofty loft'))
+        other.save()
+        store.reload()
+        self.assertEqual(
+            [mdl.id for _, mdl in store.search(Place, 'loft')], ['4', '0']
+        )
+
+    def test_aggregate(self):
+        """Tests the aggregate function of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        for i in range(5):
+            store.new(Place(id=str(i), city_id='c{}'.format(i % 2),
+                            price_by_night=10 * i))
+        self.assertEqual(
+            store.aggregate(Place, ['count', 'avg(price_by_night)',
+                                    'max(price_by_night)'], 'city_id'),
+            [
+                {'city_id': 'c0', 'count': 3, 'avg(price_by_night)': 20.0,
+                 'max(price_by_night)': 40},
+                {'city_id': 'c1', 'count': 2, 'avg(price_by_night)': 20.0,
+                 'max(price_by_night)': 30},
+            ]
+        )
+        mdl = store.get(Place, '1')
+        mdl.city_id = 'c2'
+        mdl.price_by_night = 'free'
+        store.mark_changed(mdl)
+        store.delete(store.get(Place, '0'))
+        store.new(Place(id='5', city_id='c0', price_by_night=1.5))
+        self.assertEqual(
+            store.aggregate('Place', [('sum', 'price_by_night'),
+                                      ('min', 'price_by_night')], 'city_id'),
+            [
+                {'city_id': 'c0', 'sum(price_by_night)': 61.5,
+                 'min(price_by_night)': 1.5},
+                {'city_id': 'c1', 'sum(price_by_night)': 30,
+                 'min(price_by_night)': 30},
+                {'city_id': 'c2', 'sum(price_by_night)': 0,
+                 'min(price_by_night)': None},
+            ]
+        )
+        with self.assertRaises(ValueError):
+            with store.batch():
+                store.delete(store.get(Place, '2'))
+                self.assertEqual(
+                    store.aggregate(Place, ['count']), [{'count': 4}]
+                )
+                raise ValueError('rolled back')
+        self.assertEqual(store.aggregate(Place, ['count']), [{'count': 5}])
+        self.assertEqual(
+            store.aggregate(User, ['count', 'avg(age)']),
+            [{'count': 0, 'avg(age)': None}]
+        )
+        for cls, aggregates in (('Spaceship', ['count']),
+                                (Place, ['median(price_by_night)']),
+                                (Place, ['sum'])):
+            with self.assertRaises(ValueError):
+                store.aggregate(cls, aggregates)
+
+    def test_atomic_save(self):
+        """Tests that a failed save leaves the storage file intact.
+        """
+        store = FileStorage()
+        reset_store(store)
+        store.new(User(id='5', first_name='Chris'))
+        store.save()
+        snapshot = read_text_file('file.json')
+        files = sorted(os.listdir('.'))
+
+        class FailingSerializer(JSONSerializer):
+            """Represents a serializer that fails midway.
+            """
+            def dump(self, file, records):
+                """Writes a part of the records and fails.
+                """
+                file.write(b'{"User.5": ')
+                raise OSError()
+
+        store.serializer = FailingSerializer()
+        store.new(City(id='7', name='Oklahoma'))
+        with self.assertRaises(OSError):
+            store.save()
+        self.assertEqual(read_text_file('file.json'), snapshot)
+        self.assertEqual(sorted(os.listdir('.')), files)
+        os.chmod('file.json', 0o640)
+        store.serializer = JSONSerializer()
+        store.save()
+        self.assertEqual(os.stat('file.json').st_mode & 0o777, 0o640)
+        # the temporary file can't be created
+        store.new(State(id='9', name='Texas'))
+        error = OSError(errno.ENOSPC, 'No space left on device')
+        with patch('builtins.open', side_effect=error):
+            with self.assertRaises(OSError) as ctx:
+                store.save()
+        self.assertEqual(ctx.exception.errno, errno.ENOSPC)
+        self.assertEqual(sorted(os.listdir('.')), files)
+
+    def test_write_behind(self):
+        """Tests the write-behind mode of the FileStorage class.
+        """
+        store = FileStorage()
+        reset_store(store)
+        store.write_behind = 0.1
+        mdl = User(id='5', first_name='Chris')
+        store.new(mdl)
+        store.save()
+        mdl.first_name = 'Akpanoko'
+        store.mark_changed(mdl)
+        store.save()
+        self.assertEqual(read_text_file('file.json'), '{}')
+        store.flush()
+        self.assertIn('Akpanoko', read_text_file('file.json'))
+        store.new(City(id='7', name='Oklahoma'))
+        store.save()
+        self.assertNotIn('Oklahoma', read_text_file('file.json'))
+        time.sleep(0.5)
+        self.assertIn('Oklahoma', read_text_file('file.json'))
+        store.write_behind = 0
+
+    def test_close(self):
+        """Tests that closing a FileStorage writes the pending saves and
+        removes the lock file.
+        """
+        store = FileStorage()
+        reset_store(store)
+        store.write_behind = 10
+        store.new(User(id='5', first_name='Chris'))
+        store.save()
+        self.assertEqual(read_text_file('file.json'), '{}')
+        store.close()
+        self.assertIn('Chris', read_text_file('file.json'))
+        self.assertFalse(os.path.isfile(store.lock_path))
+        store.write_behind = 0
+        store.new(City(id='7', name='Oklahoma'))
+        store.save()
+        self.assertIn('Oklahoma', read_text_file('file.json'))
+        other = FileStorage()
+        other.reload()
+        self.assertEqual(other.get(City, '7').name, 'Oklahoma')
+
     def tearDown(self):
         """Deconstructs this test class.
         """
         super().tearDown()
         if os.path.isfile('file.json'):
             os.unlink('file.json')
+        if os.path.isfile('file.json.lock'):
+            os.unlink('file.json.lock')
+        if os.path.isfile('file.json.journal'):
+            os.unlink('file.json.journal')
+        if os.path.isfile('file.json.text'):
+            os.unlink('file.json.text')
+        if os.path.isfile('file.json.journal.old'):
+            os.unlink('file.json.journal.old')
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""A unit test module for the incremental JSON reader.
+"""
+import json
+import unittest
+from io import BytesIO
+
+from models.engine.json_stream import iter_json_object
+
+
+class TestIterJsonObject(unittest.TestCase):
+    """Represents the test class for the iter_json_object function.
+    """
+
+    def test_entries(self):
+        """Tests reading the entries of a JSON object.
+        """
+        json_objs = {
+            'User.{}'.format(i): {
+                '__class__': 'User',
+                'id': str(i),
+                'first_name': 'Akpanoko é' * (i % 7),
+                'age': i * 1.5,
+                'tags': [None, True, {'a': [i]}]
+            }
+            for i in range(300)
+        }
+        json_objs['count'] = 300
+        data = json.dumps(json_objs).encode()
+        for chunk_size in (1, 2, 5, 64, 4096):
+            entries = list(iter_json_object(BytesIO(data), chunk_size))
+            self.assertDictEqual(
+                {key: value for key, value, _ in entries},
+                json_objs
+            )
+            self.assertEqual(entries[-1][2], len(data))
+        for data in (b'', b' \n', b'{}', b' { \n } '):
+            self.assertEqual(list(iter_json_object(BytesIO(data), 2)), [])
+
+    def test_invalid(self):
+        """Tests reading invalid JSON objects.
+        """
+        invalid_data = (b'{', b'{"a": 1', b'[1]', b'{"a" 1}', b'{"a":1 "b":2}')
+        for data in invalid_data:
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_json_object(BytesIO(data), 2))
+
+    def test_truncated_values(self):
+        """Tests reading values that are split between chunks.
+        """
+        data = b'{"a": 1.5, "b": -2e3, "c": "\\u00e9", "d": true, "e": null}'
+        for chunk_size in range(1, 8):
+            self.assertEqual(
+                [entry[:2] for entry in iter_json_object(BytesIO(data),
+                                                         chunk_size)],
+                [('a', 1.5), ('b', -2e3), ('c', 'é'), ('d', True),
+                 ('e', None)]
+            )
+
+    def test_corrupt(self):
+        """Tests that an error in the middle of the document is raised
+        without reading the rest of it.
+        """
+        data = BytesIO(b'{"a": [1, x], "b": "' + b'b' * 100000 + b'"}')
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_json_object(data, 64))
+        self.assertLess(data.tell(), 1000)
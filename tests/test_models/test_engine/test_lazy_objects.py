@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""A unit test module for the dictionary of lazily materialized objects.
+"""
+import unittest
+from datetime import datetime
+
+from models.engine.lazy_objects import LazyObjects, is_record, record_str
+from models.user import User
+
+
+class TestLazyObjects(unittest.TestCase):
+    """Represents the test class for the LazyObjects class.
+    """
+
+    def test_materialize(self):
+        """Tests materializing the records of a LazyObjects dictionary.
+        """
+        built = []
+
+        def materialize(record):
+            """Creates the object of a record and records its id.
+            """
+            built.append(record['id'])
+            return User(**record)
+
+        datetime_now = datetime.today().isoformat()
+        objs = LazyObjects(materialize)
+        for i in range(3):
+            objs['User.{}'.format(i)] = {
+                '__class__': 'User',
+                'id': str(i),
+                'created_at': datetime_now,
+                'updated_at': datetime_now
+            }
+        self.assertEqual(len(objs), 3)
+        self.assertEqual(list(objs.keys()), ['User.0', 'User.1', 'User.2'])
+        self.assertEqual(built, [])
+        self.assertIsInstance(objs['User.1'], User)
+        self.assertIs(objs['User.1'], objs.get('User.1'))
+        self.assertEqual(built, ['1'])
+        self.assertIsNone(objs.get('User.7'))
+        self.assertIsInstance(objs.pop('User.2'), User)
+        self.assertEqual(objs.pop('User.2', None), None)
+        self.assertEqual(built, ['1', '2'])
+        self.assertEqual(len(objs.values()), 2)
+        for key, obj in objs.items():
+            self.assertIsInstance(obj, User)
+            self.assertFalse(is_record(dict.get(objs, key)))
+        self.assertEqual(built, ['1', '2', '0'])
+
+    def test_record_str(self):
+        """Tests the string representation of a serialized record.
+        """
+        mdl = User(id='5', first_name='Chris')
+        mdl.created_at = mdl.updated_at = datetime.today()
+        self.assertTrue(is_record(mdl.to_dict()))
+        self.assertFalse(is_record(mdl))
+        self.assertEqual(record_str(mdl.to_dict()), str(mdl))
@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+"""A unit test module for the memory-mapped storage.
+"""
+import io
+import os
+import unittest
+
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.engine.mmap_storage import MmapStorage
+from models.place import Place
+from models.registry import ModelRegistry
+from models.user import User
+from tests import delete_file, read_text_file, write_text_file
+
+
+class TestMmapStorage(unittest.TestCase):
+    """Represents the test class for the MmapStorage class.
+    """
+
+    def test_reload(self):
+        """Tests reading a file with the MmapStorage class.
+        """
+        store = FileStorage('file.mmap')
+        mdl = User(id='5', first_name='Chris')
+        store.new(mdl)
+        store.new(City(id='7', name='Oklahoma'))
+        store.new(Place(id='9', city_id='7', latitude=-1.5, name='Sea view'))
+        store.new(Place(id='10'))
+        store.save()
+        store.close()
+        mmap_store = MmapStorage('file.mmap')
+        self.assertEqual(mmap_store.count(), 0)
+        self.assertEqual(mmap_store.reload(), 4)
+        self.assertEqual(mmap_store.count(Place), 2)
+        self.assertEqual(mmap_store.count('User'), 1)
+        self.assertEqual(mmap_store.count('Review'), 0)
+        self.assertEqual(mmap_store.get(User, '5').first_name, 'Chris')
+        self.assertIs(mmap_store.get(User, '5'), mmap_store.get(User, '5'))
+        self.assertIsNone(mmap_store.get(User, '6'))
+        self.assertIsNone(mmap_store.get('Spaceship', '5'))
+        self.assertEqual(list(mmap_store.strings(User)), [str(mdl)])
+        self.assertEqual(len(list(mmap_store.strings())), 4)
+        self.assertEqual(mmap_store.related(Place, 'city_id', '7'), [
+            mmap_store.get(Place, '9')
+        ])
+        self.assertEqual(
+            [record['id'] for record in mmap_store.records(Place)],
+            ['10', '9']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in mmap_store.ordered(Place, 'latitude')],
+            ['9', '10']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in mmap_store.within(Place, -2, -1, -1, 1)],
+            ['9']
+        )
+        self.assertEqual(
+            [mdl.id for _, mdl in mmap_store.near(Place, 0, 0, 500)],
+            ['10', '9']
+        )
+        self.assertEqual(
+            [mdl.id for _, mdl in mmap_store.search(None, 'view')], ['9']
+        )
+        self.assertEqual(mmap_store.search(City, 'Oklahoma'), [])
+        self.assertEqual(
+            mmap_store.aggregate(Place, ['count', 'min(latitude)']),
+            [{'count': 2, 'min(latitude)': -1.5}]
+        )
+        self.assertEqual(
+            sorted(mmap_store.all().keys()),
+            sorted(store.all().keys())
+        )
+        self.assertEqual(mmap_store.all()['City.7'].name, 'Oklahoma')
+        with self.assertRaises(io.UnsupportedOperation):
+            mmap_store.new(mdl)
+        with self.assertRaises(io.UnsupportedOperation):
+            mmap_store.save()
+        with self.assertRaises(io.UnsupportedOperation):
+            mmap_store.import_file(Place, 'file.mmap')
+        self.assertEqual(
+            mmap_store.export_file(Place, 'places.jsonl', attrs=['id']), 2
+        )
+        self.assertEqual(
+            read_text_file('places.jsonl'), '{"id": "10"}\n{"id": "9"}\n'
+        )
+        delete_file('places.jsonl')
+        mmap_store.close()
+        write_text_file('file.mmap', '{}')
+        with self.assertRaises(ValueError):
+            mmap_store.reload()
+
+    def test_compact_ordered(self):
+        """Tests ordering the objects of the compact model classes, whose
+        slots hide the defaults of the attributes.
+        """
+        store = FileStorage('file.mmap')
+        store.new(Place(id='0', price_by_night=5))
+        store.new(Place(id='1'))
+        store.save()
+        store.close()
+        mmap_store = MmapStorage('file.mmap')
+        mmap_store.model_classes = ModelRegistry(compact=True)
+        mmap_store.reload()
+        self.assertEqual(
+            [mdl.id for mdl in mmap_store.ordered(Place, 'price_by_night')],
+            ['1', '0']
+        )
+        self.assertEqual(
+            [mdl.id for mdl in mmap_store.ordered(Place, 'price_by_night',
+                                                  high=0)],
+            ['1']
+        )
+        mmap_store.close()
+
+    def tearDown(self):
+        """Deconstructs this test class.
+        """
+        super().tearDown()
+        if os.path.isfile('file.mmap'):
+            os.unlink('file.mmap')
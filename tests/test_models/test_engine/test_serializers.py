@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""A unit test module for the serializers of the file storage.
+"""
+import json
+import os
+import pickle
+import unittest
+from datetime import datetime
+from io import BytesIO
+
+from models.engine.serializers import BinarySerializer, JSONSerializer
+from models.engine.serializers import MmapSerializer
+from models.engine.serializers import convert, datetime_to_micros
+from models.engine.serializers import micros_to_datetime, serializer_for
+from models.place import Place
+from models.user import User
+from tests import read_text_file, write_text_file
+
+
+class TestSerializers(unittest.TestCase):
+    """Represents the test class for the serializers.
+    """
+
+    def test_serializer_for(self):
+        """Tests picking the serializer of a storage file.
+        """
+        self.assertIsInstance(serializer_for('file.json'), JSONSerializer)
+        self.assertIsInstance(serializer_for('file.bin'), BinarySerializer)
+        self.assertIsInstance(serializer_for('file.BIN'), BinarySerializer)
+        self.assertIsInstance(serializer_for('file'), JSONSerializer)
+        self.assertIsInstance(serializer_for('file.mmap'), MmapSerializer)
+        self.assertIsInstance(
+            serializer_for('file.json', 'binary'),
+            BinarySerializer
+        )
+        with self.assertRaises(ValueError):
+            serializer_for('file.json', 'xml')
+
+    def test_micros(self):
+        """Tests the conversion of datetimes to epoch microseconds.
+        """
+        datetime_now = datetime.today()
+        self.assertEqual(datetime_to_micros(datetime(1970, 1, 1)), 0)
+        self.assertIsInstance(datetime_to_micros(datetime_now), int)
+        self.assertEqual(
+            micros_to_datetime(datetime_to_micros(datetime_now)),
+            datetime_now
+        )
+
+    def test_round_trip(self):
+        """Tests writing and reading records in both formats.
+        """
+        datetime_now = datetime.today()
+        mdl = Place(id='p-1', name='Zuba', price_by_night=120)
+        mdl.created_at = mdl.updated_at = datetime_now
+        mdl.checked_at = datetime_now
+        mdl1 = User(id='u-1', first_name='Chris')
+        mdl1.created_at = mdl1.updated_at = datetime_now
+        serializers = (JSONSerializer(), BinarySerializer(), MmapSerializer())
+        for serializer in serializers:
+            file = BytesIO()
+            serializer.dump(file, [
+                ('Place.p-1', serializer.to_record(mdl)),
+                ('User.u-1', serializer.to_record(mdl1)),
+            ])
+            file.seek(0)
+            records = {k: v for k, v, _ in serializer.load(file)}
+            self.assertEqual(list(records.keys()), ['Place.p-1', 'User.u-1'])
+            record = records['Place.p-1']
+            self.assertEqual(record['__class__'], 'Place')
+            self.assertEqual(record['name'], 'Zuba')
+            self.assertEqual(record['checked_at'], datetime_now.isoformat())
+            self.assertIn(
+                record['created_at'],
+                (datetime_now, datetime_now.isoformat())
+            )
+            file = BytesIO()
+            serializer.dump(file, [])
+            file.seek(0)
+            self.assertEqual(list(serializer.load(file)), [])
+        record = BinarySerializer().to_record(mdl)
+        self.assertEqual(
+            record['created_at'],
+            datetime_to_micros(mdl.created_at)
+        )
+        self.assertEqual(BinarySerializer().to_record(mdl.to_dict()), record)
+
+    def test_binary_safety(self):
+        """Tests that binary files can't load arbitrary objects.
+        """
+        file = BytesIO()
+        pickle.dump({'format': BinarySerializer.magic, 'version': 1}, file)
+        pickle.dump(('User', ('id',), [('User.1', datetime.today())]), file)
+        file.seek(0)
+        with self.assertRaises(pickle.UnpicklingError):
+            list(BinarySerializer().load(file))
+        with self.assertRaises(ValueError):
+            list(BinarySerializer().load(BytesIO(pickle.dumps([1]))))
+
+    def test_convert(self):
+        """Tests converting a storage file between the formats.
+        """
+        mdl = User(id='u-1', first_name='Chris')
+        mdl.created_at = mdl.updated_at = datetime.today()
+        write_text_file('file.json', json.dumps({'User.u-1': mdl.to_dict()}))
+        self.assertEqual(convert('file.json', 'file.bin'), 1)
+        self.assertEqual(convert('file.bin', 'file.mmap'), 1)
+        self.assertEqual(convert('file.mmap', 'file2.json'), 1)
+        self.assertEqual(
+            read_text_file('file2.json'),
+            read_text_file('file.json')
+        )
+
+    def tearDown(self):
+        """Deconstructs this test class.
+        """
+        super().tearDown()
+        for file_path in ('file.json', 'file.bin', 'file.mmap', 'file2.json',
+                          'file.json.lock', 'file.bin.lock'):
+            if os.path.isfile(file_path):
+                os.unlink(file_path)
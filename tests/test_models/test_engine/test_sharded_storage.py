@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+"""A unit test module for the sharded storage.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from models.city import City
+from models.engine.sharded_storage import ShardedStorage
+from models.place import Place
+from models.user import User
+from tests import read_text_file
+
+
+class TestShardedStorage(unittest.TestCase):
+    """Represents the test class for the ShardedStorage class.
+    """
+
+    def setUp(self):
+        """Initializes this test class.
+        """
+        super().setUp()
+        self.dir_path = tempfile.mkdtemp()
+
+    def shard_files(self):
+        """Lists the shard files, leaving out their lock files.
+
+        Returns:
+            list: The sorted names of the shard files.
+        """
+        return sorted(
+            name for name in os.listdir(self.dir_path)
+            if not name.endswith('.lock')
+        )
+
+    def test_save(self):
+        """Tests that only the changed shards are written.
+        """
+        store = ShardedStorage(self.dir_path, 1)
+        store.reload()
+        mdl = User(id='5', first_name='Chris')
+        store.new(mdl)
+        store.new(City(id='7', name='Oklahoma'))
+        store.save()
+        self.assertEqual(
+            self.shard_files(),
+            ['City.json', 'User.json']
+        )
+        city_path = os.path.join(self.dir_path, 'City.json')
+        os.utime(city_path, ns=(0, 0))
+        mdl.first_name = 'Akpanoko'
+        store.save()
+        self.assertEqual(os.stat(city_path).st_mtime_ns, 0)
+        self.assertIn(
+            'Akpanoko',
+            read_text_file(os.path.join(self.dir_path, 'User.json'))
+        )
+        self.assertEqual(store.count(), 2)
+        self.assertEqual(len(store.all()), 2)
+        self.assertIs(store.all()['User.5'], mdl)
+
+    def test_reload(self):
+        """Tests the reload function of the ShardedStorage class.
+        """
+        store = ShardedStorage(self.dir_path, 4)
+        store.reload()
+        for i in range(20):
+            store.new(Place(
+                id=str(i), name='Place {}'.format(i), max_guest=i % 5
+            ))
+        store.new(User(id='5'))
+        store.save()
+        self.assertGreater(len(os.listdir(self.dir_path)), 2)
+        new_store = ShardedStorage(self.dir_path, 4)
+        progress = []
+        self.assertEqual(
+            new_store.reload(
+                classes=['User'],
+                progress=lambda *args: progress.append(args)
+            ),
+            1
+        )
+        self.assertEqual(progress[-1][0], 1)
+        self.assertEqual(progress[-1][1], progress[-1][2])
+        self.assertIsNotNone(new_store.get(User, '5'))
+        self.assertEqual(new_store.get('Place', '12').name, 'Place 12')
+        self.assertEqual(new_store.count(Place), 20)
+        self.assertEqual(len(list(new_store.strings())), 21)
+        self.assertEqual(
+            [mdl.id for mdl in new_store.ordered(Place, 'max_guest', 4)],
+            ['14', '19', '4', '9']
+        )
+        self.assertEqual(
+            [mdl.max_guest for mdl in new_store.ordered(
+                Place, 'max_guest', reverse=True
+            )],
+            sorted([i % 5 for i in range(20)], reverse=True)
+        )
+        self.assertEqual(len(new_store.within(Place, -1, -1, 1, 1)), 20)
+        self.assertEqual(
+            [d for d, _ in new_store.near(Place, 0, 0, 10, 3)], [0, 0, 0]
+        )
+        self.assertEqual(len(new_store.search(Place, 'place')), 20)
+        self.assertEqual(
+            [mdl.id for _, mdl in new_store.search(None, 'place 12', 3)][0],
+            '12'
+        )
+        self.assertEqual(len(new_store.search(Place, 'place', 3)), 3)
+        self.assertEqual(
+            new_store.aggregate(Place, ['count', 'sum(max_guest)']),
+            [{'count': 20, 'sum(max_guest)': 40}]
+        )
+        with self.assertRaises(ValueError):
+            new_store.reload(classes=['Spaceship'])
+
+    def test_batch(self):
+        """Tests the batch function of the ShardedStorage class.
+        """
+        store = ShardedStorage(self.dir_path, 1)
+        store.reload(classes=[])
+        with store.batch():
+            store.new(User(id='5'))
+            store.save()
+            self.assertEqual(self.shard_files(), [])
+        self.assertEqual(self.shard_files(), ['User.json'])
+        with self.assertRaises(ValueError):
+            with store.batch():
+                store.new(City(id='7'))
+                store.delete(store.get(User, '5'))
+                store.save()
+                raise ValueError()
+        self.assertEqual(store.count(City), 0)
+        self.assertIsNotNone(store.get(User, '5'))
+        self.assertEqual(self.shard_files(), ['User.json'])
+
+    def tearDown(self):
+        """Deconstructs this test class.
+        """
+        super().tearDown()
+        shutil.rmtree(self.dir_path)
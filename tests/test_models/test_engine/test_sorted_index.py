@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""A unit test module for the sorted index.
+"""
+import random
+import unittest
+
+from models.engine.sorted_index import SortedIndex, is_sortable
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Represents the test class for the SortedIndex class.
+    """
+
+    def test_keys(self):
+        """Tests the ranges of keys of a sorted index.
+        """
+        index = SortedIndex([('a', 3), ('b', 1), ('c', 2.5), ('d', 'x')])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(list(index.keys()), ['b', 'c', 'a'])
+        self.assertEqual(list(index.keys(2)), ['c', 'a'])
+        self.assertEqual(list(index.keys(high=2.5)), ['b', 'c'])
+        self.assertEqual(list(index.keys(1, 2, True)), ['b'])
+        self.assertEqual(list(index.keys(4)), [])
+        index.add('d', 0)
+        index.add('a', None)
+        index.add('b', 2.5)
+        index.remove('c')
+        index.remove('e')
+        self.assertEqual(list(index.keys(reverse=True)), ['b', 'd'])
+        self.assertEqual(list(SortedIndex().keys(1, 2)), [])
+        index = SortedIndex([('a', 2), ('b', 2.0), ('c', 1), ('d', 3)])
+        self.assertEqual(list(index.keys(2, 2)), ['a', 'b'])
+        self.assertEqual(list(index.keys(high=2)), ['c', 'a', 'b'])
+        self.assertEqual(list(index.keys(2.0, reverse=True)), ['d', 'b', 'a'])
+
+    def test_chunks(self):
+        """Tests a sorted index with more keys than a chunk holds.
+        """
+        values = {}
+        index = SortedIndex((str(i), i % 7) for i in range(1500))
+        for i in range(1500):
+            values[str(i)] = i % 7
+        for i in range(5000):
+            key = str(random.randrange(3000))
+            if random.random() < 0.3:
+                index.remove(key)
+                values.pop(key, None)
+            else:
+                values[key] = random.choice([random.randrange(50), 0.5])
+                index.add(key, values[key])
+        entries = sorted((v, k) for k, v in values.items())
+        self.assertEqual(len(index), len(values))
+        self.assertEqual(list(index.keys()), [k for _, k in entries])
+        self.assertEqual(
+            list(index.keys(10, 20, True)),
+            [k for v, k in reversed(entries) if 10 <= v <= 20]
+        )
+
+    def test_is_sortable(self):
+        """Tests the values that a sorted index can hold.
+        """
+        self.assertTrue(is_sortable(0))
+        self.assertTrue(is_sortable(2.5))
+        self.assertFalse(is_sortable(float('nan')))
+        self.assertFalse(is_sortable(True))
+        self.assertFalse(is_sortable('1'))
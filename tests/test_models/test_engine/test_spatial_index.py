@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""A unit test module for the spatial index.
+"""
+import random
+import unittest
+
+from models.engine.spatial_index import (
+    GridIndex, bounding_box, haversine, in_box, is_location, nearest
+)
+
+
+class TestGridIndex(unittest.TestCase):
+    """Represents the test class for the GridIndex class.
+    """
+
+    def test_within(self):
+        """Tests finding the keys in a box.
+        """
+        index = GridIndex([
+            ('a', 10, 20), ('b', 10.5, 20.5), ('c', -10, 179.9),
+            ('d', -10, -179.9), ('e', 91, 0), ('f', 'x', 0)
+        ])
+        self.assertEqual(len(index), 4)
+        self.assertEqual(
+            sorted(k for k, _, _ in index.within(9, 19, 10.2, 21)), ['a']
+        )
+        self.assertEqual(
+            sorted(k for k, _, _ in index.within(-11, 179, -9, -179)),
+            ['c', 'd']
+        )
+        self.assertEqual(
+            sorted(k for k, _, _ in index.within(-90, -180, 90, 180)),
+            ['a', 'b', 'c', 'd']
+        )
+        index.add('a', -10, 179.95)
+        index.remove('c')
+        index.remove('g')
+        index.add('b', None, None)
+        self.assertEqual(
+            sorted(index.within(-11, 179, -9, -179)),
+            [('a', -10, 179.95), ('d', -10, -179.9)]
+        )
+
+    def test_near(self):
+        """Tests finding the nearest keys, which are compared with a scan.
+        """
+        points = [
+            (str(i), random.uniform(-60, 60), random.uniform(-180, 180))
+            for i in range(2000)
+        ]
+        index = GridIndex(points, 5)
+        for _ in range(20):
+            lat, lon = random.uniform(-60, 60), random.uniform(-180, 180)
+            km = random.choice([10, 500, 3000])
+            self.assertEqual(
+                index.near(lat, lon, km, 5),
+                nearest(points, lat, lon, km, 5)
+            )
+        self.assertEqual(index.near(0, 0, 0), [])
+
+    def test_helpers(self):
+        """Tests the distances, the boxes, and the locations.
+        """
+        self.assertAlmostEqual(
+            haversine(51.5007, 0.1246, 40.6892, 74.0445), 5574.8, 0
+        )
+        self.assertEqual(haversine(1, 2, 1, 2), 0)
+        south, west, north, east = bounding_box(0, 179.99, 100)
+        self.assertGreater(west, east)
+        self.assertTrue(in_box(0.5, -179.5, south, west, north, east))
+        self.assertFalse(in_box(0.5, 170, south, west, north, east))
+        self.assertEqual(bounding_box(89.9, 0, 100)[1:4:2], (-180, 180))
+        self.assertTrue(is_location(-90, 180))
+        self.assertFalse(is_location(float('nan'), 0))
+        self.assertFalse(is_location(0, 181))
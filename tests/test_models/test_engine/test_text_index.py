@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+"""A unit test module for the full-text index.
+"""
+import os
+import unittest
+
+from models.engine.text_index import (
+    TextIndex, join_text, search_records, text_checksum, tokenize
+)
+
+
+class TestTextIndex(unittest.TestCase):
+    """Represents the test class for the TextIndex class.
+    """
+
+    def test_search(self):
+        """Tests ranking the documents that match a text.
+        """
+        index = TextIndex()
+        index.add('Place.0', 'A quiet flat with a great view of the sea')
+        index.add('Place.1', 'Great location, great host')
+        index.add('Place.2', 'Noisy street')
+        index.add('Review.3', 'The view was great')
+        self.assertEqual(len(index), 4)
+        self.assertEqual(
+            [key for _, key in index.search('great view')],
+            ['Review.3', 'Place.0', 'Place.1']
+        )
+        self.assertEqual(
+            [key for _, key in index.search('GREAT', 1, 'Place.')],
+            ['Place.1']
+        )
+        self.assertEqual(index.search('the of'), [])
+        self.assertEqual(index.search('castle'), [])
+        scores = [score for score, _ in index.search('great view')]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(score > 0 for score in scores))
+
+    def test_search_prefix(self):
+        """Tests that the documents searched by a prefix are ranked as if
+        they were the only documents in the index.
+        """
+        index = TextIndex()
+        places = TextIndex()
+        for key, text in [('Place.0', 'great view'), ('Place.1', 'street')]:
+            index.add(key, text)
+            places.add(key, text)
+        for i in range(2, 6):
+            index.add('Review.{}'.format(i), 'great host, great stay')
+        self.assertEqual(
+            index.search('great', prefix='Place.'), places.search('great')
+        )
+        self.assertEqual(
+            index.search('great', prefix='Pla'), places.search('great')
+        )
+        self.assertEqual(
+            index.search('great view', prefix='Place.0'),
+            places.search('great view', prefix='Place.0')
+        )
+        index.remove('Review.2')
+        index.add('Review.3', 'view')
+        self.assertEqual(
+            [key for _, key in index.search('view', prefix='Review.')],
+            ['Review.3']
+        )
+        self.assertEqual(index.search('view', prefix='User.'), [])
+
+    def test_update(self):
+        """Tests replacing and removing the documents.
+        """
+        index = TextIndex()
+        index.add('Place.0', 'great view')
+        index.add('Place.1', 'noisy street')
+        checksum = index.checksum('Place.0')
+        self.assertEqual(checksum, text_checksum('great view'))
+        index.add('Place.0', 'small garden')
+        self.assertEqual(index.search('view'), [])
+        self.assertEqual([k for _, k in index.search('garden')], ['Place.0'])
+        index.remove('Place.1')
+        index.remove('Place.2')
+        self.assertNotIn('Place.1', index)
+        self.assertIsNone(index.checksum('Place.1'))
+        self.assertEqual(index.search('street'), [])
+        self.assertEqual(index.keys(), ['Place.0'])
+
+    def test_dump(self):
+        """Tests writing an index to a file and reading it back.
+        """
+        index = TextIndex()
+        index.add('Place.0', 'great view')
+        index.add('Review.1', 'great host')
+        index.fingerprint = [['file.json', 10, 20]]
+        try:
+            index.dump('text_index.json')
+            loaded = TextIndex.load('text_index.json')
+            self.assertEqual(loaded.fingerprint, index.fingerprint)
+            self.assertEqual(
+                loaded.search('great host'), index.search('great host')
+            )
+            index.add('Place.2', 'small flat')
+            index.remove('Review.1')
+            index.fingerprint = [['file.json', 30, 40]]
+            index.dump_changes('text_index.json')
+            self.assertFalse(index.changed)
+            loaded = TextIndex.load('text_index.json')
+            self.assertEqual(loaded.fingerprint, index.fingerprint)
+            self.assertFalse(loaded.changed)
+            self.assertEqual(loaded.keys(), ['Place.0', 'Place.2'])
+            with open('text_index.json.journal', mode='a') as file:
+                file.write('{"fingerprint"')
+            self.assertIsNone(TextIndex.load('text_index.json').fingerprint)
+            index.dump('text_index.json')
+            self.assertFalse(os.path.isfile('text_index.json.journal'))
+            with open('text_index.json', mode='w') as file:
+                file.write('[]')
+            with self.assertRaises(ValueError):
+                TextIndex.load('text_index.json')
+        finally:
+            for file_path in ['text_index.json', 'text_index.json.journal']:
+                if os.path.isfile(file_path):
+                    os.unlink(file_path)
+        with self.assertRaises(OSError):
+            TextIndex.load('text_index.json')
+
+    def test_helpers(self):
+        """Tests the functions of the text_index module.
+        """
+        self.assertEqual(
+            tokenize("It's the Best view, by far!"),
+            ['s', 'best', 'view', 'far']
+        )
+        self.assertEqual(
+            join_text('Place', {'name': 'Loft', 'description': 'Big'}),
+            'Loft\nBig'
+        )
+        self.assertEqual(join_text('Place', {'name': 3}), '')
+        self.assertEqual(join_text('User', {'name': 'Loft'}), '')
+        self.assertEqual(
+            [key for _, key in search_records(
+                [
+                    {'__class__': 'Review', 'id': '0', 'text': 'good'},
+                    {'__class__': 'Place', 'id': '1', 'name': 'good loft'},
+                    {'__class__': 'Place', 'id': '2', 'name': 'bad loft'}
+                ],
+                'good'
+            )],
+            ['Review.0', 'Place.1']
+        )
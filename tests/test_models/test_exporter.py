@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""A unit test module for the bulk export of objects.
+"""
+import json
+import unittest
+
+from models.engine.columns import load_columns
+from models.engine.file_storage import FileStorage
+from models.exporter import export_format, export_objects
+from models.place import Place
+from tests import delete_file, read_text_file
+
+
+class TestExporter(unittest.TestCase):
+    """Represents the test class for the exporter module.
+    """
+
+    def setUp(self):
+        """Creates a storage with some places.
+        """
+        delete_file('export.json')
+        self.store = FileStorage('export.json')
+        self.store.reload()
+        for i in range(4):
+            mdl = Place(id=str(i), name='Place, {}'.format(i), max_guest=i,
+                        latitude=i / 2, amenity_ids=[str(i)])
+            if i == 1:
+                mdl.view = 'sea'
+            self.store.new(mdl)
+        self.store.save()
+
+    def tearDown(self):
+        """Removes the storage file and the data files.
+        """
+        for file_path in ('export.json', 'export.json.lock', 'copy.json',
+                          'copy.json.lock', 'places.csv', 'places.jsonl',
+                          'places.columnar'):
+            delete_file(file_path)
+
+    def test_export_format(self):
+        """Tests determining the format of a file from its extension.
+        """
+        self.assertEqual(export_format('a.CSV'), 'csv')
+        self.assertEqual(export_format('a.ndjson'), 'jsonl')
+        self.assertEqual(export_format('a.columnar'), 'columnar')
+        with self.assertRaises(ValueError):
+            export_format('a.txt')
+
+    def test_export_objects(self):
+        """Tests writing the objects to the files of each format.
+        """
+        self.assertEqual(export_objects(self.store, Place, 'places.csv'), 4)
+        self.assertEqual(read_text_file('places.csv').splitlines()[:3], [
+            'id,name,max_guest,latitude,amenity_ids,view',
+            '0,"Place, 0",0,0.0,"[""0""]",',
+            '1,"Place, 1",1,0.5,"[""1""]",sea',
+        ])
+        self.assertEqual(export_objects(
+            self.store, Place, 'places.jsonl', None, ['id', 'number_rooms'],
+            ['max_guest>1']
+        ), 2)
+        self.assertEqual(
+            [json.loads(line) for line in
+             read_text_file('places.jsonl').splitlines()],
+            [{'id': '2', 'number_rooms': 0}, {'id': '3', 'number_rooms': 0}]
+        )
+        self.assertEqual(
+            export_objects(self.store, Place, 'places.columnar'), 4
+        )
+        cls_name, columns = load_columns('places.columnar')
+        self.assertEqual(cls_name, 'Place')
+        self.assertEqual(columns['max_guest'].type, 'int')
+        self.assertEqual(list(columns['latitude']), [0.0, 0.5, 1.0, 1.5])
+        self.assertEqual(list(columns['view']), [None, 'sea', None, None])
+        with self.assertRaises(ValueError):
+            export_objects(self.store, Place, 'places.csv', 'xml')
+
+    def test_export_file(self):
+        """Tests that the exported objects can be imported again.
+        """
+        for file_path in ('places.csv', 'places.jsonl'):
+            self.assertEqual(self.store.export_file('Place', file_path), 4)
+            delete_file('copy.json')
+            store = FileStorage('copy.json')
+            store.reload()
+            self.assertEqual(store.import_file(Place, file_path), 4)
+            mdl = store.get(Place, '1')
+            self.assertEqual(mdl.name, 'Place, 1')
+            self.assertEqual(mdl.max_guest, 1)
+            self.assertEqual(mdl.latitude, 0.5)
+            self.assertEqual(mdl.amenity_ids, ['1'])
+            self.assertEqual(mdl.view, 'sea')
+        with self.assertRaises(ValueError):
+            self.store.export_file('Spaceship', 'places.csv')
@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+"""A unit test module for the bulk import of objects.
+"""
+import unittest
+from unittest.mock import patch
+
+from models.engine.file_storage import FileStorage
+from models.importer import coerce_attribute, import_objects, read_rows
+from models.place import Place
+from models.user import User
+from tests import delete_file, write_text_file
+
+
+class TestImporter(unittest.TestCase):
+    """Represents the test class for the importer module.
+    """
+
+    def setUp(self):
+        """Creates an empty storage.
+        """
+        delete_file('import.json')
+        self.store = FileStorage('import.json')
+        self.store.reload()
+
+    def tearDown(self):
+        """Removes the storage file and the data files.
+        """
+        for file_path in ('import.json', 'import.json.lock', 'places.csv',
+                          'places.jsonl'):
+            delete_file(file_path)
+
+    def test_coerce_attribute(self):
+        """Tests converting values to the types of the attributes.
+        """
+        self.assertEqual(coerce_attribute(Place, 'number_rooms', '3'), 3)
+        self.assertEqual(coerce_attribute(Place, 'latitude', '1.5'), 1.5)
+        self.assertEqual(coerce_attribute(Place, 'name', 12), '12')
+        self.assertEqual(coerce_attribute(Place, 'rating', 4), '4')
+        self.assertEqual(
+            coerce_attribute(Place, 'amenity_ids', ['a']), ['a']
+        )
+        for name, value in (('number_rooms', 'two'), ('reviews', 'a'),
+                            ('save', 'a')):
+            with self.assertRaises(ValueError):
+                coerce_attribute(Place, name, value)
+
+    def test_read_rows(self):
+        """Tests reading the rows of CSV and JSON Lines files.
+        """
+        write_text_file(
+            'places.csv', 'id,name,number_rooms\n1,"Loft, big",2\n2,,\n'
+        )
+        self.assertEqual(list(read_rows('places.csv')), [
+            (2, {'id': '1', 'name': 'Loft, big', 'number_rooms': '2'}),
+            (3, {'id': '2'})
+        ])
+        write_text_file(
+            'places.jsonl', '{"id": "1", "max_guest": 2}\n\n[1]\n'
+        )
+        rows = read_rows('places.jsonl')
+        self.assertEqual(next(rows), (1, {'id': '1', 'max_guest': 2}))
+        with self.assertRaises(ValueError):
+            next(rows)
+        with self.assertRaises(ValueError):
+            list(read_rows('import.json'))
+
+    def test_import_objects(self):
+        """Tests creating objects from the rows of a file.
+        """
+        write_text_file('places.csv', ''.join(
+            '{0},Place {0},{1},{2}\n'.format(i, i % 3, i * 0.5)
+            if i > 0 else 'id,name,number_rooms,latitude\n'
+            for i in range(26)
+        ))
+        progress = []
+        with patch('models.importer.IMPORT_BATCH_SIZE', 10):
+            self.assertEqual(
+                import_objects(self.store, Place, 'places.csv',
+                               progress.append),
+                25
+            )
+        self.assertEqual(progress, [10, 20, 25])
+        mdl = self.store.get(Place, '7')
+        self.assertEqual(mdl.name, 'Place 7')
+        self.assertEqual(mdl.number_rooms, 1)
+        self.assertEqual(mdl.latitude, 3.5)
+        self.assertFalse(mdl._is_changed())
+        store = FileStorage('import.json')
+        store.reload()
+        self.assertEqual(store.count(Place), 25)
+        self.assertEqual(store.get(Place, '7').created_at, mdl.created_at)
+
+    def test_import_file(self):
+        """Tests that an invalid row leaves the storage unchanged.
+        """
+        write_text_file('places.jsonl', '\n'.join((
+            '{"name": "Loft", "created_at": "2024-05-01T10:00:00"}',
+            '{"__class__": "Place", "number_rooms": "3"}',
+            '{"number_rooms": "many"}',
+        )))
+        with self.assertRaises(ValueError) as context:
+            self.store.import_file(Place, 'places.jsonl')
+        self.assertIn('line 3', str(context.exception))
+        self.assertEqual(self.store.count(), 0)
+        write_text_file('places.jsonl', '\n'.join((
+            '{"name": "Loft", "created_at": "2024-05-01T10:00:00"}',
+            '{"__class__": "Place", "number_rooms": "3"}',
+        )))
+        self.assertEqual(self.store.import_file('Place', 'places.jsonl'), 2)
+        self.assertEqual(
+            sorted(mdl.number_rooms for mdl in self.store.all().values()),
+            [0, 3]
+        )
+        self.assertEqual(
+            [mdl.created_at.year for mdl in self.store.related(
+                Place, 'name', 'Loft'
+            )],
+            [2024]
+        )
+        self.assertEqual(self.store.count(User), 0)
+        with self.assertRaises(ValueError):
+            self.store.import_file('Spaceship', 'places.jsonl')
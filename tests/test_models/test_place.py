@@ -84,6 +84,18 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(Place(98.2, longitude=56.8).longitude, 56.8)
         self.assertEqual(Place([], amenity_ids=['a-f3']).amenity_ids, ['a-f3'])
 
+    def test_amenity_ids(self):
+        """Tests that the default list of amenities is kept by the
+        instance that mutates it.
+        """
+        mdl = Place(id='5')
+        mdl._mark_persisted()
+        mdl.amenity_ids.append('a-f3')
+        self.assertEqual(mdl.amenity_ids, ['a-f3'])
+        self.assertFalse(mdl._is_changed())
+        self.assertEqual(Place(id='6').amenity_ids, [])
+        self.assertEqual(Place.amenity_ids, [])
+
     def test_str(self):
         """Tests the __str__ function of the Place class.
         """
@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+"""A unit test module for the queries over the stored objects.
+"""
+import unittest
+from datetime import datetime
+
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.query import Query, parse_query, parse_value, split_args
+from tests import delete_file
+
+
+class TestQuery(unittest.TestCase):
+    """Represents the test class for the Query class.
+    """
+
+    def setUp(self):
+        """Creates a storage with some places.
+        """
+        delete_file('query.json')
+        self.store = FileStorage('query.json')
+        self.store.reload()
+        datetime_now = datetime.now().isoformat()
+        for i in range(10):
+            self.store.new(Place(
+                id=str(i),
+                created_at=datetime_now,
+                updated_at=datetime_now,
+                city_id='odd' if i % 2 else 'even',
+                price_by_night=i * 20,
+                max_guest=i
+            ))
+        self.store.new(Place(
+            id='10', created_at=datetime_now, updated_at=datetime_now
+        ))
+
+    def tearDown(self):
+        """Removes the storage file.
+        """
+        delete_file('query.json')
+
+    def test_where(self):
+        """Tests filtering the objects of a query.
+        """
+        query = Query(Place, self.store).where(
+            'price_by_night<100', ('max_guest', '>=', 2)
+        )
+        self.assertEqual([r['id'] for r in query], ['2', '3', '4'])
+        query = Query('Place', self.store).where('max_guest == 0')
+        self.assertEqual([r['id'] for r in query], ['0', '10'])
+        query = Query('Place', self.store).where('city_id="odd"', 'id!=1')
+        self.assertEqual([r['id'] for r in query], ['3', '5', '7', '9'])
+        query = Query('Place', self.store).where('rating>4')
+        self.assertEqual(query.count(), 0)
+        with self.assertRaises(ValueError):
+            Query('Place', self.store).where('max_guest~2')
+        with self.assertRaises(ValueError):
+            Query('Place', self.store).where('max_guest<a')
+
+    def test_pagination(self):
+        """Tests the projections and the pagination of a query.
+        """
+        query = Query('Place', self.store).where('max_guest>0')
+        query.select('id', 'max_guest', 'rating').offset(2).limit(3)
+        self.assertEqual(list(query.rows()), [
+            {'id': '3', 'max_guest': 3},
+            {'id': '4', 'max_guest': 4},
+            {'id': '5', 'max_guest': 5},
+        ])
+        self.assertEqual(query.count(), 3)
+        query = Query('Place', self.store).limit(1)
+        self.assertEqual(
+            list(query.rows()), [str(self.store.get('Place', '0'))]
+        )
+        self.assertEqual(
+            list(query.rows(serialized=True)),
+            [self.store.get('Place', '0').to_dict()]
+        )
+        with self.assertRaises(ValueError):
+            query.limit(-1)
+
+    def test_order_by(self):
+        """Tests sorting the results of a query.
+        """
+        query = Query('Place', self.store).order_by('-price_by_night')
+        self.assertEqual(
+            [r['id'] for r in query.where('max_guest<5').limit(3)],
+            ['4', '3', '2']
+        )
+        query = Query('Place', self.store).where('city_id=="odd"')
+        query.order_by('-max_guest').limit(2)
+        self.assertEqual([r['id'] for r in query], ['9', '7'])
+        query = Query('Place', self.store).where('price_by_night>=150')
+        self.assertEqual([r['id'] for r in query], ['8', '9'])
+        self.store.get('Place', '1').price_by_night = 500
+        self.store.mark_changed(self.store.get('Place', '1'))
+        self.assertEqual([r['id'] for r in query], ['8', '9', '1'])
+        with self.assertRaises(ValueError):
+            query.order_by('-')
+
+    def test_near(self):
+        """Tests restricting a query to an area.
+        """
+        for i in range(3):
+            mdl = self.store.get('Place', str(i))
+            mdl.latitude = 40 + i * 0.1
+            mdl.longitude = -74.0
+            self.store.mark_changed(mdl)
+        query = Query('Place', self.store).near(40.21, -74, 20)
+        self.assertEqual([r['id'] for r in query], ['2', '1'])
+        self.assertEqual([r['id'] for r in query.limit(1)], ['2'])
+        query = Query('Place', self.store).near(40.21, -74, 50)
+        query.order_by('price_by_night').where('max_guest>0')
+        self.assertEqual([r['id'] for r in query], ['1', '2'])
+        query = Query('Place', self.store).within(39.9, -75, 40.15, -73)
+        self.assertEqual(sorted(r['id'] for r in query), ['0', '1'])
+        with self.assertRaises(ValueError):
+            Query('Place', self.store).near(91, 0, 10)
+        with self.assertRaises(ValueError):
+            Query('Place', self.store).near(0, 0, -1)
+        with self.assertRaises(ValueError):
+            Query('Place', self.store).within(0, 0, 'north', 0)
+
+    def test_parse_query(self):
+        """Tests parsing a query in the dot syntax.
+        """
+        query, counted = parse_query(
+            'Place.where(price_by_night<100, max_guest>=2) . limit(2)',
+            self.store
+        )
+        self.assertFalse(counted)
+        self.assertEqual(query.cls_name, 'Place')
+        self.assertEqual(query.predicates, [
+            ('price_by_night', '<', 100), ('max_guest', '>=', 2)
+        ])
+        self.assertEqual([r['id'] for r in query], ['2', '3'])
+        query, _ = parse_query(
+            'Place.order_by(-max_guest).select(id).limit(1)', self.store
+        )
+        self.assertEqual(list(query.rows()), [{'id': '9'}])
+        query, _ = parse_query('Place.near(0.1, 0, 20).limit(2)', self.store)
+        self.assertEqual([r['id'] for r in query], ['0', '1'])
+        query, counted = parse_query(
+            'Place.where(name=="a, (b)").count()', self.store
+        )
+        self.assertTrue(counted)
+        self.assertEqual(query.predicates, [('name', '==', 'a, (b)')])
+        for query_txt in ('Place.where(', 'Place.count().limit(1)',
+                          'Place.limit()', 'Place.fly()', '.where()'):
+            with self.assertRaises(ValueError):
+                parse_query(query_txt, self.store)
+
+    def test_helpers(self):
+        """Tests splitting the arguments and parsing the values.
+        """
+        self.assertEqual(split_args(''), [])
+        self.assertEqual(split_args(' a, "b, c" ,d'), ['a', '"b, c"', 'd'])
+        self.assertEqual(parse_value('4'), 4)
+        self.assertEqual(parse_value('4.5'), 4.5)
+        self.assertEqual(parse_value('"4"'), '4')
+        self.assertEqual(parse_value('abc'), 'abc')
+        self.assertEqual(parse_value('4', 0.0), 4.0)
+        self.assertEqual(parse_value('"4"', 0), 4)
+        self.assertEqual(parse_value('4', ''), '4')
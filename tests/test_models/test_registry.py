@@ -0,0 +1,29 @@
+#!/usr/bin/python3
+"""A unit test module for the registry of the model classes.
+"""
+import unittest
+
+from models.compact import CompactModel
+from models.registry import MODEL_MODULES, ModelRegistry
+from models.user import User
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Represents the test class for the ModelRegistry class.
+    """
+
+    def test_classes(self):
+        """Tests retrieving the model classes.
+        """
+        registry = ModelRegistry(False)
+        self.assertEqual(list(registry.keys()), list(MODEL_MODULES.keys()))
+        self.assertEqual(len(registry), 7)
+        self.assertIn('Place', registry)
+        self.assertNotIn('Spaceship', registry)
+        self.assertIs(registry['User'], User)
+        with self.assertRaises(KeyError):
+            registry['Spaceship']
+        compact_registry = ModelRegistry(True)
+        self.assertTrue(issubclass(compact_registry['User'], User))
+        self.assertTrue(issubclass(compact_registry['User'], CompactModel))
+        self.assertIs(compact_registry['User'], compact_registry['User'])